@@ -0,0 +1,105 @@
+"""Сравнение CPU-времени сериализации списка из 1000 организаций
+
+Запуск: python -m benchmarks.serialization
+"""
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+
+from src.dto import Organization
+from src.serialization import from_orm, json_response
+
+ITEMS = 1000
+REQUESTS = 50
+
+
+def make_rows(count: int) -> list[SimpleNamespace]:
+    """ORM-подобные объекты со всеми связями организации"""
+    building = SimpleNamespace(
+        id=1, address="г. Москва, ул. Ленина 1", latitude=55.75, longitude=37.61
+    )
+    activities = [
+        SimpleNamespace(id=1, name="Еда", parent_id=None),
+        SimpleNamespace(id=2, name="Мясная продукция", parent_id=1),
+    ]
+    return [
+        SimpleNamespace(
+            id=i,
+            name=f'ООО "Рога и Копыта" {i}',
+            building_id=1,
+            building=building,
+            phone_numbers=[
+                SimpleNamespace(id=i * 2, phone_number="2-222-222"),
+                SimpleNamespace(id=i * 2 + 1, phone_number="8-923-666-13-13"),
+            ],
+            activities=activities,
+        )
+        for i in range(count)
+    ]
+
+
+def make_app(rows: list[SimpleNamespace]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/default", response_model=list[Organization])
+    async def default_path():
+        # Прежний путь: model_validate в сервисе и повторная валидация FastAPI
+        return [Organization.model_validate(row) for row in rows]
+
+    @app.get("/fast", response_model=list[Organization])
+    async def fast_path():
+        return json_response(list[Organization], from_orm(list[Organization], rows))
+
+    return app
+
+
+async def call(app: FastAPI, path: str) -> bytes:
+    """Вызвать приложение напрямую через ASGI, без HTTP-клиента"""
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [],
+    }
+    body = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(body)
+
+
+async def measure(app: FastAPI, path: str) -> float:
+    await call(app, path)  # прогрев
+    started = time.process_time()
+    for _ in range(REQUESTS):
+        await call(app, path)
+    return (time.process_time() - started) / REQUESTS * 1000
+
+
+async def run() -> None:
+    app = make_app(make_rows(ITEMS))
+    default_body = json.loads(await call(app, "/default"))
+    assert default_body == json.loads(await call(app, "/fast"))
+
+    default_ms = await measure(app, "/default")
+    fast_ms = await measure(app, "/fast")
+    print(f"{ITEMS} organizations, CPU time per request:")
+    print(f"  response_model re-validation: {default_ms:8.2f} ms")
+    print(f"  single pass + dump_json:      {fast_ms:8.2f} ms")
+    print(f"  saved:                        {1 - fast_ms / default_ms:8.1%}")
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,71 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0001"
+down_revision: str | None = None
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "buildings",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("address", sa.String(), nullable=False),
+        sa.Column("latitude", sa.Float(), nullable=False),
+        sa.Column("longitude", sa.Float(), nullable=False),
+    )
+    op.create_index("ix_buildings_id", "buildings", ["id"])
+    op.create_index("ix_buildings_address", "buildings", ["address"], unique=True)
+
+    op.create_table(
+        "activities",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column(
+            "parent_id", sa.Integer(), sa.ForeignKey("activities.id"), nullable=True
+        ),
+    )
+    op.create_index("ix_activities_id", "activities", ["id"])
+    op.create_index("ix_activities_name", "activities", ["name"])
+
+    op.create_table(
+        "organizations",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("building_id", sa.Integer(), sa.ForeignKey("buildings.id")),
+    )
+    op.create_index("ix_organizations_id", "organizations", ["id"])
+    op.create_index("ix_organizations_name", "organizations", ["name"])
+
+    op.create_table(
+        "organization_phones",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("phone_number", sa.String(), nullable=False),
+        sa.Column("organization_id", sa.Integer(), sa.ForeignKey("organizations.id")),
+    )
+    op.create_index("ix_organization_phones_id", "organization_phones", ["id"])
+
+    op.create_table(
+        "organization_activity",
+        sa.Column("organization_id", sa.Integer(), sa.ForeignKey("organizations.id")),
+        sa.Column("activity_id", sa.Integer(), sa.ForeignKey("activities.id")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("organization_activity")
+    op.drop_table("organization_phones")
+    op.drop_table("organizations")
+    op.drop_table("activities")
+    op.drop_table("buildings")
@@ -0,0 +1,66 @@
+"""relationship indexes and organization_activity primary key
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "0002"
+down_revision: str | None = "0001"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Перед созданием первичного ключа убираем неполные строки и дубликаты
+    op.execute(
+        "DELETE FROM organization_activity "
+        "WHERE organization_id IS NULL OR activity_id IS NULL"
+    )
+    op.execute(
+        "DELETE FROM organization_activity a USING organization_activity b "
+        "WHERE a.ctid < b.ctid "
+        "AND a.organization_id = b.organization_id "
+        "AND a.activity_id = b.activity_id"
+    )
+    op.alter_column("organization_activity", "organization_id", nullable=False)
+    op.alter_column("organization_activity", "activity_id", nullable=False)
+    op.create_primary_key(
+        "organization_activity_pkey",
+        "organization_activity",
+        ["organization_id", "activity_id"],
+    )
+    op.create_index(
+        "ix_organization_activity_activity_id",
+        "organization_activity",
+        ["activity_id"],
+    )
+
+    op.create_index(
+        "ix_organization_phones_organization_id",
+        "organization_phones",
+        ["organization_id"],
+    )
+    op.create_index("ix_organizations_building_id", "organizations", ["building_id"])
+    op.create_index("ix_activities_parent_id", "activities", ["parent_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_activities_parent_id", table_name="activities")
+    op.drop_index("ix_organizations_building_id", table_name="organizations")
+    op.drop_index(
+        "ix_organization_phones_organization_id", table_name="organization_phones"
+    )
+    op.drop_index(
+        "ix_organization_activity_activity_id", table_name="organization_activity"
+    )
+    op.drop_constraint(
+        "organization_activity_pkey", "organization_activity", type_="primary"
+    )
+    op.alter_column("organization_activity", "activity_id", nullable=True)
+    op.alter_column("organization_activity", "organization_id", nullable=True)
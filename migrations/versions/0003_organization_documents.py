@@ -0,0 +1,142 @@
+"""organization read model documents
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0003"
+down_revision: str | None = "0002"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "organization_documents",
+        sa.Column(
+            "organization_id",
+            sa.Integer(),
+            sa.ForeignKey("organizations.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("building_id", sa.Integer(), nullable=False),
+        sa.Column("latitude", sa.Float(), nullable=False),
+        sa.Column("longitude", sa.Float(), nullable=False),
+        sa.Column(
+            "activity_ids",
+            postgresql.ARRAY(sa.Integer()),
+            nullable=False,
+            server_default="{}",
+        ),
+        sa.Column(
+            "activity_path_ids",
+            postgresql.ARRAY(sa.Integer()),
+            nullable=False,
+            server_default="{}",
+        ),
+        sa.Column("document", postgresql.JSONB(), nullable=False),
+    )
+    op.create_index(
+        "ix_organization_documents_name", "organization_documents", ["name"]
+    )
+    op.create_index(
+        "ix_organization_documents_building_id",
+        "organization_documents",
+        ["building_id"],
+    )
+    op.create_index(
+        "ix_organization_documents_activity_path_ids",
+        "organization_documents",
+        ["activity_path_ids"],
+        postgresql_using="gin",
+    )
+
+    # Заполняем документы для уже существующих организаций
+    op.execute(
+        """
+        WITH RECURSIVE ancestors(activity_id, ancestor_id) AS (
+            SELECT id, id FROM activities
+            UNION
+            SELECT ancestors.activity_id, activities.parent_id
+            FROM ancestors
+            JOIN activities ON activities.id = ancestors.ancestor_id
+            WHERE activities.parent_id IS NOT NULL
+        )
+        INSERT INTO organization_documents (
+            organization_id, name, building_id, latitude, longitude,
+            activity_ids, activity_path_ids, document
+        )
+        SELECT
+            o.id,
+            o.name,
+            o.building_id,
+            b.latitude,
+            b.longitude,
+            ARRAY(
+                SELECT oa.activity_id
+                FROM organization_activity oa
+                WHERE oa.organization_id = o.id
+                ORDER BY oa.activity_id
+            ),
+            ARRAY(
+                SELECT DISTINCT an.ancestor_id
+                FROM organization_activity oa
+                JOIN ancestors an ON an.activity_id = oa.activity_id
+                WHERE oa.organization_id = o.id
+                ORDER BY an.ancestor_id
+            ),
+            jsonb_build_object(
+                'id', o.id,
+                'name', o.name,
+                'building_id', o.building_id,
+                'building', jsonb_build_object(
+                    'id', b.id,
+                    'address', b.address,
+                    'latitude', b.latitude,
+                    'longitude', b.longitude
+                ),
+                'phone_numbers', COALESCE(
+                    (
+                        SELECT jsonb_agg(
+                            jsonb_build_object(
+                                'id', p.id, 'phone_number', p.phone_number
+                            )
+                            ORDER BY p.id
+                        )
+                        FROM organization_phones p
+                        WHERE p.organization_id = o.id
+                    ),
+                    '[]'::jsonb
+                ),
+                'activities', COALESCE(
+                    (
+                        SELECT jsonb_agg(
+                            jsonb_build_object(
+                                'id', a.id, 'name', a.name, 'parent_id', a.parent_id
+                            )
+                            ORDER BY a.id
+                        )
+                        FROM organization_activity oa
+                        JOIN activities a ON a.id = oa.activity_id
+                        WHERE oa.organization_id = o.id
+                    ),
+                    '[]'::jsonb
+                )
+            )
+        FROM organizations o
+        JOIN buildings b ON b.id = o.building_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("organization_documents")
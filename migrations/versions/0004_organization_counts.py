@@ -0,0 +1,75 @@
+"""organization counts per building and activity subtree
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0004"
+down_revision: str | None = "0003"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "activity_organization_counts",
+        sa.Column(
+            "activity_id",
+            sa.Integer(),
+            sa.ForeignKey("activities.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("organization_count", sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        "building_organization_counts",
+        sa.Column(
+            "building_id",
+            sa.Integer(),
+            sa.ForeignKey("buildings.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("organization_count", sa.Integer(), nullable=False),
+    )
+
+    # Начальные значения счётчиков по существующим данным
+    op.execute(
+        """
+        INSERT INTO building_organization_counts (building_id, organization_count)
+        SELECT building_id, count(*)
+        FROM organizations
+        WHERE building_id IS NOT NULL
+        GROUP BY building_id
+        """
+    )
+    op.execute(
+        """
+        WITH RECURSIVE ancestors(activity_id, ancestor_id) AS (
+            SELECT id, id FROM activities
+            UNION
+            SELECT ancestors.activity_id, activities.parent_id
+            FROM ancestors
+            JOIN activities ON activities.id = ancestors.ancestor_id
+            WHERE activities.parent_id IS NOT NULL
+        )
+        INSERT INTO activity_organization_counts (activity_id, organization_count)
+        SELECT an.ancestor_id, count(DISTINCT oa.organization_id)
+        FROM organization_activity oa
+        JOIN organizations o ON o.id = oa.organization_id
+        JOIN ancestors an ON an.activity_id = oa.activity_id
+        WHERE o.building_id IS NOT NULL
+        GROUP BY an.ancestor_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("building_organization_counts")
+    op.drop_table("activity_organization_counts")
@@ -0,0 +1,30 @@
+"""organization document location index for combined search
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "0005"
+down_revision: str | None = "0004"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_organization_documents_location",
+        "organization_documents",
+        ["latitude", "longitude"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_organization_documents_location", table_name="organization_documents"
+    )
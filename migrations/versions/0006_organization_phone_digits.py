@@ -0,0 +1,41 @@
+"""normalized organization phone digits
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0006"
+down_revision: str | None = "0005"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "organization_phones",
+        sa.Column("phone_digits", sa.String(), nullable=False, server_default=""),
+    )
+    op.execute(
+        "UPDATE organization_phones "
+        "SET phone_digits = regexp_replace(phone_number, '\\D', '', 'g')"
+    )
+    op.create_index(
+        "ix_organization_phones_phone_digits",
+        "organization_phones",
+        ["phone_digits"],
+        postgresql_ops={"phone_digits": "text_pattern_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_organization_phones_phone_digits", table_name="organization_phones"
+    )
+    op.drop_column("organization_phones", "phone_digits")
@@ -0,0 +1,83 @@
+"""entity timestamps and change log for delta sync
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0007"
+down_revision: str | None = "0006"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+TABLES = ("activities", "buildings", "organizations")
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.add_column(
+            table,
+            sa.Column(
+                "created_at",
+                sa.DateTime(timezone=True),
+                nullable=False,
+                server_default=sa.func.now(),
+            ),
+        )
+        op.add_column(
+            table,
+            sa.Column(
+                "updated_at",
+                sa.DateTime(timezone=True),
+                nullable=False,
+                server_default=sa.func.now(),
+            ),
+        )
+        op.create_index(f"ix_{table}_updated_at", table, ["updated_at"])
+
+    op.create_table(
+        "changes",
+        sa.Column("id", sa.BigInteger(), sa.Identity(), primary_key=True),
+        sa.Column(
+            "txid",
+            sa.BigInteger(),
+            nullable=False,
+            server_default=sa.text("pg_current_xact_id()::text::bigint"),
+        ),
+        sa.Column("entity_type", sa.String(), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column("operation", sa.String(), nullable=False),
+        sa.Column(
+            "changed_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    )
+    op.create_index("ix_changes_txid_id", "changes", ["txid", "id"])
+
+    # Существующие сущности попадают в журнал, чтобы реплика могла начать
+    # синхронизацию с пустого курсора
+    for entity_type, table in (
+        ("activity", "activities"),
+        ("building", "buildings"),
+        ("organization", "organizations"),
+    ):
+        op.execute(
+            f"INSERT INTO changes (entity_type, entity_id, operation) "
+            f"SELECT '{entity_type}', id, 'upsert' FROM {table} ORDER BY id"
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("changes")
+    for table in TABLES:
+        op.drop_index(f"ix_{table}_updated_at", table_name=table)
+        op.drop_column(table, "updated_at")
+        op.drop_column(table, "created_at")
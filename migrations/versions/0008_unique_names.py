@@ -0,0 +1,56 @@
+"""unique organization names and activity names per parent
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0008"
+down_revision: str | None = "0007"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def _duplicates(query: str) -> list[str]:
+    rows = op.get_bind().execute(sa.text(query)).all()
+    return [f"{key} (ids {', '.join(map(str, ids))})" for key, ids in rows]
+
+
+def upgrade() -> None:
+    # У дубликатов есть телефоны, связи и дочерние деятельности, поэтому
+    # удалять их молча нельзя: миграция останавливается со списком конфликтов
+    duplicates = _duplicates(
+        "SELECT 'organization ' || quote_literal(name), array_agg(id ORDER BY id) "
+        "FROM organizations GROUP BY name HAVING count(*) > 1 ORDER BY name"
+    ) + _duplicates(
+        "SELECT concat_ws(' under parent ', 'activity ' || quote_literal(name), "
+        "parent_id), array_agg(id ORDER BY id) FROM activities "
+        "GROUP BY parent_id, name HAVING count(*) > 1 ORDER BY parent_id, name"
+    )
+    if duplicates:
+        raise RuntimeError(
+            "Cannot add unique name indexes, rename or merge the duplicates "
+            "first:\n" + "\n".join(duplicates)
+        )
+
+    op.drop_index("ix_organizations_name", table_name="organizations")
+    op.create_index("ix_organizations_name", "organizations", ["name"], unique=True)
+    op.create_index(
+        "ux_activities_parent_id_name",
+        "activities",
+        ["parent_id", "name"],
+        unique=True,
+        postgresql_nulls_not_distinct=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ux_activities_parent_id_name", table_name="activities")
+    op.drop_index("ix_organizations_name", table_name="organizations")
+    op.create_index("ix_organizations_name", "organizations", ["name"])
@@ -0,0 +1,56 @@
+"""delete organization phones and activity links with the organization
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0009"
+down_revision: str | None = "0008"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# (ограничение, таблица, колонка) строк, принадлежащих организации
+_OWNED = (
+    (
+        "organization_phones_organization_id_fkey",
+        "organization_phones",
+        "organization_id",
+    ),
+    (
+        "organization_activity_organization_id_fkey",
+        "organization_activity",
+        "organization_id",
+    ),
+)
+
+
+def _recreate_foreign_keys(ondelete: str | None) -> None:
+    for name, table, column in _OWNED:
+        op.drop_constraint(name, table, type_="foreignkey")
+        op.create_foreign_key(
+            name, table, "organizations", [column], ["id"], ondelete=ondelete
+        )
+
+
+def upgrade() -> None:
+    # ORM-удаление отвязывало телефоны вместо удаления
+    op.execute("DELETE FROM organization_phones WHERE organization_id IS NULL")
+    op.alter_column("organization_phones", "organization_id", nullable=False)
+    _recreate_foreign_keys("CASCADE")
+
+
+def downgrade() -> None:
+    _recreate_foreign_keys(None)
+    op.alter_column(
+        "organization_phones",
+        "organization_id",
+        existing_type=sa.Integer(),
+        nullable=True,
+    )
@@ -0,0 +1,258 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+LOOKUP = "lookup"
+SEARCH = "search"
+WRITE = "write"
+
+_WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+# Поток изменений не обращается к БД и открыт долго, слот ему не нужен
+_UNLIMITED_PREFIXES = (
+    "/admin",
+    "/docs",
+    "/redoc",
+    "/openapi.json",
+    "/health",
+    "/ready",
+    "/changes/stream",
+)
+
+
+class Overloaded(Exception):
+    """Очередь класса маршрутов заполнена или ожидание слота истекло"""
+
+    def __init__(self, name: str, retry_after: int):
+        super().__init__(f"Route class '{name}' is overloaded")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class DbLatency:
+    """Скользящее среднее длительности SQL-запросов"""
+
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.ewma_ms: float | None = None
+        self._lock = threading.Lock()
+
+    def observe(self, elapsed_ms: float) -> None:
+        with self._lock:
+            if self.ewma_ms is None:
+                self.ewma_ms = elapsed_ms
+            else:
+                self.ewma_ms += self.alpha * (elapsed_ms - self.ewma_ms)
+
+
+db_latency = DbLatency(settings.ADMISSION_LATENCY_ALPHA)
+
+
+class AdmissionLimiter:
+    """Ограничение числа одновременных запросов одного класса маршрутов
+
+    Запросы сверх лимита ждут в очереди ограниченного размера, при полной
+    очереди сразу получают отказ. Адаптивный лимит уменьшается в разы,
+    пока средняя задержка БД выше целевой, и растёт на единицу за "окно"
+    запросов, пока она в норме.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limit: int,
+        queue_size: int,
+        adaptive: bool = False,
+        min_limit: int = 1,
+    ):
+        self.name = name
+        self.max_limit = limit
+        self.min_limit = min(min_limit, limit)
+        self.limit = float(limit)
+        self.queue_size = queue_size
+        self.adaptive = adaptive
+        self.active = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+
+    @property
+    def current_limit(self) -> int:
+        return max(self.min_limit, int(self.limit))
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    @asynccontextmanager
+    async def slot(self):
+        """Занять слот на время обработки запроса"""
+        await self._acquire()
+        try:
+            yield
+        finally:
+            self._release()
+            self._adjust()
+
+    async def _acquire(self) -> None:
+        if self.active < self.current_limit and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return
+
+        if len(self._waiters) >= self.queue_size:
+            self.rejected += 1
+            raise Overloaded(self.name, settings.ADMISSION_RETRY_AFTER_S)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, settings.ADMISSION_QUEUE_TIMEOUT_S)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # Слот уже передан этому запросу, возвращаем его следующему
+                self._release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if isinstance(e, TimeoutError):
+                self.timed_out += 1
+                raise Overloaded(self.name, settings.ADMISSION_RETRY_AFTER_S) from None
+            raise
+        self.admitted += 1
+
+    def _release(self) -> None:
+        # Слот передаётся первому ожидающему, если лимит не был уменьшен
+        while self._waiters and self.active <= self.current_limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def _adjust(self) -> None:
+        if not (self.adaptive and settings.ADMISSION_ADAPTIVE):
+            return
+        latency = db_latency.ewma_ms
+        if latency is None:
+            return
+
+        if latency > settings.ADMISSION_TARGET_LATENCY_MS:
+            now = time.monotonic()
+            if now - self._last_decrease >= settings.ADMISSION_ADJUST_INTERVAL_S:
+                self._last_decrease = now
+                self.limit = max(float(self.min_limit), self.limit * 0.9)
+                logger.info(
+                    "Admission limit for '%s' decreased to %d (db latency %.1f ms)",
+                    self.name,
+                    self.current_limit,
+                    latency,
+                )
+        elif self.limit < self.max_limit:
+            self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+
+
+# Точечные чтения не адаптируются: при деградации БД уступают тяжёлые классы
+limiters = {
+    LOOKUP: AdmissionLimiter(
+        LOOKUP, settings.ADMISSION_LOOKUP_LIMIT, settings.ADMISSION_QUEUE_SIZE
+    ),
+    SEARCH: AdmissionLimiter(
+        SEARCH,
+        settings.ADMISSION_SEARCH_LIMIT,
+        settings.ADMISSION_QUEUE_SIZE,
+        adaptive=True,
+    ),
+    WRITE: AdmissionLimiter(
+        WRITE,
+        settings.ADMISSION_WRITE_LIMIT,
+        settings.ADMISSION_QUEUE_SIZE,
+        adaptive=True,
+    ),
+}
+
+
+def classify(method: str, path: str) -> str | None:
+    """Класс маршрута для ограничения нагрузки, None - без ограничений"""
+    if path == "/" or path.startswith(_UNLIMITED_PREFIXES):
+        return None
+    if (
+        "/search" in path
+        or path.endswith("/tree")
+        or "/activity/" in path
+        or path.startswith("/export")
+    ):
+        return SEARCH
+    if method in _WRITE_METHODS:
+        return WRITE
+    return LOOKUP
+
+
+def limiter_for(method: str, path: str) -> AdmissionLimiter | None:
+    route_class = classify(method, path)
+    return limiters[route_class] if route_class else None
+
+
+class AdmissionMiddleware:
+    """ASGI-middleware допуска запросов по классу маршрута
+
+    Слот занят, пока ответ не отправлен целиком: потоковые ответы
+    (списки организаций, колоночная выгрузка) держат соединение БД до
+    последней части тела и должны учитываться в лимите всё это время.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.ADMISSION_ENABLED:
+            return await self.app(scope, receive, send)
+
+        limiter = limiter_for(scope["method"], scope["path"])
+        if limiter is None:
+            return await self.app(scope, receive, send)
+
+        try:
+            async with limiter.slot():
+                await self.app(scope, receive, send)
+        except Overloaded as e:
+            response = JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content={"detail": "Service overloaded, retry later"},
+                headers={"Retry-After": str(e.retry_after)},
+            )
+            await response(scope, receive, send)
+
+
+def _before_cursor_execute(conn, **_kw):
+    conn.info.setdefault("admission_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, **_kw):
+    started = conn.info["admission_start_time"].pop()
+    db_latency.observe((time.perf_counter() - started) * 1000)
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("admission_start_time"):
+        conn.info["admission_start_time"].pop()
+
+
+def install_latency_probe(engine: Engine) -> None:
+    """Подключить замер задержки БД для адаптивных лимитов"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute, named=True)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute, named=True)
+    event.listen(engine, "handle_error", _handle_error)
@@ -1,7 +1,17 @@
-from fastapi import Depends
+from fastapi import Depends, HTTPException, Query, status
 
 from ..database import get_db
-from ..service import ActivityService, BuildingService, OrganizationService
+from ..dto import ORGANIZATION_RELATIONS
+from ..service import (
+    ActivityService,
+    BuildingService,
+    ChangeService,
+    JobService,
+    OrganizationService,
+)
+from ..service.change_service import parse_cursor
+
+MAX_BATCH_IDS = 1000
 
 
 async def get_building_service(db=Depends(get_db)) -> BuildingService:
@@ -14,3 +24,75 @@ async def get_activity_service(db=Depends(get_db)) -> ActivityService:
 
 async def get_organization_service(db=Depends(get_db)) -> OrganizationService:
     return OrganizationService(db)
+
+
+async def get_change_service(db=Depends(get_db)) -> ChangeService:
+    return ChangeService(db)
+
+
+async def get_job_service(db=Depends(get_db)) -> JobService:
+    return JobService(db)
+
+
+async def get_organization_include(
+    include: str | None = Query(
+        None,
+        description=(
+            "Связи организации через запятую: "
+            f"{', '.join(ORGANIZATION_RELATIONS)}. "
+            "Пустое значение - только поля организации, без связей"
+        ),
+    ),
+) -> frozenset[str] | None:
+    if include is None:
+        return None
+
+    relations = frozenset(name.strip() for name in include.split(",") if name.strip())
+    unknown = relations.difference(ORGANIZATION_RELATIONS)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unknown relations: {', '.join(sorted(unknown))}",
+        )
+    return relations
+
+
+async def get_ids(
+    ids: str | None = Query(
+        None, description="ID через запятую для пакетного получения (до 1000)"
+    ),
+) -> list[int] | None:
+    if ids is None:
+        return None
+
+    try:
+        parsed = [int(value) for value in ids.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="ids must be a comma-separated list of integers",
+        ) from None
+    if len(parsed) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"No more than {MAX_BATCH_IDS} ids per request",
+        )
+    # Дубликаты убираем, порядок первого вхождения сохраняем
+    return list(dict.fromkeys(parsed))
+
+
+async def get_change_cursor(
+    since: str | None = Query(
+        None, description="Курсор из предыдущего ответа, без него - с начала журнала"
+    ),
+) -> tuple[int, int] | None:
+    if since is None:
+        return None
+
+    try:
+        return parse_cursor(since)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="since must be a cursor returned by /changes",
+        ) from None
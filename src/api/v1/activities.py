@@ -1,25 +1,45 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 
-from ...dto import Activity, ActivityTree
+from ...database import transaction
+from ...dto import Activity, ActivityOrganizationCount, ActivityTree
 from ...security import verify_api_key
+from ...serialization import json_response
 from ...service import ActivityService
+from ...singleflight import single_flight
 from ..dependencies import get_activity_service
 
 router = APIRouter(
     prefix="/activities", tags=["activities"], dependencies=[Depends(verify_api_key)]
 )
 
+activity_tree_flight = single_flight("activities.tree")
+
 
 @router.get("/", response_model=list[Activity])
 async def get_activities(service: ActivityService = Depends(get_activity_service)):
-    return await service.get_all_activities()
+    activities = await service.get_all_activities()
+    return json_response(list[Activity], activities)
 
 
 @router.get("/tree", response_model=list[ActivityTree])
-async def get_activity_tree(
-    max_level: int = 3, service: ActivityService = Depends(get_activity_service)
+async def get_activity_tree(max_level: int = 3):
+    async def load_tree():
+        async with transaction() as db:
+            return await ActivityService(db).get_activity_tree(max_level)
+
+    # Ключ API уже проверен зависимостью роутера, дерево от клиента не зависит.
+    # Общий результат - DTO: Response у каждого запроса свой, его меняют
+    # внешние слои
+    tree = await activity_tree_flight.do(max_level, load_tree)
+    return json_response(list[ActivityTree], tree)
+
+
+@router.get("/counts", response_model=list[ActivityOrganizationCount])
+async def get_activity_counts(
+    service: ActivityService = Depends(get_activity_service),
 ):
-    return await service.get_activity_tree(max_level)
+    counts = await service.get_activity_counts()
+    return json_response(list[ActivityOrganizationCount], counts)
 
 
 @router.get("/{activity_id}", response_model=Activity)
@@ -31,4 +51,4 @@ async def get_activity(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Activity not found"
         )
-    return activity
+    return json_response(Activity, activity)
@@ -0,0 +1,140 @@
+from datetime import UTC, datetime
+
+from fastapi import APIRouter, Depends, Query, status
+
+from ...admission import db_latency, limiters
+from ...change_feed import broadcaster
+from ...config import settings
+from ...dto import (
+    AdmissionClassStats,
+    AdmissionStatus,
+    ChangeFeedStats,
+    ExistenceFilterStats,
+    OrganizationCountsRecompute,
+    SingleFlightStats,
+    SlowQuery,
+    SnapshotStats,
+    WriteBatcherStats,
+)
+from ...existence_filter import existence_filters
+from ...recompute_counts import recompute_counts
+from ...security import verify_api_key
+from ...singleflight import single_flight_stats
+from ...slow_query import slow_query_registry
+from ...snapshot import snapshot_store
+from ...write_batcher import write_batcher_stats
+
+router = APIRouter(
+    prefix="/admin", tags=["admin"], dependencies=[Depends(verify_api_key)]
+)
+
+
+@router.get("/slow-queries", response_model=list[SlowQuery])
+async def get_slow_queries(limit: int = Query(20, ge=1, le=500)):
+    return slow_query_registry.top(limit)
+
+
+@router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_slow_queries():
+    slow_query_registry.reset()
+
+
+@router.get("/single-flight", response_model=list[SingleFlightStats])
+async def get_single_flight_stats():
+    return single_flight_stats()
+
+
+@router.get("/write-batches", response_model=list[WriteBatcherStats])
+async def get_write_batcher_stats():
+    return write_batcher_stats()
+
+
+@router.get("/admission", response_model=AdmissionStatus)
+async def get_admission_status():
+    return AdmissionStatus(
+        db_latency_ms=db_latency.ewma_ms,
+        classes=[
+            AdmissionClassStats.model_validate(limiter) for limiter in limiters.values()
+        ],
+    )
+
+
+@router.get("/change-feed", response_model=ChangeFeedStats)
+async def get_change_feed_stats():
+    return ChangeFeedStats(
+        subscribers=len(broadcaster.subscribers),
+        published=broadcaster.published,
+        dropped=broadcaster.dropped,
+    )
+
+
+def _snapshot_stats() -> SnapshotStats:
+    snapshot = snapshot_store.current
+    if snapshot is None:
+        return SnapshotStats(
+            enabled=settings.SNAPSHOT_ENABLED,
+            loaded=False,
+            refreshes=snapshot_store.refreshes,
+        )
+    return SnapshotStats(
+        enabled=settings.SNAPSHOT_ENABLED,
+        loaded=True,
+        refreshes=snapshot_store.refreshes,
+        built_at=datetime.fromtimestamp(snapshot.built_at, UTC),
+        build_ms=snapshot.build_ms,
+        organizations=len(snapshot.organizations),
+        buildings=len(snapshot.buildings),
+        activities=len(snapshot.activities),
+    )
+
+
+@router.get("/snapshot", response_model=SnapshotStats)
+async def get_snapshot_stats():
+    return _snapshot_stats()
+
+
+@router.post("/snapshot/refresh", response_model=SnapshotStats)
+async def refresh_snapshot():
+    await snapshot_store.refresh()
+    return _snapshot_stats()
+
+
+def _existence_filter_stats() -> list[ExistenceFilterStats]:
+    stats = []
+    for existence_filter in existence_filters:
+        bloom = existence_filter.bloom
+        stats.append(
+            ExistenceFilterStats(
+                name=existence_filter.name,
+                loaded=bloom is not None,
+                rebuilds=existence_filter.rebuilds,
+                checks=existence_filter.checks,
+                skipped=existence_filter.skipped,
+                false_positives=existence_filter.false_positives,
+                false_positive_rate=existence_filter.false_positive_rate,
+            )
+        )
+        if bloom is not None:
+            stats[-1].items = bloom.items
+            stats[-1].bits = bloom.size
+            stats[-1].hashes = bloom.hashes
+            stats[-1].expected_false_positive_rate = bloom.expected_error_rate
+    return stats
+
+
+@router.get("/existence-filters", response_model=list[ExistenceFilterStats])
+async def get_existence_filter_stats():
+    return _existence_filter_stats()
+
+
+@router.post("/existence-filters/rebuild", response_model=list[ExistenceFilterStats])
+async def rebuild_existence_filters():
+    await existence_filters.rebuild()
+    return _existence_filter_stats()
+
+
+@router.post(
+    "/organization-counts/recompute", response_model=OrganizationCountsRecompute
+)
+async def recompute_organization_counts():
+    return await recompute_counts()
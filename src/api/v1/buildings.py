@@ -1,23 +1,43 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 
-from ...dto import Building, CoordinateRange, RadiusSearch
+from ...database import transaction
+from ...dto import Building, BuildingOrganizationCount, CoordinateRange, RadiusSearch
 from ...security import verify_api_key
+from ...serialization import json_response
 from ...service import BuildingService
-from ..dependencies import get_building_service
+from ...singleflight import single_flight
+from ..dependencies import get_building_service, get_ids
 
 router = APIRouter(
     prefix="/buildings", tags=["buildings"], dependencies=[Depends(verify_api_key)]
 )
 
+range_search_flight = single_flight("buildings.search.range")
+radius_search_flight = single_flight("buildings.search.radius")
+
 
 @router.get("/", response_model=list[Building])
 async def get_buildings(
+    skip: int = 0,
+    limit: int = 100,
+    ids: list[int] | None = Depends(get_ids),
+    service: BuildingService = Depends(get_building_service),
+):
+    if ids is not None:
+        buildings = await service.get_buildings_by_ids(ids)
+    else:
+        buildings = await service.get_all_buildings(skip=skip, limit=limit)
+    return json_response(list[Building], buildings)
+
+
+@router.get("/counts", response_model=list[BuildingOrganizationCount])
+async def get_building_counts(
     skip: int = 0,
     limit: int = 100,
     service: BuildingService = Depends(get_building_service),
 ):
-    buildings = await service.get_all_buildings()
-    return buildings[skip : skip + limit]
+    counts = await service.get_building_counts(skip=skip, limit=limit)
+    return json_response(list[BuildingOrganizationCount], counts)
 
 
 @router.get("/{building_id}", response_model=Building)
@@ -29,19 +49,26 @@ async def get_building(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Building not found"
         )
-    return building
+    return json_response(Building, building)
 
 
 @router.post("/search/range", response_model=list[Building])
-async def search_buildings_in_range(
-    coord_range: CoordinateRange,
-    service: BuildingService = Depends(get_building_service),
-):
-    return await service.get_buildings_in_range(coord_range)
+async def search_buildings_in_range(coord_range: CoordinateRange):
+    async def load_buildings():
+        async with transaction() as db:
+            return await BuildingService(db).get_buildings_in_range(coord_range)
+
+    key = tuple(coord_range.model_dump().values())
+    buildings = await range_search_flight.do(key, load_buildings)
+    return json_response(list[Building], buildings)
 
 
 @router.post("/search/radius", response_model=list[Building])
-async def search_buildings_in_radius(
-    search: RadiusSearch, service: BuildingService = Depends(get_building_service)
-):
-    return await service.get_buildings_in_radius(search)
+async def search_buildings_in_radius(search: RadiusSearch):
+    async def load_buildings():
+        async with transaction() as db:
+            return await BuildingService(db).get_buildings_in_radius(search)
+
+    key = tuple(search.model_dump().values())
+    buildings = await radius_search_flight.do(key, load_buildings)
+    return json_response(list[Building], buildings)
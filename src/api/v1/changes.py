@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from ...change_feed import broadcaster, stream_events
+from ...config import settings
+from ...dto import ChangeFeedFilter, ChangePage
+from ...security import verify_api_key
+from ...serialization import json_response
+from ...service import ChangeService
+from ..dependencies import get_change_cursor, get_change_service
+
+router = APIRouter(
+    prefix="/changes", tags=["changes"], dependencies=[Depends(verify_api_key)]
+)
+
+
+@router.get("/", response_model=ChangePage)
+async def get_changes(
+    cursor: tuple[int, int] | None = Depends(get_change_cursor),
+    limit: int = Query(100, ge=1, le=1000),
+    service: ChangeService = Depends(get_change_service),
+):
+    page = await service.get_changes(cursor, limit)
+    return json_response(ChangePage, page)
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_changes(change_filter: ChangeFeedFilter = Query()):
+    """Поток изменений в формате Server-Sent Events
+
+    Доставка не гарантирована: после события reset или переподключения
+    пропущенное догружается через /changes.
+    """
+    if not settings.CHANGE_FEED_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Change feed is disabled"
+        )
+
+    # Лимит проверяем до ответа, чтобы вернуть 503, а не оборванный поток
+    if broadcaster.full:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many change feed subscribers",
+            headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_S)},
+        )
+
+    async def events():
+        with broadcaster.subscribe(change_filter) as subscriber:
+            async for chunk in stream_events(subscriber):
+                yield chunk
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
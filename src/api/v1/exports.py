@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from ...columnar_export import MEDIA_TYPES, SUFFIXES, export_available, export_stream
+from ...database import get_db
+from ...dto import ExportFormat, ExportTable
+from ...security import verify_api_key
+
+router = APIRouter(
+    prefix="/export", tags=["export"], dependencies=[Depends(verify_api_key)]
+)
+
+
+@router.get("/{table}", response_class=StreamingResponse)
+async def export_table(
+    table: ExportTable,
+    export_format: ExportFormat = Query("arrow", alias="format"),
+    db=Depends(get_db),
+):
+    """Выгрузка таблицы справочника потоком Arrow IPC или файлом Parquet"""
+    if not export_available():
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Columnar export requires pyarrow",
+        )
+
+    filename = table + SUFFIXES[export_format]
+    return StreamingResponse(
+        export_stream(db, table, export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,73 @@
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
+
+from ...columnar_export import export_available
+from ...config import settings
+from ...database import transaction
+from ...dto import Job, JobCreate, JobStatus
+from ...jobs import job_runner
+from ...security import verify_api_key
+from ...service import JobService
+from ..dependencies import get_job_service
+
+router = APIRouter(
+    prefix="/jobs", tags=["jobs"], dependencies=[Depends(verify_api_key)]
+)
+
+
+@router.post("/", response_model=Job, status_code=status.HTTP_202_ACCEPTED)
+async def create_job(job_data: JobCreate = Body(...)):
+    """Поставить тяжёлую операцию в очередь фоновых задач"""
+    if job_data.kind == "rebuild_snapshot" and not settings.SNAPSHOT_FILE:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="SNAPSHOT_FILE is not set"
+        )
+    if job_data.kind == "export" and not export_available():
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Columnar export requires pyarrow",
+        )
+
+    # Задача фиксируется до пробуждения исполнителя, иначе он её не увидит
+    async with transaction() as db:
+        job = await JobService(db).create_job(job_data)
+    job_runner.notify()
+    return job
+
+
+@router.get("/", response_model=list[Job])
+async def get_jobs(
+    job_status: JobStatus | None = Query(None, alias="status"),
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    service: JobService = Depends(get_job_service),
+):
+    return await service.get_jobs(job_status, skip, limit)
+
+
+@router.get("/{job_id}", response_model=Job)
+async def get_job(job_id: int, service: JobService = Depends(get_job_service)):
+    """Состояние и прогресс задачи"""
+    job = await service.get_job(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Job not found"
+        )
+    return job
+
+
+@router.post(
+    "/{job_id}/cancel", response_model=Job, status_code=status.HTTP_202_ACCEPTED
+)
+async def cancel_job(job_id: int, service: JobService = Depends(get_job_service)):
+    """Отменить задачу: из очереди - сразу, выполняемую - на ближайшем шаге"""
+    job = await service.cancel_job(job_id)
+    if not job:
+        if await service.get_job(job_id):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT, detail="Job is already finished"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Job not found"
+        )
+    job_runner.cancel(job_id)
+    return job
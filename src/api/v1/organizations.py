@@ -1,11 +1,26 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 
-from ...dto import Organization, OrganizationCreate
+from ...config import settings
+from ...database import transaction
+from ...dto import (
+    Organization,
+    OrganizationBulkDelete,
+    OrganizationBulkDeleteResult,
+    OrganizationCreate,
+    OrganizationPartial,
+    OrganizationSearch,
+    OrganizationSearchResult,
+    OrganizationUpdate,
+)
 from ...security import verify_api_key
+from ...serialization import json_response, json_stream
 from ...service import ActivityService, BuildingService, OrganizationService
+from ...write_batcher import write_batcher
 from ..dependencies import (
     get_activity_service,
     get_building_service,
+    get_ids,
+    get_organization_include,
     get_organization_service,
 )
 
@@ -15,28 +30,88 @@ router = APIRouter(
     dependencies=[Depends(verify_api_key)],
 )
 
+Include = frozenset[str] | None
+
+
+async def _create_organizations(organizations: list[OrganizationCreate]):
+    async with transaction() as db:
+        return await OrganizationService(db).create_organizations(organizations)
+
+
+async def _create_organization(organization_data: OrganizationCreate):
+    async with transaction() as db:
+        return await OrganizationService(db).create_organization(organization_data)
+
+
+organization_create_batcher = write_batcher(
+    "organizations.create", _create_organizations, _create_organization
+)
+
+
+def _organization_response(organization, include: Include):
+    if include is None:
+        return json_response(Organization, organization)
+    return json_response(OrganizationPartial, organization, exclude_unset=True)
+
+
+def _organizations_response(organizations, include: Include):
+    if include is None:
+        return json_response(list[Organization], organizations)
+    return json_response(list[OrganizationPartial], organizations, exclude_unset=True)
+
+
+def _organizations_stream(chunks, include: Include):
+    if include is None:
+        return json_stream(Organization, chunks)
+    return json_stream(OrganizationPartial, chunks, exclude_unset=True)
 
-@router.get("/", response_model=list[Organization])
+
+@router.get(
+    "/",
+    response_model=list[Organization] | list[OrganizationPartial],
+    response_model_exclude_unset=True,
+)
 async def get_organizations(
     skip: int = 0,
     limit: int = 100,
+    ids: list[int] | None = Depends(get_ids),
+    include: Include = Depends(get_organization_include),
+    service: OrganizationService = Depends(get_organization_service),
+):
+    if ids is not None:
+        organizations = await service.get_organizations_by_ids(ids, include)
+    else:
+        organizations = await service.get_all_organizations(
+            skip=skip, limit=limit, include=include
+        )
+    return _organizations_response(organizations, include)
+
+
+@router.get("/search", response_model=OrganizationSearchResult)
+async def search_organizations(
+    criteria: OrganizationSearch = Query(),
     service: OrganizationService = Depends(get_organization_service),
 ):
-    organizations = await service.get_all_organizations()
-    return organizations[skip : skip + limit]
+    result = await service.search_organizations(criteria)
+    return json_response(OrganizationSearchResult, result)
 
 
-@router.get("/{organization_id}", response_model=Organization)
+@router.get(
+    "/{organization_id}",
+    response_model=Organization | OrganizationPartial,
+    response_model_exclude_unset=True,
+)
 async def get_organization(
     organization_id: int,
+    include: Include = Depends(get_organization_include),
     service: OrganizationService = Depends(get_organization_service),
 ):
-    organization = await service.get_organization_by_id(organization_id)
+    organization = await service.get_organization_by_id(organization_id, include)
     if not organization:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Organization not found"
         )
-    return organization
+    return _organization_response(organization, include)
 
 
 @router.post("/", response_model=Organization)
@@ -44,20 +119,88 @@ async def create_organization(
     organization_data: OrganizationCreate,
     service: OrganizationService = Depends(get_organization_service),
 ):
-    return await service.create_organization(organization_data)
+    if settings.WRITE_BATCHING_ENABLED:
+        # Сессия запроса не используется: пакет открывает свою транзакцию
+        organization = await organization_create_batcher.submit(organization_data)
+    else:
+        organization = await service.create_organization(organization_data)
+    return json_response(Organization, organization)
 
 
-@router.get("/search/name", response_model=list[Organization])
+@router.patch("/{organization_id}", response_model=Organization)
+async def update_organization(
+    organization_id: int,
+    update_data: OrganizationUpdate,
+    service: OrganizationService = Depends(get_organization_service),
+):
+    organization = await service.update_organization(organization_id, update_data)
+    if not organization:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Organization not found"
+        )
+    return json_response(Organization, organization)
+
+
+@router.delete("/{organization_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_organization(
+    organization_id: int,
+    service: OrganizationService = Depends(get_organization_service),
+):
+    if not await service.delete_organization(organization_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Organization not found"
+        )
+
+
+@router.post("/bulk-delete", response_model=OrganizationBulkDeleteResult)
+async def delete_organizations(
+    criteria: OrganizationBulkDelete,
+    service: OrganizationService = Depends(get_organization_service),
+):
+    deleted = await service.delete_organizations(criteria)
+    return OrganizationBulkDeleteResult(deleted=len(deleted), ids=deleted)
+
+
+@router.get(
+    "/search/name",
+    response_model=list[Organization] | list[OrganizationPartial],
+    response_model_exclude_unset=True,
+)
 async def search_organizations_by_name(
     name: str = Query(..., description="Organization name to search"),
+    include: Include = Depends(get_organization_include),
     service: OrganizationService = Depends(get_organization_service),
 ):
-    return await service.search_organizations_by_name(name)
+    if settings.STREAMING_RESPONSES_ENABLED:
+        chunks = await service.stream_organizations_by_name(name, include)
+        return _organizations_stream(chunks, include)
+    organizations = await service.search_organizations_by_name(name, include)
+    return _organizations_response(organizations, include)
 
 
-@router.get("/building/{building_id}", response_model=list[Organization])
+@router.get(
+    "/search/phone",
+    response_model=list[Organization] | list[OrganizationPartial],
+    response_model_exclude_unset=True,
+)
+async def search_organizations_by_phone(
+    phone: str = Query(..., description="Phone number in any format"),
+    prefix: bool = Query(False, description="Match numbers starting with phone"),
+    include: Include = Depends(get_organization_include),
+    service: OrganizationService = Depends(get_organization_service),
+):
+    organizations = await service.search_organizations_by_phone(phone, prefix, include)
+    return _organizations_response(organizations, include)
+
+
+@router.get(
+    "/building/{building_id}",
+    response_model=list[Organization] | list[OrganizationPartial],
+    response_model_exclude_unset=True,
+)
 async def get_organizations_by_building(
     building_id: int,
+    include: Include = Depends(get_organization_include),
     organization_service: OrganizationService = Depends(get_organization_service),
     building_service: BuildingService = Depends(get_building_service),
 ):
@@ -66,12 +209,25 @@ async def get_organizations_by_building(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Building not found"
         )
-    return await organization_service.get_organizations_by_building(building_id)
+    if settings.STREAMING_RESPONSES_ENABLED:
+        chunks = await organization_service.stream_organizations_by_building(
+            building_id, include
+        )
+        return _organizations_stream(chunks, include)
+    organizations = await organization_service.get_organizations_by_building(
+        building_id, include
+    )
+    return _organizations_response(organizations, include)
 
 
-@router.get("/activity/{activity_id}", response_model=list[Organization])
+@router.get(
+    "/activity/{activity_id}",
+    response_model=list[Organization] | list[OrganizationPartial],
+    response_model_exclude_unset=True,
+)
 async def get_organizations_by_activity(
     activity_id: int,
+    include: Include = Depends(get_organization_include),
     organization_service: OrganizationService = Depends(get_organization_service),
     activity_service: ActivityService = Depends(get_activity_service),
 ):
@@ -80,4 +236,12 @@ async def get_organizations_by_activity(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Activity not found"
         )
-    return await organization_service.get_organizations_by_activity(activity_id)
+    if settings.STREAMING_RESPONSES_ENABLED:
+        chunks = await organization_service.stream_organizations_by_activity(
+            activity_id, include
+        )
+        return _organizations_stream(chunks, include)
+    organizations = await organization_service.get_organizations_by_activity(
+        activity_id, include
+    )
+    return _organizations_response(organizations, include)
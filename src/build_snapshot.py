@@ -0,0 +1,71 @@
+"""Сборка файла снимка справочника для воркеров
+
+Файл пишется в SNAPSHOT_FILE, воркеры с SNAPSHOT_ENABLED открывают его
+через mmap и переоткрывают после подмены. Запуск:
+python -m src.build_snapshot [--watch]
+
+С --watch сборщик остаётся работать и пересобирает файл после изменений.
+События приходят из другого процесса, поэтому нужен CHANGE_FEED_NOTIFY;
+без него файл пересобирается раз в SNAPSHOT_MAX_AGE_S.
+"""
+
+import asyncio
+import logging
+import sys
+import time
+
+from .change_feed import listen
+from .config import settings
+from .database import engine
+from .snapshot import follow_changes, load_directory
+from .snapshot_file import write_snapshot_file
+
+logger = logging.getLogger(__name__)
+
+
+async def build_snapshot_file(path: str) -> int:
+    """Выгрузить справочник из БД и записать файл снимка, вернуть его размер"""
+    started = time.perf_counter()
+    snapshot = await load_directory()
+    size = write_snapshot_file(path, snapshot.sections(), snapshot.built_at)
+    logger.info(
+        "Snapshot file %s written: %d organizations, %d bytes in %.1f ms",
+        path,
+        len(snapshot.organizations),
+        size,
+        (time.perf_counter() - started) * 1000,
+    )
+    return size
+
+
+async def watch(path: str) -> None:
+    """Пересобирать файл после изменений в БД"""
+
+    async def rebuild() -> None:
+        try:
+            await build_snapshot_file(path)
+        except Exception:
+            # Воркеры продолжают читать прежний файл
+            logger.exception("Snapshot file build failed")
+
+    listener = asyncio.create_task(listen(engine))
+    try:
+        await follow_changes(rebuild)
+    finally:
+        listener.cancel()
+
+
+async def main(keep_watching: bool) -> None:
+    if not settings.SNAPSHOT_FILE:
+        raise SystemExit("SNAPSHOT_FILE is not set")
+    try:
+        await build_snapshot_file(settings.SNAPSHOT_FILE)
+        if keep_watching:
+            await watch(settings.SNAPSHOT_FILE)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main("--watch" in sys.argv[1:]))
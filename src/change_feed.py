@@ -0,0 +1,201 @@
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager, suppress
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .dto.change import ChangeFeedFilter
+
+logger = logging.getLogger(__name__)
+
+# Ключ в session.info с событиями, ожидающими фиксации транзакции
+PENDING_EVENTS = "change_feed_events"
+
+# Размер пакета событий в одном NOTIFY (payload ограничен 8000 байт)
+NOTIFY_BATCH_SIZE = 50
+
+_CLOSED = object()
+
+
+class Subscriber:
+    __slots__ = ("filter", "queue", "overflowed")
+
+    def __init__(self, change_filter: ChangeFeedFilter, queue_size: int):
+        self.filter = change_filter
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+
+def matches(change_filter: ChangeFeedFilter, change: dict) -> bool:
+    """Подходит ли событие под фильтр подписчика
+
+    Событие без координат (деятельность, удаление) проходит фильтр по
+    области: клиент сам отбросит незнакомые ему ID.
+    """
+    if (
+        change_filter.entity_types is not None
+        and change["entity_type"] not in change_filter.entity_types
+    ):
+        return False
+    bbox = change_filter.bbox
+    if bbox is None or change.get("latitude") is None:
+        return True
+    min_lat, max_lat, min_lng, max_lng = bbox
+    return (
+        min_lat <= change["latitude"] <= max_lat
+        and min_lng <= change["longitude"] <= max_lng
+    )
+
+
+class ChangeBroadcaster:
+    """Раздача событий изменений подписчикам внутри процесса
+
+    Подписчик - это очередь и фильтр, без отдельной задачи: тысячи
+    простаивающих соединений стоят только памяти под очереди. Медленный
+    подписчик не тормозит остальных: при переполнении очереди он помечается
+    и отключается, а пропущенное догружает через /changes.
+    """
+
+    def __init__(self, queue_size: int, max_subscribers: int):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.subscribers: set[Subscriber] = set()
+        self.published = 0
+        self.dropped = 0
+
+    @property
+    def full(self) -> bool:
+        return len(self.subscribers) >= self.max_subscribers
+
+    @contextmanager
+    def subscribe(self, change_filter: ChangeFeedFilter) -> Iterator[Subscriber]:
+        subscriber = Subscriber(change_filter, self.queue_size)
+        self.subscribers.add(subscriber)
+        try:
+            yield subscriber
+        finally:
+            self.subscribers.discard(subscriber)
+
+    def publish(self, changes: list[dict]) -> None:
+        """Разослать события подходящим подписчикам без ожидания"""
+        self.published += len(changes)
+        for subscriber in self.subscribers:
+            if subscriber.overflowed:
+                continue
+            for change in changes:
+                if not matches(subscriber.filter, change):
+                    continue
+                try:
+                    subscriber.queue.put_nowait(change)
+                except asyncio.QueueFull:
+                    subscriber.overflowed = True
+                    self.dropped += 1
+                    break
+
+    def close(self) -> None:
+        """Завершить все потоки подписчиков"""
+        for subscriber in self.subscribers:
+            subscriber.overflowed = True
+            with suppress(asyncio.QueueFull):
+                subscriber.queue.put_nowait(_CLOSED)
+
+
+broadcaster = ChangeBroadcaster(
+    settings.CHANGE_FEED_QUEUE_SIZE, settings.CHANGE_FEED_MAX_SUBSCRIBERS
+)
+
+
+def notify_payloads(changes: list[dict]) -> Iterator[str]:
+    """Разбить события на сообщения NOTIFY"""
+    for start in range(0, len(changes), NOTIFY_BATCH_SIZE):
+        yield json.dumps(changes[start : start + NOTIFY_BATCH_SIZE])
+
+
+async def stream_events(subscriber: Subscriber) -> AsyncIterator[str]:
+    """Поток Server-Sent Events для подписчика
+
+    Пока событий нет, раз в CHANGE_FEED_HEARTBEAT_S отправляется
+    комментарий, чтобы прокси не закрывали простаивающее соединение.
+    """
+    yield "retry: 3000\n\n"
+    while True:
+        try:
+            async with asyncio.timeout(settings.CHANGE_FEED_HEARTBEAT_S):
+                change = await subscriber.queue.get()
+        except TimeoutError:
+            yield ": keep-alive\n\n"
+            continue
+
+        if change is not _CLOSED:
+            yield f"event: {change['entity_type']}\ndata: {json.dumps(change)}\n\n"
+        if subscriber.overflowed and subscriber.queue.empty():
+            # Клиент должен догрузить пропущенное через /changes
+            yield "event: reset\ndata: {}\n\n"
+            return
+
+
+def _on_notify(_connection, _pid, _channel, payload: str) -> None:
+    broadcaster.publish(json.loads(payload))
+
+
+async def _listen_once(engine: AsyncEngine) -> None:
+    """Слушать канал на одном соединении до его обрыва"""
+    lost = asyncio.Event()
+
+    def on_termination(_connection) -> None:
+        lost.set()
+
+    async with engine.connect() as conn:
+        raw_connection = await conn.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+        driver_connection.add_termination_listener(on_termination)
+        await driver_connection.add_listener(settings.CHANGE_FEED_CHANNEL, _on_notify)
+        try:
+            await lost.wait()
+        finally:
+            # Соединение вернётся в пул, подписки на нём оставаться не должны
+            driver_connection.remove_termination_listener(on_termination)
+            if not driver_connection.is_closed():
+                await driver_connection.remove_listener(
+                    settings.CHANGE_FEED_CHANNEL, _on_notify
+                )
+
+
+async def listen(engine: AsyncEngine) -> None:
+    """Передавать NOTIFY из Postgres в раздачу процесса, переподключаясь при обрывах
+
+    Соединение для LISTEN берётся из пула и занято всё время работы.
+    """
+    while True:
+        try:
+            await _listen_once(engine)
+            logger.warning("Change feed listener connection lost, reconnecting")
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Change feed listener failed, reconnecting")
+        await asyncio.sleep(1)
+
+
+def _publish_pending(session: Session) -> None:
+    changes = session.info.pop(PENDING_EVENTS, None)
+    if changes:
+        broadcaster.publish(changes)
+
+
+def _discard_pending(session: Session) -> None:
+    session.info.pop(PENDING_EVENTS, None)
+
+
+def install_change_feed() -> None:
+    """Раздавать события внутри процесса после фиксации транзакции
+
+    Нужно, только когда NOTIFY выключен: иначе события приходят через LISTEN.
+    """
+    event.listen(Session, "after_commit", _publish_pending)
+    event.listen(Session, "after_rollback", _discard_pending)
@@ -0,0 +1,229 @@
+"""Колоночная выгрузка справочника в Arrow IPC и Parquet
+
+Каждая таблица (организации, здания, телефоны, деятельности и связи
+организаций с деятельностями) читается из COPY TO STDOUT в формате CSV
+блоками по EXPORT_BLOCK_SIZE байт. Разборщик pyarrow строит из блока
+буферы колонок напрямую, без объекта Python на каждое значение, и они
+пишутся в поток как есть, так что таблица целиком в памяти не собирается.
+Блок разбирается в потоке пула, пока COPY читает следующий.
+
+Запуск: python -m src.columnar_export [--format arrow|parquet]
+[--output DIR] [таблица ...]. Файлы пишутся во временные и подменяются
+через os.replace; все таблицы читаются в одном снимке REPEATABLE READ.
+
+pyarrow - необязательная зависимость: без него выгрузка недоступна.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from functools import cache
+from typing import get_args
+
+from sqlalchemy import DateTime, Float, Integer
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import settings
+from .database import engine, transaction
+from .dto import ExportFormat, ExportTable, TableExport
+from .repository import EXPORT_TABLES, ExportRepository
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pa_csv = pq = None
+
+logger = logging.getLogger(__name__)
+
+MEDIA_TYPES = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+SUFFIXES = {"arrow": ".arrow", "parquet": ".parquet"}
+
+
+def export_available() -> bool:
+    return pa is not None
+
+
+def _arrow_type(column) -> "pa.DataType":
+    if isinstance(column.type, Integer):
+        return pa.int32()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us", tz="UTC" if column.type.timezone else None)
+    return pa.string()
+
+
+@cache
+def table_schema(table: str) -> "pa.Schema":
+    """Схема Arrow таблицы по её колонкам в БД"""
+    return pa.schema(
+        pa.field(column.name, _arrow_type(column), nullable=column.nullable)
+        for column in EXPORT_TABLES[table].columns
+    )
+
+
+def read_block(schema: "pa.Schema", block: bytes) -> "pa.Table":
+    """Разобрать блок CSV из COPY в таблицу Arrow со схемой выгрузки
+
+    COPY пишет NULL пустым значением, а пустую строку - в кавычках.
+    """
+    table = pa_csv.read_csv(
+        pa.py_buffer(block),
+        read_options=pa_csv.ReadOptions(column_names=schema.names),
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+        convert_options=pa_csv.ConvertOptions(
+            column_types=schema,
+            strings_can_be_null=True,
+            quoted_strings_can_be_null=False,
+        ),
+    )
+    return table.cast(schema)
+
+
+class TableWriter:
+    """Запись пакетов одной таблицы в поток Arrow IPC или файл Parquet"""
+
+    def __init__(self, table: str, export_format: ExportFormat, sink):
+        self.schema = table_schema(table)
+        if export_format == "parquet":
+            self._writer = pq.ParquetWriter(
+                sink, self.schema, compression=settings.EXPORT_PARQUET_COMPRESSION
+            )
+        else:
+            self._writer = pa.ipc.new_stream(sink, self.schema)
+
+    def write(self, block: bytes) -> int:
+        """Записать блок CSV, вернуть число строк в нём"""
+        table = read_block(self.schema, block)
+        self._writer.write_table(table)
+        return table.num_rows
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+class _ChunkSink:
+    """Файлоподобный приёмник, отдающий записанное частями для ответа"""
+
+    def __init__(self):
+        self.closed = False
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def write_table(db: AsyncSession, table: str, writer: TableWriter) -> int:
+    """Выгрузить таблицу в писатель и закрыть его, вернуть число строк"""
+    rows_written = 0
+    async for block in ExportRepository(db).copy_csv(table, settings.EXPORT_BLOCK_SIZE):
+        rows_written += await asyncio.to_thread(writer.write, block)
+    await asyncio.to_thread(writer.close)
+    return rows_written
+
+
+async def export_stream(
+    db: AsyncSession, table: ExportTable, export_format: ExportFormat
+) -> AsyncIterator[bytes]:
+    """Тело ответа с выгрузкой таблицы: по части на блок строк"""
+    sink = _ChunkSink()
+    writer = TableWriter(table, export_format, sink)
+    async for block in ExportRepository(db).copy_csv(table, settings.EXPORT_BLOCK_SIZE):
+        await asyncio.to_thread(writer.write, block)
+        if data := sink.drain():
+            yield data
+    await asyncio.to_thread(writer.close)
+    yield sink.drain()
+
+
+async def export_directory(
+    directory: str,
+    export_format: ExportFormat,
+    tables: list[ExportTable] | None = None,
+    on_table: Callable[[TableExport], Awaitable[None]] | None = None,
+) -> list[TableExport]:
+    """Выгрузить таблицы в файлы каталога из одного снимка БД
+
+    on_table вызывается после каждой записанной таблицы.
+    """
+    os.makedirs(directory, exist_ok=True)
+    results = []
+    async with transaction() as db:
+        await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        for table in tables or get_args(ExportTable):
+            started = time.perf_counter()
+            path = os.path.join(directory, table + SUFFIXES[export_format])
+            temporary = f"{path}.tmp-{os.getpid()}"
+            try:
+                rows = await write_table(
+                    db, table, TableWriter(table, export_format, temporary)
+                )
+                os.replace(temporary, path)
+            except BaseException:
+                if os.path.exists(temporary):
+                    os.unlink(temporary)
+                raise
+            result = TableExport(
+                table=table,
+                rows=rows,
+                size_bytes=os.path.getsize(path),
+                elapsed_ms=round((time.perf_counter() - started) * 1000, 1),
+            )
+            logger.info(
+                "Exported %s: %d rows, %d bytes in %.1f ms",
+                path,
+                result.rows,
+                result.size_bytes,
+                result.elapsed_ms,
+            )
+            results.append(result)
+            if on_table is not None:
+                await on_table(result)
+    return results
+
+
+async def main(arguments: argparse.Namespace) -> None:
+    if not export_available():
+        raise SystemExit("pyarrow is not installed")
+    try:
+        results = await export_directory(
+            arguments.output, arguments.format, arguments.tables
+        )
+        for result in results:
+            print(result.model_dump_json())
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--format", choices=get_args(ExportFormat), default="parquet")
+    parser.add_argument("--output", default="export")
+    parser.add_argument("tables", nargs="*", choices=get_args(ExportTable))
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(parser.parse_args()))
@@ -18,6 +18,111 @@ class Settings(BaseSettings):
 
     API_KEY: str = "test-api-key-123"
 
+    # Сериализация DTO напрямую в JSON без повторной валидации FastAPI
+    FAST_SERIALIZATION: bool = True
+
+    # Колоночная выгрузка справочника в Arrow IPC и Parquet (нужен pyarrow)
+    # Размер блока CSV из COPY, разбираемого в один пакет Arrow, байт
+    EXPORT_BLOCK_SIZE: int = 8 * 1024 * 1024
+    EXPORT_PARQUET_COMPRESSION: str = "zstd"
+
+    # Фоновые задачи (нужна миграция 0010): свой пул соединений и лимит
+    JOBS_ENABLED: bool = True
+    JOBS_CONCURRENCY: int = 2
+    JOBS_POLL_INTERVAL_S: float = 5.0
+    JOBS_HEARTBEAT_S: float = 10.0
+    # Задачу без heartbeat дольше этого забирает другой исполнитель
+    JOBS_LEASE_S: float = 60.0
+    JOBS_MAX_ATTEMPTS: int = 3
+    JOBS_BATCH_SIZE: int = 1000
+    # Каталог выгрузок задач export, по подкаталогу на задачу
+    JOBS_EXPORT_DIR: str = "export"
+
+    # Согласование формата (MessagePack) и сжатия ответов (zstd, br, gzip)
+    CONTENT_NEGOTIATION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    GZIP_LEVEL: int = 6
+    BROTLI_QUALITY: int = 4
+    ZSTD_LEVEL: int = 3
+    # Тела от этого размера кодируются и сжимаются в потоке пула
+    ENCODING_OFFLOAD_MIN_SIZE: int = 256 * 1024
+
+    # Потоковая отдача списков организаций частями (серверный курсор, yield_per)
+    STREAMING_RESPONSES_ENABLED: bool = False
+    STREAM_CHUNK_SIZE: int = 500
+
+    # Чтение организаций из денормализованных документов
+    READ_MODEL_ENABLED: bool = True
+
+    # Объединение одинаковых одновременных запросов на чтение
+    SINGLE_FLIGHT_ENABLED: bool = True
+
+    # Ограничение нагрузки по классам маршрутов (сумма лимитов меньше пула БД)
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_LOOKUP_LIMIT: int = 20
+    ADMISSION_SEARCH_LIMIT: int = 10
+    ADMISSION_WRITE_LIMIT: int = 10
+    ADMISSION_QUEUE_SIZE: int = 100
+    ADMISSION_QUEUE_TIMEOUT_S: float = 5.0
+    ADMISSION_RETRY_AFTER_S: int = 1
+    ADMISSION_ADAPTIVE: bool = True
+    ADMISSION_TARGET_LATENCY_MS: float = 100.0
+    ADMISSION_ADJUST_INTERVAL_S: float = 1.0
+    ADMISSION_LATENCY_ALPHA: float = 0.1
+
+    # Дедлайны запросов (0 - без ограничения), передаются в statement_timeout
+    REQUEST_TIMEOUT_MS: int = 10000
+    ROUTE_TIMEOUTS_MS: dict[str, int] = {
+        "/organizations/search": 3000,
+        "/organizations/search/name": 2000,
+        "/organizations/activity/{activity_id}": 3000,
+        "/buildings/search/range": 3000,
+        "/buildings/search/radius": 3000,
+        "/activities/tree": 3000,
+        "/changes/stream": 0,
+        "/export/{table}": 0,
+    }
+
+    # Обслуживание чтений из снимка справочника в памяти вместо БД
+    SNAPSHOT_ENABLED: bool = False
+    SNAPSHOT_REFRESH_DELAY_S: float = 0.5
+    SNAPSHOT_MAX_AGE_S: float = 300.0
+    # Файл снимка, общий для воркеров (python -m src.build_snapshot)
+    SNAPSHOT_FILE: str | None = None
+
+    # Фильтры Блума перед проверками существования при записи (нужна миграция 0008)
+    EXISTENCE_FILTERS_ENABLED: bool = False
+    EXISTENCE_FILTER_ERROR_RATE: float = 0.01
+    EXISTENCE_FILTER_MIN_CAPACITY: int = 10000
+    EXISTENCE_FILTER_CHECK_INTERVAL_S: float = 60.0
+
+    # Запуск: сверка схемы с миграциями и прогрев до готовности (/ready)
+    STARTUP_SCHEMA_CHECK: bool = True
+    WARMUP_ENABLED: bool = True
+    WARMUP_POOL_CONNECTIONS: int = 10
+
+    # Групповая фиксация одновременных созданий организаций
+    WRITE_BATCHING_ENABLED: bool = False
+    WRITE_BATCH_WINDOW_MS: float = 5.0
+    WRITE_BATCH_MAX_SIZE: int = 100
+
+    # Лента изменений (SSE), между воркерами через LISTEN/NOTIFY
+    CHANGE_FEED_ENABLED: bool = True
+    CHANGE_FEED_NOTIFY: bool = True
+    CHANGE_FEED_CHANNEL: str = "entity_changes"
+    CHANGE_FEED_QUEUE_SIZE: int = 100
+    CHANGE_FEED_MAX_SUBSCRIBERS: int = 10000
+    CHANGE_FEED_HEARTBEAT_S: float = 15.0
+
+    # Журнал медленных запросов
+    SLOW_QUERY_LOG_ENABLED: bool = True
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    SLOW_QUERY_EXPLAIN: bool = False
+    SLOW_QUERY_LOG_FILE: str = "logs/slow_queries.log"
+    SLOW_QUERY_LOG_MAX_BYTES: int = 10 * 1024 * 1024
+    SLOW_QUERY_LOG_BACKUP_COUNT: int = 5
+    SLOW_QUERY_STATS_SIZE: int = 500
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,260 @@
+"""Согласование формата и сжатия ответов
+
+Маршруты отдают JSON, построенный из DTO. Промежуточный слой по заголовку
+Accept перекодирует его в MessagePack (те же данные, меньше размер и
+быстрее разбор на клиенте), а по Accept-Encoding сжимает ответ zstd,
+brotli или gzip, если он не меньше COMPRESSION_MIN_SIZE. Потоковые ответы
+сжимаются по частям и остаются JSON: MessagePack пишет длину массива в
+начало, и перекодирование потребовало бы собрать весь ответ в памяти.
+
+Большие тела кодируются и сжимаются в потоке пула, чтобы не занимать
+цикл событий. msgpack, brotli и zstandard - необязательные зависимости:
+без них соответствующий формат просто не предлагается, gzip есть всегда.
+"""
+
+import asyncio
+import json
+import zlib
+from collections.abc import Callable
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MSGPACK = "application/msgpack"
+_MSGPACK_TYPES = (MSGPACK, "application/x-msgpack")
+_JSON_TYPES = ("application/json", "application/*", "*/*")
+
+# Потоки событий (SSE) не сжимаются: их нельзя задерживать в буфере
+_COMPRESSIBLE = {"application/json", MSGPACK, "text/html", "text/plain", "text/csv"}
+
+
+def available_encodings() -> list[str]:
+    """Поддерживаемые сжатия в порядке предпочтения сервера"""
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return encodings
+
+
+def _qualities(header: str) -> dict[str, float]:
+    """Значения заголовка Accept* с их весами q"""
+    qualities = {}
+    for part in header.split(","):
+        value, *params = part.strip().split(";")
+        quality = 1.0
+        for param in params:
+            name, _, raw = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(raw)
+                except ValueError:
+                    quality = 0.0
+        if value:
+            qualities[value.strip().lower()] = quality
+    return qualities
+
+
+def prefers_msgpack(accept: str) -> bool:
+    """Клиент предпочитает MessagePack (при равных весах - названный явно)"""
+    if msgpack is None or not accept:
+        return False
+    qualities = _qualities(accept)
+    packed = max(qualities.get(media_type, 0.0) for media_type in _MSGPACK_TYPES)
+    plain = max(qualities.get(media_type, 0.0) for media_type in _JSON_TYPES)
+    return packed > 0 and packed >= plain
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """Сжатие с наибольшим весом клиента, при равных - по порядку сервера"""
+    if not accept_encoding:
+        return None
+    qualities = _qualities(accept_encoding)
+    best, best_quality = None, 0.0
+    for encoding in available_encodings():
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class Compressor:
+    """Потоковое сжатие выбранным алгоритмом с уровнем из настроек"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "zstd":
+            self._stream = zstandard.ZstdCompressor(
+                level=settings.ZSTD_LEVEL
+            ).compressobj()
+        elif encoding == "br":
+            self._stream = brotli.Compressor(quality=settings.BROTLI_QUALITY)
+        else:
+            # wbits=31 - формат gzip с заголовком и контрольной суммой
+            self._stream = zlib.compressobj(settings.GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, flush: bool = True) -> bytes:
+        """Сжать часть; flush отдаёт её клиенту сразу, не дожидаясь следующих"""
+        if self.encoding == "br":
+            return self._stream.process(data) + (self._stream.flush() if flush else b"")
+        output = self._stream.compress(data)
+        if flush:
+            mode = (
+                zstandard.COMPRESSOBJ_FLUSH_BLOCK
+                if self.encoding == "zstd"
+                else zlib.Z_SYNC_FLUSH
+            )
+            output += self._stream.flush(mode)
+        return output
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._stream.finish()
+        return self._stream.flush()
+
+
+def compress(encoding: str, data: bytes) -> bytes:
+    """Сжать тело целиком"""
+    compressor = Compressor(encoding)
+    return compressor.compress(data, flush=False) + compressor.finish()
+
+
+def json_to_msgpack(body: bytes) -> bytes:
+    """Перекодировать JSON-тело в MessagePack"""
+    return msgpack.packb(json.loads(body), use_bin_type=True)
+
+
+async def _encode(function: Callable[[bytes], bytes], data: bytes) -> bytes:
+    """Закодировать в потоке пула, если тело большое"""
+    if len(data) >= settings.ENCODING_OFFLOAD_MIN_SIZE:
+        return await asyncio.to_thread(function, data)
+    return function(data)
+
+
+class ContentNegotiationMiddleware:
+    """ASGI-слой, перекодирующий и сжимающий ответы по заголовкам запроса"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.CONTENT_NEGOTIATION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        packed = prefers_msgpack(headers.get("accept", ""))
+        encoding = choose_encoding(headers.get("accept-encoding", ""))
+        if not packed and encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await self.app(scope, receive, _NegotiatedResponse(send, packed, encoding).send)
+
+
+class _NegotiatedResponse:
+    """Отправка одного ответа: целиком, потоком со сжатием или без изменений"""
+
+    def __init__(self, send: Send, packed: bool, encoding: str | None):
+        self._send = send
+        self.packed = packed
+        self.encoding = encoding
+        self.start: Message | None = None
+        self.mode: str | None = None
+        self.transcode = False
+        self.compressible = False
+        self.chunks: list[bytes] = []
+        self.compressor: Compressor | None = None
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Список заголовков может принадлежать переиспользуемому Response:
+            # меняем только копию
+            self.start = {**message, "headers": list(message.get("headers", []))}
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.mode is None:
+            self.mode = self._choose_mode(more_body)
+            if self.mode == "stream":
+                await self._start_stream()
+            elif self.mode == "pass":
+                await self._send(self.start)
+
+        if self.mode == "pass":
+            await self._send(message)
+        elif self.mode == "stream":
+            data = await _encode(self.compressor.compress, body) if body else b""
+            if not more_body:
+                data += self.compressor.finish()
+            await self._send(
+                {"type": "http.response.body", "body": data, "more_body": more_body}
+            )
+        else:
+            self.chunks.append(body)
+            if not more_body:
+                await self._send_whole(b"".join(self.chunks))
+
+    def _choose_mode(self, more_body: bool) -> str:
+        headers = Headers(raw=self.start["headers"])
+        media_type = headers.get("content-type", "").split(";")[0].strip()
+        # Потоковый ответ не буферизуется ради MessagePack
+        self.transcode = (
+            self.packed and not more_body and media_type == "application/json"
+        )
+        self.compressible = (
+            self.encoding is not None
+            and "content-encoding" not in headers
+            and (media_type in _COMPRESSIBLE or self.transcode)
+        )
+        if not self.transcode and not self.compressible:
+            return "pass"
+        if more_body:
+            return "stream"
+        return "whole"
+
+    async def _start_stream(self) -> None:
+        headers = MutableHeaders(raw=self.start["headers"])
+        del headers["content-length"]
+        headers["content-encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        self.compressor = Compressor(self.encoding)
+        await self._send(self.start)
+
+    async def _send_whole(self, body: bytes) -> None:
+        headers = MutableHeaders(raw=self.start["headers"])
+        if self.transcode:
+            body = await _encode(json_to_msgpack, body)
+            headers["content-type"] = MSGPACK
+            headers.add_vary_header("Accept")
+        if self.compressible:
+            headers.add_vary_header("Accept-Encoding")
+            if len(body) >= settings.COMPRESSION_MIN_SIZE:
+                body = await _encode(lambda data: compress(self.encoding, data), body)
+                headers["content-encoding"] = self.encoding
+        headers["content-length"] = str(len(body))
+        await self._send(self.start)
+        await self._send({"type": "http.response.body", "body": body})
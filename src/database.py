@@ -1,11 +1,18 @@
 import logging
-from contextlib import asynccontextmanager
+from collections.abc import Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
 
 from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 
+from .admission import install_latency_probe
+from .change_feed import install_change_feed
 from .config import settings
+from .deadline import install_statement_timeout
+from .slow_query import install_slow_query_log
 
 logger = logging.getLogger(__name__)
 
@@ -21,11 +28,42 @@ engine = create_async_engine(
     max_overflow=30,
 )
 
+if settings.SLOW_QUERY_LOG_ENABLED:
+    install_slow_query_log(engine.sync_engine)
+
+if settings.ADMISSION_ENABLED and settings.ADMISSION_ADAPTIVE:
+    install_latency_probe(engine.sync_engine)
+
+install_statement_timeout()
+
+if settings.CHANGE_FEED_ENABLED and not settings.CHANGE_FEED_NOTIFY:
+    install_change_feed()
+
 # Фабрика сессий
 AsyncSessionLocal = async_sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False, autoflush=False
 )
 
+# Отдельный пул фоновых задач: долгие операции не занимают соединения запросов.
+# Задаче нужно до трёх соединений (работа, прогресс, heartbeat), ещё одно -
+# исполнителю для выборки из очереди.
+job_engine = create_async_engine(
+    settings.DATABASE_URL,
+    echo=settings.DEBUG,
+    pool_pre_ping=True,
+    pool_size=settings.JOBS_CONCURRENCY * 3 + 1,
+    max_overflow=0,
+)
+
+JobSessionLocal = async_sessionmaker(
+    job_engine, class_=AsyncSession, expire_on_commit=False, autoflush=False
+)
+
+# Фабрика сессий transaction(); исполнитель задач подставляет JobSessionLocal
+session_factory: ContextVar[async_sessionmaker] = ContextVar(
+    "session_factory", default=AsyncSessionLocal
+)
+
 
 async def get_db() -> AsyncSession:
     """Dependency для получения сессии БД с автоматическим управлением транзакциями"""
@@ -45,7 +83,7 @@ async def get_db() -> AsyncSession:
 @asynccontextmanager
 async def transaction():
     """Контекстный менеджер для явного управления транзакциями"""
-    async with AsyncSessionLocal() as session:
+    async with session_factory.get()() as session:
         try:
             logger.debug("Starting transaction")
             yield session
@@ -72,6 +110,23 @@ def with_transaction(func):
     return wrapper
 
 
+@contextmanager
+def constraint_errors(messages: dict[str, str]) -> Iterator[None]:
+    """Превратить нарушение ограничения БД в ValueError бизнес-правила
+
+    messages - сообщения по именам ограничений. Нарушение другого
+    ограничения пробрасывается как есть.
+    """
+    try:
+        yield
+    except IntegrityError as e:
+        # asyncpg сохраняет имя ограничения в исходном исключении драйвера
+        constraint = getattr(e.orig.__cause__, "constraint_name", None)
+        if constraint not in messages:
+            raise
+        raise ValueError(messages[constraint]) from e
+
+
 async def check_db_connection():
     """Проверка подключения к БД"""
     try:
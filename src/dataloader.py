@@ -0,0 +1,85 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable, Iterable
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class DataLoader(Generic[K, V]):
+    """Пакетная загрузка сущностей по ключу в рамках одного запроса
+
+    Вызовы load(), сделанные в одной итерации event loop, объединяются в
+    один вызов batch_load, а повторные ключи отдаются из кэша загрузчика.
+    batch_load получает список уникальных ключей и возвращает словарь
+    ключ -> значение; ключей, которых нет в словаре, не существует.
+    """
+
+    def __init__(
+        self,
+        batch_load: Callable[[list[K]], Awaitable[dict[K, V]]],
+        lock: asyncio.Lock | None = None,
+        max_batch_size: int = 1000,
+    ):
+        self._batch_load = batch_load
+        # Загрузчики одной сессии БД не должны выполнять запросы параллельно
+        self._lock = lock or asyncio.Lock()
+        self.max_batch_size = max_batch_size
+        self._cache: dict[K, asyncio.Future] = {}
+        self._queue: list[K] = []
+        self._tasks: set[asyncio.Task] = set()
+
+    async def load(self, key: K) -> V | None:
+        """Загрузить значение по ключу"""
+        future = self._cache.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._cache[key] = loop.create_future()
+            self._queue.append(key)
+            if len(self._queue) == 1:
+                loop.call_soon(self._schedule_dispatch)
+        return await future
+
+    async def load_many(self, keys: Iterable[K]) -> list[V | None]:
+        """Загрузить значения по списку ключей с сохранением порядка"""
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: K, value: V) -> None:
+        """Положить в кэш уже известное значение"""
+        future = self._cache.get(key)
+        if future is None or future.done():
+            future = self._cache[key] = asyncio.get_running_loop().create_future()
+        # Ожидающие загрузки этого ключа получат переданное значение
+        future.set_result(value)
+
+    def clear(self, key: K) -> None:
+        """Сбросить кэш по ключу, например после изменения сущности"""
+        future = self._cache.get(key)
+        if future is not None and future.done():
+            del self._cache[key]
+
+    def _schedule_dispatch(self) -> None:
+        queue, self._queue = self._queue, []
+        for start in range(0, len(queue), self.max_batch_size):
+            task = asyncio.create_task(
+                self._dispatch(queue[start : start + self.max_batch_size])
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, keys: list[K]) -> None:
+        try:
+            async with self._lock:
+                values = await self._batch_load(keys)
+        except Exception as e:
+            for key in keys:
+                # Ошибку не кэшируем, следующий load() повторит запрос
+                future = self._cache.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            return
+
+        for key in keys:
+            future = self._cache.get(key)
+            if future is not None and not future.done():
+                future.set_result(values.get(key))
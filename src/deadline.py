@@ -0,0 +1,128 @@
+import asyncio
+import time
+from contextvars import ContextVar
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from starlette.routing import Match
+
+from .config import settings
+
+# Момент (time.monotonic), к которому запрос должен получить ответ
+request_deadline: ContextVar[float | None] = ContextVar(
+    "request_deadline", default=None
+)
+
+_QUERY_CANCELED = "57014"
+
+# Списки организаций, которые при STREAMING_RESPONSES_ENABLED отдаются частями
+# с серверного курсора: дедлайн и statement_timeout оборвали бы тело ответа
+_STREAMED_ROUTES = frozenset(
+    {
+        "/organizations/search/name",
+        "/organizations/building/{building_id}",
+        "/organizations/activity/{activity_id}",
+    }
+)
+
+
+class DeadlineExceeded(Exception):
+    """Время на обработку запроса истекло до начала транзакции"""
+
+
+def route_path(app, scope) -> str | None:
+    """Шаблон пути маршрута, которому соответствует запрос"""
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", None)
+    return None
+
+
+def route_timeout_ms(path: str | None) -> int | None:
+    """Дедлайн маршрута в миллисекундах, None - без ограничения"""
+    if settings.STREAMING_RESPONSES_ENABLED and path in _STREAMED_ROUTES:
+        return None
+    timeout_ms = settings.ROUTE_TIMEOUTS_MS.get(path, settings.REQUEST_TIMEOUT_MS)
+    return timeout_ms if timeout_ms > 0 else None
+
+
+def remaining_ms() -> float | None:
+    """Сколько миллисекунд осталось до дедлайна текущего запроса"""
+    deadline = request_deadline.get()
+    if deadline is None:
+        return None
+    return (deadline - time.monotonic()) * 1000
+
+
+def is_query_canceled(error: DBAPIError) -> bool:
+    """Запрос отменён PostgreSQL по statement_timeout или отменой клиента"""
+    return getattr(error.orig, "sqlstate", None) == _QUERY_CANCELED
+
+
+def _set_statement_timeout(_session, _transaction, connection):
+    remaining = remaining_ms()
+    if remaining is None:
+        return
+    if remaining < 1:
+        raise DeadlineExceeded("Request deadline exceeded")
+    # SET LOCAL действует до конца транзакции и не протекает в пул
+    connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(remaining)}")
+
+
+def install_statement_timeout() -> None:
+    """Передавать остаток дедлайна запроса в statement_timeout транзакций"""
+    event.listen(Session, "after_begin", _set_statement_timeout)
+
+
+class DeadlineMiddleware:
+    """ASGI-middleware с дедлайном запроса по маршруту
+
+    Обработчик выполняется в той же задаче, поэтому по истечении дедлайна
+    отменяется вместе с ожиданием asyncpg: драйвер отправляет серверу
+    отмену запроса, и соединение возвращается в пул до ответа клиенту.
+    После отправки заголовков ответить 504 уже нельзя, поэтому дедлайн
+    снимается и тело ответа не обрывается.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        timeout_ms = route_timeout_ms(route_path(scope["app"], scope))
+        if timeout_ms is None:
+            return await self.app(scope, receive, send)
+
+        response_started = False
+        timeout = asyncio.timeout(timeout_ms / 1000)
+
+        async def send_wrapper(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                timeout.reschedule(None)
+                request_deadline.set(None)
+            await send(message)
+
+        token = request_deadline.set(time.monotonic() + timeout_ms / 1000)
+        try:
+            async with timeout:
+                await self.app(scope, receive, send_wrapper)
+        except (TimeoutError, DeadlineExceeded, DBAPIError) as e:
+            if response_started or (
+                isinstance(e, DBAPIError) and not is_query_canceled(e)
+            ):
+                raise
+            response = JSONResponse(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                content={"detail": "Request deadline exceeded"},
+            )
+            await response(scope, receive, send)
+        finally:
+            request_deadline.reset(token)
@@ -1,13 +1,51 @@
-from .activity import Activity, ActivityCreate, ActivityTree, ActivityWithChildren
+from .activity import (
+    Activity,
+    ActivityCreate,
+    ActivityOrganizationCount,
+    ActivityTree,
+    ActivityWithChildren,
+)
+from .admin import (
+    AdmissionClassStats,
+    AdmissionStatus,
+    ChangeFeedStats,
+    ExistenceFilterStats,
+    OrganizationCountsRecompute,
+    SingleFlightStats,
+    SlowQuery,
+    SnapshotStats,
+    WriteBatcherStats,
+)
 from .building import (
     Building,
     BuildingCreate,
+    BuildingOrganizationCount,
     CoordinateRange,
     RadiusSearch,
 )
+from .change import ChangeFeedFilter, ChangePage, EntityChange
+from .export import ExportFormat, ExportTable, TableExport
+from .job import (
+    BulkImportJob,
+    ExportJob,
+    Job,
+    JobCreate,
+    JobStatus,
+    RebuildDocumentsJob,
+    RebuildSnapshotJob,
+    RecomputeCountsJob,
+)
 from .organization import (
+    ORGANIZATION_RELATIONS,
     Organization,
+    OrganizationBulkDelete,
+    OrganizationBulkDeleteResult,
     OrganizationCreate,
+    OrganizationPartial,
+    OrganizationSearch,
+    OrganizationSearchFacets,
+    OrganizationSearchPlan,
+    OrganizationSearchResult,
     OrganizationSimple,
     OrganizationUpdate,
     Phone,
@@ -23,10 +61,43 @@ __all__ = [
     BuildingCreate,
     CoordinateRange,
     RadiusSearch,
+    ORGANIZATION_RELATIONS,
     Organization,
+    OrganizationBulkDelete,
+    OrganizationBulkDeleteResult,
     OrganizationCreate,
+    OrganizationPartial,
     OrganizationSimple,
     OrganizationUpdate,
     Phone,
     PhoneCreate,
+    SlowQuery,
+    SingleFlightStats,
+    WriteBatcherStats,
+    AdmissionClassStats,
+    AdmissionStatus,
+    ActivityOrganizationCount,
+    BuildingOrganizationCount,
+    OrganizationCountsRecompute,
+    OrganizationSearch,
+    OrganizationSearchFacets,
+    OrganizationSearchPlan,
+    OrganizationSearchResult,
+    EntityChange,
+    ChangePage,
+    ChangeFeedFilter,
+    ChangeFeedStats,
+    SnapshotStats,
+    ExistenceFilterStats,
+    ExportFormat,
+    ExportTable,
+    TableExport,
+    Job,
+    JobCreate,
+    JobStatus,
+    BulkImportJob,
+    ExportJob,
+    RebuildDocumentsJob,
+    RebuildSnapshotJob,
+    RecomputeCountsJob,
 ]
@@ -24,3 +24,10 @@ class ActivityWithChildren(Activity):
 class ActivityTree(Activity):
     level: int
     children: list["ActivityTree"] = []
+
+
+class ActivityOrganizationCount(BaseModel):
+    """Число организаций с деятельностью или любой из её потомков"""
+
+    activity_id: int
+    organization_count: int
@@ -0,0 +1,100 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class SlowQuery(BaseModel):
+    statement: str
+    count: int
+    total_ms: float
+    mean_ms: float
+    max_ms: float
+    origin: str | None = None
+    route: str | None = None
+    last_parameters: str | None = None
+    last_plan: str | None = None
+
+    class Config:
+        from_attributes = True
+
+
+class SingleFlightStats(BaseModel):
+    name: str
+    calls: int
+    executions: int
+    coalesced: int
+    in_flight: int
+
+    class Config:
+        from_attributes = True
+
+
+class WriteBatcherStats(BaseModel):
+    name: str
+    submitted: int
+    batches: int
+    largest_batch: int
+    fallbacks: int
+    pending: int
+
+    class Config:
+        from_attributes = True
+
+
+class AdmissionClassStats(BaseModel):
+    name: str
+    current_limit: int
+    max_limit: int
+    active: int
+    waiting: int
+    admitted: int
+    rejected: int
+    timed_out: int
+
+    class Config:
+        from_attributes = True
+
+
+class AdmissionStatus(BaseModel):
+    db_latency_ms: float | None = None
+    classes: list[AdmissionClassStats]
+
+
+class OrganizationCountsRecompute(BaseModel):
+    """Число счётчиков, исправленных полным пересчётом"""
+
+    buildings_fixed: int
+    activities_fixed: int
+
+
+class SnapshotStats(BaseModel):
+    enabled: bool
+    loaded: bool
+    refreshes: int
+    built_at: datetime | None = None
+    build_ms: float | None = None
+    organizations: int = 0
+    buildings: int = 0
+    activities: int = 0
+
+
+class ChangeFeedStats(BaseModel):
+    subscribers: int
+    published: int
+    dropped: int
+
+
+class ExistenceFilterStats(BaseModel):
+    """Фильтр существования: заполнение и доля ложных срабатываний"""
+
+    name: str
+    loaded: bool
+    rebuilds: int
+    items: int = 0
+    bits: int = 0
+    hashes: int = 0
+    checks: int = 0
+    skipped: int = 0
+    false_positives: int = 0
+    false_positive_rate: float | None = None
+    expected_false_positive_rate: float | None = None
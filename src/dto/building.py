@@ -1,7 +1,6 @@
 from pydantic import BaseModel
 
 
-
 class BuildingBase(BaseModel):
     address: str
     latitude: float = None
@@ -30,3 +29,8 @@ class RadiusSearch(BaseModel):
     latitude: float
     longitude: float
     radius_km: float
+
+
+class BuildingOrganizationCount(BaseModel):
+    building_id: int
+    organization_count: int
@@ -0,0 +1,52 @@
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel, model_validator
+
+from .activity import Activity
+from .building import Building
+from .organization import Organization
+
+EntityType = Literal["organization", "building", "activity"]
+
+
+class EntityChange(BaseModel):
+    """Изменение сущности: текущее состояние или надгробие при удалении"""
+
+    cursor: str
+    entity_type: EntityType
+    entity_id: int
+    operation: Literal["upsert", "delete"]
+    changed_at: datetime
+    data: Organization | Building | Activity | None = None
+
+
+class ChangePage(BaseModel):
+    """Страница журнала изменений и курсор для следующего запроса"""
+
+    changes: list[EntityChange]
+    cursor: str | None = None
+    has_more: bool = False
+
+
+class ChangeFeedFilter(BaseModel):
+    """Фильтр подписки на ленту изменений"""
+
+    entity_types: list[EntityType] | None = None
+    min_lat: float | None = None
+    max_lat: float | None = None
+    min_lng: float | None = None
+    max_lng: float | None = None
+
+    @property
+    def bbox(self) -> tuple[float, float, float, float] | None:
+        if self.min_lat is None:
+            return None
+        return self.min_lat, self.max_lat, self.min_lng, self.max_lng
+
+    @model_validator(mode="after")
+    def check_bbox(self) -> "ChangeFeedFilter":
+        bbox = (self.min_lat, self.max_lat, self.min_lng, self.max_lng)
+        if any(value is not None for value in bbox) and None in bbox:
+            raise ValueError("Область задаётся всеми четырьмя границами")
+        return self
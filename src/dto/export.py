@@ -0,0 +1,17 @@
+from typing import Literal
+
+from pydantic import BaseModel
+
+ExportTable = Literal[
+    "organizations", "buildings", "phones", "activities", "organization_activity"
+]
+ExportFormat = Literal["arrow", "parquet"]
+
+
+class TableExport(BaseModel):
+    """Итог выгрузки одной таблицы в колоночный файл"""
+
+    table: ExportTable
+    rows: int
+    size_bytes: int
+    elapsed_ms: float
@@ -0,0 +1,72 @@
+from datetime import datetime
+from typing import Annotated, Literal
+
+from pydantic import BaseModel, Field
+
+from .export import ExportFormat, ExportTable
+from .organization import OrganizationCreate
+
+JobStatus = Literal["queued", "running", "succeeded", "failed", "cancelled"]
+
+
+class RecomputeCountsJob(BaseModel):
+    """Пересчёт счётчиков организаций по зданиям и деятельностям"""
+
+    kind: Literal["recompute_counts"]
+
+
+class RebuildDocumentsJob(BaseModel):
+    """Пересборка документов организаций для чтения"""
+
+    kind: Literal["rebuild_documents"]
+
+
+class RebuildSnapshotJob(BaseModel):
+    """Пересборка файла снимка SNAPSHOT_FILE"""
+
+    kind: Literal["rebuild_snapshot"]
+
+
+class ExportJob(BaseModel):
+    """Колоночная выгрузка таблиц в каталог задачи"""
+
+    kind: Literal["export"]
+    format: ExportFormat = "parquet"
+    tables: list[ExportTable] | None = None
+
+
+class BulkImportJob(BaseModel):
+    """Импорт организаций пакетами по JOBS_BATCH_SIZE"""
+
+    kind: Literal["bulk_import"]
+    organizations: list[OrganizationCreate] = Field(..., min_length=1)
+
+
+JobCreate = Annotated[
+    RecomputeCountsJob
+    | RebuildDocumentsJob
+    | RebuildSnapshotJob
+    | ExportJob
+    | BulkImportJob,
+    Field(discriminator="kind"),
+]
+
+
+class Job(BaseModel):
+    """Состояние фоновой задачи без её параметров"""
+
+    id: int
+    kind: str
+    status: JobStatus
+    progress_done: int
+    progress_total: int | None = None
+    result: dict | None = None
+    error: str | None = None
+    cancel_requested: bool
+    attempts: int
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+    class Config:
+        from_attributes = True
@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+import re
+
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 from .activity import Activity
 from .building import Building
@@ -19,6 +21,10 @@ class Phone(PhoneBase):
         from_attributes = True
 
 
+# Связи организации, которые можно запросить выборочно
+ORGANIZATION_RELATIONS = ("phone_numbers", "activities", "building")
+
+
 class OrganizationBase(BaseModel):
     name: str
     building_id: int
@@ -36,6 +42,26 @@ class OrganizationUpdate(BaseModel):
     activity_ids: list[int] | None = None
 
 
+class OrganizationBulkDelete(BaseModel):
+    """Критерии массового удаления организаций, объединяются через И"""
+
+    ids: list[int] | None = None
+    building_id: int | None = None
+    # Включая потомков деятельности
+    activity_id: int | None = None
+
+    @model_validator(mode="after")
+    def check_criteria(self) -> "OrganizationBulkDelete":
+        if self.ids is None and self.building_id is None and self.activity_id is None:
+            raise ValueError("Нужен хотя бы один критерий удаления")
+        return self
+
+
+class OrganizationBulkDeleteResult(BaseModel):
+    deleted: int
+    ids: list[int]
+
+
 class OrganizationSimple(OrganizationBase):
     id: int
 
@@ -43,6 +69,18 @@ class OrganizationSimple(OrganizationBase):
         from_attributes = True
 
 
+class OrganizationPartial(OrganizationSimple):
+    """Организация только с запрошенными связями
+
+    Незапрошенные связи не заданы и не попадают в ответ при
+    сериализации с exclude_unset; без связей это форма OrganizationSimple.
+    """
+
+    phone_numbers: list[Phone] | None = None
+    activities: list[Activity] | None = None
+    building: Building | None = None
+
+
 class Organization(OrganizationSimple):
     phone_numbers: list[Phone] = []
     activities: list[Activity] = []
@@ -54,3 +92,68 @@ class Organization(OrganizationSimple):
 
     class Config:
         from_attributes = True
+
+
+class OrganizationSearch(BaseModel):
+    """Критерии комбинированного поиска организаций, все необязательны"""
+
+    name: str | None = Field(None, min_length=2)
+    activity_ids: list[int] | None = None
+    building_id: int | None = None
+    min_lat: float | None = None
+    max_lat: float | None = None
+    min_lng: float | None = None
+    max_lng: float | None = None
+    latitude: float | None = None
+    longitude: float | None = None
+    radius_km: float | None = Field(None, gt=0)
+    phone: str | None = Field(None, min_length=2)
+    skip: int = Field(0, ge=0)
+    limit: int = Field(100, ge=1, le=1000)
+    facets: bool = False
+
+    @property
+    def bbox(self) -> tuple[float, float, float, float] | None:
+        if self.min_lat is None:
+            return None
+        return self.min_lat, self.max_lat, self.min_lng, self.max_lng
+
+    @field_validator("phone")
+    @classmethod
+    def check_phone(cls, phone: str | None) -> str | None:
+        # Без цифр номер стал бы пустым префиксом и совпал бы с любым телефоном
+        if phone is not None and len(re.sub(r"\D", "", phone)) < 2:
+            raise ValueError("Номер телефона должен содержать минимум 2 цифры")
+        return phone
+
+    @model_validator(mode="after")
+    def check_geo(self) -> "OrganizationSearch":
+        bbox = (self.min_lat, self.max_lat, self.min_lng, self.max_lng)
+        if any(value is not None for value in bbox) and None in bbox:
+            raise ValueError("Область поиска задаётся всеми четырьмя границами")
+        radius = (self.latitude, self.longitude, self.radius_km)
+        if any(value is not None for value in radius) and None in radius:
+            raise ValueError("Поиск в радиусе требует latitude, longitude и radius_km")
+        return self
+
+
+class OrganizationSearchFacets(BaseModel):
+    """Число найденных организаций по зданиям и видам деятельности"""
+
+    buildings: dict[int, int] = {}
+    activities: dict[int, int] = {}
+
+
+class OrganizationSearchPlan(BaseModel):
+    """План поиска: ведущий предикат и оценки числа строк"""
+
+    driver: str | None = None
+    filters: list[str] = []
+    estimates: dict[str, int] = {}
+
+
+class OrganizationSearchResult(BaseModel):
+    total: int
+    items: list[Organization]
+    facets: OrganizationSearchFacets | None = None
+    plan: OrganizationSearchPlan | None = None
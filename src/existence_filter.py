@@ -0,0 +1,210 @@
+"""Фильтры существования для проверок перед записью
+
+Фильтр Блума отвечает "точно нет" или "возможно есть". Точный промах
+позволяет не ходить в БД за проверкой уникальности или существования,
+ответ "возможно" по-прежнему проверяется запросом. Удалять ключи фильтр
+не умеет: удалённые и переименованные остаются в нём до пересборки и дают
+ложные срабатывания, что безопасно.
+
+Фильтр процесса не видит записей других воркеров, поэтому точный промах не
+окончателен: запись подтверждают ограничения БД (уникальные индексы и
+внешние ключи), а их нарушения сервисы превращают в те же ошибки, что и
+проверки (см. constraint_errors).
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+from collections.abc import Awaitable, Callable, Hashable, Iterator
+from typing import TypeVar
+
+from .config import settings
+from .database import transaction
+from .repository import ActivityRepository, BuildingRepository, OrganizationRepository
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Наблюдаемая доля ложных срабатываний считается не раньше стольких ответов
+MIN_NEGATIVE_SAMPLES = 100
+
+
+class BloomFilter:
+    """Битовый массив и k позиций на ключ, полученных двойным хешированием"""
+
+    __slots__ = ("bits", "size", "hashes", "items")
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(capacity, 1)
+        self.size = max(
+            64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.items = 0
+
+    def _positions(self, key: Hashable) -> Iterator[int]:
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (first + i * second) % self.size
+
+    def add(self, key: Hashable) -> None:
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.items += 1
+
+    def __contains__(self, key: Hashable) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+    @property
+    def expected_error_rate(self) -> float:
+        """Ожидаемая доля ложных срабатываний при текущем заполнении"""
+        return (1 - math.exp(-self.hashes * self.items / self.size)) ** self.hashes
+
+
+class ExistenceFilter:
+    """Именованный фильтр существования с метриками
+
+    До первой загрузки и при выключенном EXISTENCE_FILTERS_ENABLED фильтр
+    на всё отвечает "возможно", то есть ничего не меняет.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.bloom: BloomFilter | None = None
+        self.rebuilds = 0
+        self._reset_counters()
+
+    def _reset_counters(self) -> None:
+        self.checks = 0
+        self.skipped = 0
+        self.false_positives = 0
+
+    @property
+    def active(self) -> bool:
+        return settings.EXISTENCE_FILTERS_ENABLED and self.bloom is not None
+
+    @property
+    def false_positive_rate(self) -> float | None:
+        """Наблюдаемая доля ложных срабатываний среди отсутствующих ключей"""
+        negatives = self.skipped + self.false_positives
+        return self.false_positives / negatives if negatives else None
+
+    @property
+    def degraded(self) -> bool:
+        """Пора пересобрать: фильтр переполнен или заполнен удалёнными ключами"""
+        if self.bloom is None:
+            return False
+        limit = 2 * settings.EXISTENCE_FILTER_ERROR_RATE
+        if self.bloom.expected_error_rate > limit:
+            return True
+        negatives = self.skipped + self.false_positives
+        return negatives >= MIN_NEGATIVE_SAMPLES and self.false_positive_rate > limit
+
+    def check(self, key: Hashable) -> bool:
+        """False - ключа точно нет, запрос в БД не нужен"""
+        if not self.active:
+            return True
+        self.checks += 1
+        if key in self.bloom:
+            return True
+        self.skipped += 1
+        return False
+
+    def confirm(self, found: bool) -> None:
+        """Учесть ответ БД на ключ, который фильтр пропустил как "возможно" """
+        if self.active and not found:
+            self.false_positives += 1
+
+    async def probe(
+        self, key: Hashable, lookup: Callable[[], Awaitable[T | None]]
+    ) -> T | None:
+        """Найти запись по ключу, при точном промахе - без запроса в БД"""
+        if not self.check(key):
+            return None
+        found = await lookup()
+        self.confirm(found is not None)
+        return found
+
+    def add(self, key: Hashable) -> None:
+        """Добавить ключ после записи (до фиксации: лишний ключ безопасен)"""
+        if self.bloom is not None:
+            self.bloom.add(key)
+
+    def load(self, keys: list[Hashable]) -> None:
+        """Заменить фильтр новым с запасом ёмкости под рост"""
+        bloom = BloomFilter(
+            max(len(keys) * 2, settings.EXISTENCE_FILTER_MIN_CAPACITY),
+            settings.EXISTENCE_FILTER_ERROR_RATE,
+        )
+        for key in keys:
+            bloom.add(key)
+        # Ключи, добавленные записями во время выгрузки, могут потеряться:
+        # это точный промах, который поймает ограничение БД
+        self.bloom = bloom
+        self.rebuilds += 1
+        self._reset_counters()
+
+
+class ExistenceFilters:
+    """Фильтры по ключам, которые проверяются перед созданием сущностей"""
+
+    def __init__(self):
+        self.organization_names = ExistenceFilter("organization_names")
+        self.building_addresses = ExistenceFilter("building_addresses")
+        self.building_ids = ExistenceFilter("building_ids")
+        self.activity_keys = ExistenceFilter("activity_keys")
+        self.activity_ids = ExistenceFilter("activity_ids")
+
+    def __iter__(self) -> Iterator[ExistenceFilter]:
+        return iter(
+            (
+                self.organization_names,
+                self.building_addresses,
+                self.building_ids,
+                self.activity_keys,
+                self.activity_ids,
+            )
+        )
+
+    async def rebuild(self) -> None:
+        """Пересобрать все фильтры по данным БД"""
+        async with transaction() as db:
+            names = await OrganizationRepository(db).get_names()
+            buildings = await BuildingRepository(db).get_addresses()
+            activities = await ActivityRepository(db).get_keys()
+
+        self.organization_names.load(names)
+        self.building_addresses.load([address for _, address in buildings])
+        self.building_ids.load([id for id, _ in buildings])
+        self.activity_keys.load(
+            [(parent_id, name) for _, parent_id, name in activities]
+        )
+        self.activity_ids.load([id for id, _, _ in activities])
+        logger.info(
+            "Existence filters rebuilt: %d organizations, %d buildings, %d activities",
+            len(names),
+            len(buildings),
+            len(activities),
+        )
+
+    async def run_rebuilder(self) -> None:
+        """Пересобирать фильтры, когда какой-то из них деградировал"""
+        while True:
+            await asyncio.sleep(settings.EXISTENCE_FILTER_CHECK_INTERVAL_S)
+            if not any(f.degraded for f in self):
+                continue
+            try:
+                await self.rebuild()
+            except Exception:
+                logger.exception("Existence filters rebuild failed")
+
+
+existence_filters = ExistenceFilters()
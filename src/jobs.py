@@ -0,0 +1,349 @@
+"""Фоновые задачи в процессе приложения
+
+Тяжёлые операции (импорт, пересборки, пересчёт счётчиков, выгрузки) ставятся
+в очередь в таблице jobs и выполняются исполнителем в фоне, а не в
+обработчике запроса. Задачи работают через свой пул соединений
+(database.job_engine), не больше JOBS_CONCURRENCY одновременно, поэтому не
+отнимают соединения у запросов.
+
+Задачи забираются через SELECT ... FOR UPDATE SKIP LOCKED, так что
+исполнители всех воркеров делят одну очередь. Пока задача выполняется,
+исполнитель продлевает её heartbeat_at; задачу упавшего процесса через
+JOBS_LEASE_S забирает другой исполнитель и продолжает с checkpoint, который
+пишется в одной транзакции с шагом задачи. Записи задачи ограничены номером
+попытки: исполнитель, у которого задачу забрали после истечения аренды,
+прекращает её, не записав ни шага. При остановке исполнитель возвращает
+свои задачи в очередь.
+
+Отмена выполняемой задачи прерывает её на ближайшем шаге или heartbeat;
+уже завершённые шаги не откатываются.
+"""
+
+import asyncio
+import logging
+import os
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
+from functools import partial
+from typing import get_args
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .build_snapshot import build_snapshot_file
+from .columnar_export import export_directory
+from .config import settings
+from .database import JobSessionLocal, session_factory, transaction
+from .dto import BulkImportJob, ExportJob, ExportTable, TableExport
+from .model import Job
+from .model.job import CANCELLED, FAILED, SUCCEEDED
+from .recompute_counts import recompute_counts
+from .repository import (
+    JobRepository,
+    OrganizationDocumentRepository,
+    OrganizationRepository,
+)
+from .service import OrganizationService
+
+logger = logging.getLogger(__name__)
+
+# Сколько ошибок отдельных записей импорта сохранять в итоге задачи
+_MAX_IMPORT_ERRORS = 100
+
+
+class JobCancelled(Exception):
+    """Отмена задачи запрошена"""
+
+
+class JobLeaseLost(Exception):
+    """Аренда задачи истекла, и её забрал другой исполнитель"""
+
+
+class JobContext:
+    """Параметры выполняемой задачи и запись её прогресса"""
+
+    def __init__(self, job: Job):
+        self.id = job.id
+        self.attempt = job.attempts
+        self.params = job.params
+        self.checkpoint = job.checkpoint
+        self.cancel_requested = job.cancel_requested
+        self.lease_lost = False
+
+    async def save(
+        self,
+        done: int,
+        total: int | None = None,
+        checkpoint: dict | None = None,
+        db: AsyncSession | None = None,
+    ) -> None:
+        """Записать прогресс и точку продолжения
+
+        С db запись идёт в транзакции шага: после сбоя задача продолжится
+        ровно с первого незафиксированного шага. Если отмена запрошена,
+        бросает JobCancelled, если задачу забрал другой исполнитель -
+        JobLeaseLost; транзакция шага при этом откатывается.
+        """
+        if db is None:
+            async with transaction() as db:
+                return await self.save(done, total, checkpoint, db)
+        cancel_requested = await JobRepository(db).save_progress(
+            self.id, self.attempt, done, total, checkpoint
+        )
+        if cancel_requested is None:
+            self.lease_lost = True
+            raise JobLeaseLost
+        if cancel_requested:
+            self.cancel_requested = True
+            raise JobCancelled
+
+
+async def run_recompute_counts(_job: JobContext) -> dict:
+    return (await recompute_counts()).model_dump()
+
+
+async def run_rebuild_documents(job: JobContext) -> dict:
+    """Пересобрать документы организаций пакетами по возрастанию ID"""
+    state = job.checkpoint or {"last_id": 0, "done": 0}
+    async with transaction() as db:
+        total = await OrganizationRepository(db).count()
+    while True:
+        async with transaction() as db:
+            ids = await OrganizationRepository(db).get_ids_after(
+                state["last_id"], settings.JOBS_BATCH_SIZE
+            )
+            if not ids:
+                break
+            await OrganizationDocumentRepository(db).refresh(ids)
+            state = {"last_id": ids[-1], "done": state["done"] + len(ids)}
+            await job.save(state["done"], max(total, state["done"]), state, db)
+    return {"rebuilt": state["done"]}
+
+
+async def run_rebuild_snapshot(_job: JobContext) -> dict:
+    if not settings.SNAPSHOT_FILE:
+        raise ValueError("SNAPSHOT_FILE не задан")
+    size = await build_snapshot_file(settings.SNAPSHOT_FILE)
+    return {"path": settings.SNAPSHOT_FILE, "size_bytes": size}
+
+
+async def run_export(job: JobContext) -> dict:
+    """Выгрузить таблицы в подкаталог задачи
+
+    Таблицы читаются из одного снимка БД, поэтому после сбоя выгрузка
+    начинается заново; готовые файлы подменяются атомарно.
+    """
+    params = ExportJob.model_validate(job.params)
+    directory = os.path.join(settings.JOBS_EXPORT_DIR, f"job-{job.id}")
+    total = len(params.tables or get_args(ExportTable))
+    exported = 0
+
+    async def on_table(_result: TableExport) -> None:
+        nonlocal exported
+        exported += 1
+        await job.save(exported, total)
+
+    results = await export_directory(directory, params.format, params.tables, on_table)
+    return {
+        "directory": directory,
+        "tables": [result.model_dump() for result in results],
+    }
+
+
+async def run_bulk_import(job: JobContext) -> dict:
+    """Создать организации пакетами, каждый в своей транзакции
+
+    Организация, не прошедшая проверки, попадает в ошибки, остальные
+    создаются. Если пакет целиком откатился, его записи создаются по одной.
+    """
+    organizations = BulkImportJob.model_validate(job.params).organizations
+    total = len(organizations)
+    state = job.checkpoint or {"offset": 0, "created": 0, "failed": 0, "errors": []}
+
+    def record(offset: int, results: list) -> dict:
+        errors = list(state["errors"])
+        failed = 0
+        for index, result in enumerate(results, start=offset):
+            if isinstance(result, ValueError):
+                failed += 1
+                if len(errors) < _MAX_IMPORT_ERRORS:
+                    errors.append({"index": index, "error": str(result)})
+        return {
+            "offset": offset + len(results),
+            "created": state["created"] + len(results) - failed,
+            "failed": state["failed"] + failed,
+            "errors": errors,
+        }
+
+    while (offset := state["offset"]) < total:
+        batch = organizations[offset : offset + settings.JOBS_BATCH_SIZE]
+        try:
+            async with transaction() as db:
+                results = await OrganizationService(db).create_organizations(batch)
+                new_state = record(offset, results)
+                await job.save(new_state["offset"], total, new_state, db)
+        except (JobCancelled, JobLeaseLost):
+            raise
+        except Exception:
+            logger.exception(
+                "Bulk import batch at %d failed, retrying one by one", offset
+            )
+            results = []
+            for organization_data in batch:
+                try:
+                    async with transaction() as db:
+                        service = OrganizationService(db)
+                        results.append(
+                            await service.create_organization(organization_data)
+                        )
+                except ValueError as e:
+                    results.append(e)
+            new_state = record(offset, results)
+            await job.save(new_state["offset"], total, new_state)
+        state = new_state
+
+    return {key: state[key] for key in ("created", "failed", "errors")}
+
+
+HANDLERS: dict[str, Callable[[JobContext], Awaitable[dict | None]]] = {
+    "recompute_counts": run_recompute_counts,
+    "rebuild_documents": run_rebuild_documents,
+    "rebuild_snapshot": run_rebuild_snapshot,
+    "export": run_export,
+    "bulk_import": run_bulk_import,
+}
+
+
+class JobRunner:
+    """Исполнитель задач из очереди jobs"""
+
+    def __init__(self):
+        self._wakeup = asyncio.Event()
+        self._tasks: dict[int, asyncio.Task] = {}
+        self._attempts: dict[int, int] = {}
+        self._work: dict[int, tuple[JobContext, asyncio.Task]] = {}
+
+    @property
+    def running(self) -> list[int]:
+        return sorted(self._tasks)
+
+    def notify(self) -> None:
+        """Разбудить исполнитель после постановки задачи"""
+        self._wakeup.set()
+
+    def cancel(self, job_id: int) -> None:
+        """Прервать задачу сразу, если она выполняется в этом процессе"""
+        if job_id in self._work:
+            context, work = self._work[job_id]
+            context.cancel_requested = True
+            work.cancel()
+
+    async def run(self) -> None:
+        """Забирать задачи, пока есть свободные слоты"""
+        # Задачи и исполнитель работают через пул задач
+        session_factory.set(JobSessionLocal)
+        slots = asyncio.Semaphore(settings.JOBS_CONCURRENCY)
+        try:
+            while True:
+                await slots.acquire()
+                self._wakeup.clear()
+                try:
+                    async with transaction() as db:
+                        job = await JobRepository(db).claim(settings.JOBS_LEASE_S)
+                except Exception:
+                    logger.exception("Job claim failed")
+                    job = None
+                if job is None:
+                    slots.release()
+                    with suppress(TimeoutError):
+                        async with asyncio.timeout(settings.JOBS_POLL_INTERVAL_S):
+                            await self._wakeup.wait()
+                    continue
+                task = asyncio.create_task(self._execute(job))
+                self._tasks[job.id] = task
+                self._attempts[job.id] = job.attempts
+                task.add_done_callback(partial(self._release, job.id, slots))
+        finally:
+            await self._stop()
+
+    def _release(self, job_id: int, slots: asyncio.Semaphore, _task) -> None:
+        self._tasks.pop(job_id, None)
+        self._attempts.pop(job_id, None)
+        slots.release()
+
+    async def _stop(self) -> None:
+        """Прервать выполняемые задачи и вернуть их в очередь"""
+        tasks = dict(self._tasks)
+        attempts = dict(self._attempts)
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        if tasks:
+            async with transaction() as db:
+                await JobRepository(db).requeue(attempts)
+            logger.info("Jobs %s returned to the queue", sorted(tasks))
+
+    async def _execute(self, job: Job) -> None:
+        context = JobContext(job)
+        if context.cancel_requested:
+            await self._finish(context, CANCELLED)
+            return
+        if job.attempts > settings.JOBS_MAX_ATTEMPTS:
+            await self._finish(context, FAILED, error="Job exceeded max attempts")
+            return
+
+        logger.info("Job %d (%s) started, attempt %d", job.id, job.kind, job.attempts)
+        work = asyncio.create_task(HANDLERS[job.kind](context))
+        self._work[job.id] = (context, work)
+        heartbeat = asyncio.create_task(self._heartbeat(context, work))
+        try:
+            result = await work
+        except (JobCancelled, JobLeaseLost, asyncio.CancelledError):
+            # Остановка исполнителя: задача вернётся в очередь
+            if asyncio.current_task().cancelling():
+                raise
+            if context.lease_lost:
+                logger.warning("Job %d (%s) lease lost, stopped", job.id, job.kind)
+                return
+            logger.info("Job %d (%s) cancelled", job.id, job.kind)
+            await self._finish(context, CANCELLED)
+        except Exception as e:
+            logger.exception("Job %d (%s) failed", job.id, job.kind)
+            await self._finish(context, FAILED, error=str(e) or type(e).__name__)
+        else:
+            logger.info("Job %d (%s) succeeded", job.id, job.kind)
+            await self._finish(context, SUCCEEDED, result=result)
+        finally:
+            heartbeat.cancel()
+            self._work.pop(job.id, None)
+
+    async def _finish(self, context: JobContext, status: str, **outcome) -> None:
+        async with transaction() as db:
+            finished = await JobRepository(db).finish(
+                context.id, context.attempt, status, **outcome
+            )
+        if not finished:
+            logger.warning("Job %d lease lost, outcome discarded", context.id)
+
+    async def _heartbeat(self, context: JobContext, work: asyncio.Task) -> None:
+        """Продлевать аренду задачи и прервать её при отмене или потере аренды"""
+        while True:
+            await asyncio.sleep(settings.JOBS_HEARTBEAT_S)
+            try:
+                async with transaction() as db:
+                    cancel_requested = await JobRepository(db).heartbeat(
+                        context.id, context.attempt
+                    )
+            except Exception:
+                logger.exception("Job %d heartbeat failed", context.id)
+                continue
+            if cancel_requested is None:
+                context.lease_lost = True
+                work.cancel()
+                return
+            if cancel_requested:
+                context.cancel_requested = True
+                work.cancel()
+                return
+
+
+job_runner = JobRunner()
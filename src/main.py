@@ -1,23 +1,69 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
 
-from .api.v1 import activities, buildings, organizations
+from .admission import AdmissionMiddleware
+from .api.v1 import (
+    activities,
+    admin,
+    buildings,
+    changes,
+    exports,
+    jobs,
+    organizations,
+)
+from .change_feed import broadcaster, listen
 from .config import settings
-from .database import Base, engine
+from .content_negotiation import ContentNegotiationMiddleware
+from .database import engine, job_engine
+from .deadline import DeadlineMiddleware
+from .existence_filter import existence_filters
+from .jobs import job_runner
+from .slow_query import request_scope
+from .snapshot import snapshot_store
+from .startup import check_schema, startup, warm_up
 
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
     print("Starting Organization Directory API...")
-    # Используем асинхронное создание таблиц
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # Схему создают миграции, запуск только сверяет ревизию
+    if settings.STARTUP_SCHEMA_CHECK:
+        with startup.phase("schema_check"):
+            await check_schema()
+
+    background = []
+    if settings.CHANGE_FEED_ENABLED and settings.CHANGE_FEED_NOTIFY:
+        background.append(asyncio.create_task(listen(engine)))
+    if settings.EXISTENCE_FILTERS_ENABLED:
+        with startup.phase("existence_filters"):
+            await existence_filters.rebuild()
+        background.append(asyncio.create_task(existence_filters.run_rebuilder()))
+    if settings.SNAPSHOT_ENABLED:
+        # Чтения начинают обслуживаться только с готовым снимком
+        with startup.phase("snapshot"):
+            await snapshot_store.refresh()
+        background.append(asyncio.create_task(snapshot_store.run_refresher()))
+    if settings.JOBS_ENABLED:
+        background.append(asyncio.create_task(job_runner.run()))
+    # Прогрев идёт после старта: /health уже отвечает, /ready - после прогрева
+    if settings.WARMUP_ENABLED:
+        background.append(asyncio.create_task(warm_up()))
+    else:
+        startup.mark_ready()
     yield
 
     print("Shutting down...")
+    broadcaster.close()
+    for task in background:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
     await engine.dispose()
+    await job_engine.dispose()
 
 
 app = FastAPI(
@@ -27,10 +73,35 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Дедлайн ставится внутри допуска, ожидание в очереди в него не входит
+app.add_middleware(DeadlineMiddleware)
+
+
+@app.middleware("http")
+async def bind_request_scope(request: Request, call_next):
+    # Нужен журналу медленных запросов, чтобы знать маршрут запроса
+    token = request_scope.set(request.scope)
+    try:
+        return await call_next(request)
+    finally:
+        request_scope.reset(token)
+
+
+# Тяжёлые поиски и записи не должны занимать весь пул соединений БД
+app.add_middleware(AdmissionMiddleware)
+
+# Внешний слой: перекодирует и сжимает все ответы, включая отказы допуска
+app.add_middleware(ContentNegotiationMiddleware)
+
+
 # Include routers
 app.include_router(organizations.router)
 app.include_router(buildings.router)
 app.include_router(activities.router)
+app.include_router(changes.router)
+app.include_router(exports.router)
+app.include_router(jobs.router)
+app.include_router(admin.router)
 
 
 @app.get("/")
@@ -47,5 +118,15 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+async def readiness_check():
+    if not startup.ready:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "warming up", "startup": startup.report()},
+        )
+    return {"status": "ready", "startup": startup.report()}
+
+
 if __name__ == "__main__":
     uvicorn.run("app.main:app", host="0.0.0.0", port=settings.PORT, reload=True)
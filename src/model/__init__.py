@@ -1,5 +1,19 @@
 from .activity import Activity
 from .building import Building
+from .change import Change
+from .job import Job
 from .organization import Organization, OrganizationPhone
+from .organization_count import ActivityOrganizationCount, BuildingOrganizationCount
+from .organization_document import OrganizationDocument
 
-__all__ = ["Activity", "Building", "Organization", OrganizationPhone]
+__all__ = [
+    "Activity",
+    "Building",
+    "Organization",
+    OrganizationPhone,
+    OrganizationDocument,
+    ActivityOrganizationCount,
+    BuildingOrganizationCount,
+    Change,
+    Job,
+]
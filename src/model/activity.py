@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, func
 from sqlalchemy.orm import relationship
 
 from ..database import Base
@@ -9,9 +9,30 @@ class Activity(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False, index=True)
-    parent_id = Column(Integer, ForeignKey("activities.id"), nullable=True)
+    parent_id = Column(Integer, ForeignKey("activities.id"), nullable=True, index=True)
+    created_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+        index=True,
+    )
     parent = relationship("Activity", remote_side=[id], back_populates="children")
     children = relationship("Activity", back_populates="parent")
     organizations = relationship(
         "Organization", secondary="organization_activity", back_populates="activities"
     )
+
+    __table_args__ = (
+        # Имя уникально среди соседей, корневые деятельности - тоже соседи
+        Index(
+            "ux_activities_parent_id_name",
+            "parent_id",
+            "name",
+            unique=True,
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
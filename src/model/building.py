@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Float, Integer, String
+from sqlalchemy import Column, DateTime, Float, Integer, String, func
 from sqlalchemy.orm import relationship
 
 from ..database import Base
@@ -11,6 +11,16 @@ class Building(Base):
     address = Column(String, nullable=False, unique=True, index=True)
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
+    created_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+        index=True,
+    )
 
     # Relationships
     organizations = relationship("Organization", back_populates="building")
@@ -0,0 +1,47 @@
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Identity,
+    Index,
+    Integer,
+    String,
+    func,
+    text,
+)
+
+from ..database import Base
+
+# Типы сущностей и операции в журнале изменений
+ORGANIZATION = "organization"
+BUILDING = "building"
+ACTIVITY = "activity"
+
+UPSERT = "upsert"
+DELETE = "delete"
+
+
+class Change(Base):
+    """Запись журнала изменений для инкрементальной синхронизации
+
+    Строка пишется в той же транзакции, что и изменение сущности. Удаления
+    остаются в журнале как надгробия.
+    """
+
+    __tablename__ = "changes"
+
+    id = Column(BigInteger, Identity(), primary_key=True)
+    # Номер транзакции задаёт порядок выдачи, см. ChangeLogRepository
+    txid = Column(
+        BigInteger,
+        nullable=False,
+        server_default=text("pg_current_xact_id()::text::bigint"),
+    )
+    entity_type = Column(String, nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    operation = Column(String, nullable=False)
+    changed_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+    __table_args__ = (Index("ix_changes_txid_id", "txid", "id"),)
@@ -0,0 +1,61 @@
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    String,
+    false,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+
+from ..database import Base
+
+# Состояния фоновой задачи
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+
+class Job(Base):
+    """Фоновая задача: параметры, прогресс и точка продолжения
+
+    Исполнитель продлевает heartbeat_at, пока задача выполняется. Задачу,
+    которую давно никто не продлевал, забирает другой исполнитель и
+    продолжает с checkpoint.
+    """
+
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String, nullable=False)
+    status = Column(String, nullable=False, server_default=QUEUED)
+    params = Column(JSONB, nullable=False, server_default=text("'{}'::jsonb"))
+    checkpoint = Column(JSONB)
+    progress_done = Column(Integer, nullable=False, server_default="0")
+    progress_total = Column(Integer)
+    result = Column(JSONB)
+    error = Column(String)
+    cancel_requested = Column(Boolean, nullable=False, server_default=false())
+    attempts = Column(Integer, nullable=False, server_default="0")
+    created_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    started_at = Column(DateTime(timezone=True))
+    heartbeat_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        # Очередь: только незавершённые задачи
+        Index(
+            "ix_jobs_active",
+            "id",
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+    )
@@ -1,4 +1,13 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, Table
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Table,
+    func,
+)
 from sqlalchemy.orm import relationship
 
 from ..database import Base
@@ -7,8 +16,15 @@ from ..database import Base
 organization_activity = Table(
     "organization_activity",
     Base.metadata,
-    Column("organization_id", Integer, ForeignKey("organizations.id")),
-    Column("activity_id", Integer, ForeignKey("activities.id")),
+    Column(
+        "organization_id",
+        Integer,
+        ForeignKey("organizations.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column("activity_id", Integer, ForeignKey("activities.id"), primary_key=True),
+    # Первичный ключ покрывает поиск по organization_id, обратный поиск - индекс
+    Index("ix_organization_activity_activity_id", "activity_id"),
 )
 
 
@@ -17,21 +33,53 @@ class OrganizationPhone(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     phone_number = Column(String, nullable=False)
-    organization_id = Column(Integer, ForeignKey("organizations.id"))
+    # Только цифры номера, заполняется сервисом при записи
+    phone_digits = Column(String, nullable=False, server_default="")
+    organization_id = Column(
+        Integer,
+        ForeignKey("organizations.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
 
     organization = relationship("Organization", back_populates="phone_numbers")
 
+    __table_args__ = (
+        # text_pattern_ops обслуживает и точное совпадение, и LIKE 'префикс%'
+        Index(
+            "ix_organization_phones_phone_digits",
+            "phone_digits",
+            postgresql_ops={"phone_digits": "text_pattern_ops"},
+        ),
+    )
+
 
 class Organization(Base):
     __tablename__ = "organizations"
 
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, nullable=False, index=True)
-    building_id = Column(Integer, ForeignKey("buildings.id"))
+    name = Column(String, nullable=False, unique=True, index=True)
+    building_id = Column(Integer, ForeignKey("buildings.id"), index=True)
+    created_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+        index=True,
+    )
 
     # Relationships
     building = relationship("Building", back_populates="organizations")
-    phone_numbers = relationship("OrganizationPhone", back_populates="organization")
+    # Телефоны и связи удаляет БД (ON DELETE CASCADE), без загрузки в сессию
+    phone_numbers = relationship(
+        "OrganizationPhone", back_populates="organization", passive_deletes=True
+    )
     activities = relationship(
-        "Activity", secondary=organization_activity, back_populates="organizations"
+        "Activity",
+        secondary=organization_activity,
+        back_populates="organizations",
+        passive_deletes=True,
     )
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, ForeignKey, Integer
+
+from ..database import Base
+
+
+class ActivityOrganizationCount(Base):
+    """Число организаций в поддереве деятельности"""
+
+    __tablename__ = "activity_organization_counts"
+
+    activity_id = Column(
+        Integer, ForeignKey("activities.id", ondelete="CASCADE"), primary_key=True
+    )
+    organization_count = Column(Integer, nullable=False, default=0)
+
+
+class BuildingOrganizationCount(Base):
+    """Число организаций в здании"""
+
+    __tablename__ = "building_organization_counts"
+
+    building_id = Column(
+        Integer, ForeignKey("buildings.id", ondelete="CASCADE"), primary_key=True
+    )
+    organization_count = Column(Integer, nullable=False, default=0)
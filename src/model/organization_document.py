@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Float, ForeignKey, Index, Integer, String
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+
+from ..database import Base
+
+
+class OrganizationDocument(Base):
+    """Денормализованная модель чтения организации
+
+    Содержит всё, что нужно DTO Organization, и обновляется в той же
+    транзакции, что и исходные таблицы.
+    """
+
+    __tablename__ = "organization_documents"
+
+    organization_id = Column(
+        Integer, ForeignKey("organizations.id", ondelete="CASCADE"), primary_key=True
+    )
+    name = Column(String, nullable=False, index=True)
+    building_id = Column(Integer, nullable=False, index=True)
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    activity_ids = Column(ARRAY(Integer), nullable=False, server_default="{}")
+    # Деятельности организации вместе со всеми их предками
+    activity_path_ids = Column(ARRAY(Integer), nullable=False, server_default="{}")
+    document = Column(JSONB, nullable=False)
+
+    __table_args__ = (
+        Index(
+            "ix_organization_documents_activity_path_ids",
+            "activity_path_ids",
+            postgresql_using="gin",
+        ),
+        Index("ix_organization_documents_location", "latitude", "longitude"),
+    )
@@ -0,0 +1,43 @@
+"""Полный пересчёт счётчиков организаций по зданиям и деятельностям
+
+Счётчики обновляются при записи; пересчёт исправляет расхождения,
+например после ручных правок в БД. Запуск: python -m src.recompute_counts
+"""
+
+import asyncio
+import logging
+
+from .database import engine, transaction
+from .dto import OrganizationCountsRecompute
+from .repository import OrganizationCountRepository
+
+logger = logging.getLogger(__name__)
+
+
+async def recompute_counts() -> OrganizationCountsRecompute:
+    """Пересчитать счётчики в одной транзакции"""
+    async with transaction() as db:
+        buildings_fixed, activities_fixed = await OrganizationCountRepository(
+            db
+        ).recompute()
+    logger.info(
+        "Organization counts recomputed: %d buildings, %d activities fixed",
+        buildings_fixed,
+        activities_fixed,
+    )
+    return OrganizationCountsRecompute(
+        buildings_fixed=buildings_fixed, activities_fixed=activities_fixed
+    )
+
+
+async def main() -> None:
+    try:
+        result = await recompute_counts()
+        print(result.model_dump_json())
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
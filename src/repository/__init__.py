@@ -1,5 +1,27 @@
 from .activity_repository import ActivityRepository
 from .building_repository import BuildingRepository
+from .change_log_repository import ChangeLogRepository
+from .export_repository import EXPORT_TABLES, ExportRepository
+from .job_repository import JobRepository
+from .loaders import Loaders, get_loaders
+from .organization_count_repository import OrganizationCountRepository
+from .organization_document_repository import OrganizationDocumentRepository
 from .organization_repository import OrganizationRepository
+from .organization_search_repository import OrganizationSearchRepository
+from .snapshot_repository import SnapshotRepository
 
-__all__ = ["ActivityRepository", "BuildingRepository", "OrganizationRepository"]
+__all__ = [
+    "ActivityRepository",
+    "BuildingRepository",
+    "ChangeLogRepository",
+    "EXPORT_TABLES",
+    "ExportRepository",
+    "JobRepository",
+    "Loaders",
+    "OrganizationCountRepository",
+    "OrganizationDocumentRepository",
+    "OrganizationRepository",
+    "OrganizationSearchRepository",
+    "SnapshotRepository",
+    "get_loaders",
+]
@@ -1,15 +1,22 @@
-from sqlalchemy import select
+from collections.abc import Collection
+
+from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from ..dto.activity import ActivityCreate
 from ..model.activity import Activity
+from ..model.change import ACTIVITY, DELETE, UPSERT
+from .change_log_repository import ChangeLogRepository
+from .organization_document_repository import OrganizationDocumentRepository
 
 
 class ActivityRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.model = Activity
+        self.documents = OrganizationDocumentRepository(db)
+        self.changes = ChangeLogRepository(db)
 
     async def get(self, activity_id: int) -> Activity | None:
         """Получить деятельность по ID"""
@@ -18,6 +25,13 @@ class ActivityRepository:
         )
         return result.scalar_one_or_none()
 
+    async def get_many(self, activity_ids: Collection[int]) -> dict[int, Activity]:
+        """Получить деятельности по списку ID одним запросом"""
+        result = await self.db.execute(
+            select(Activity).where(Activity.id.in_(activity_ids))
+        )
+        return {activity.id: activity for activity in result.scalars().all()}
+
     async def get_with_relations(self, activity_id: int) -> Activity | None:
         """Получить деятельность со всеми связями"""
         result = await self.db.execute(
@@ -42,6 +56,13 @@ class ActivityRepository:
         )
         return result.scalar_one_or_none()
 
+    async def get_keys(self) -> list[tuple[int, int | None, str]]:
+        """(id, parent_id, name) всех деятельностей"""
+        result = await self.db.execute(
+            select(Activity.id, Activity.parent_id, Activity.name)
+        )
+        return result.all()
+
     async def get_children(self, parent_id: int | None) -> list[Activity]:
         """Получить дочерние деятельности"""
         result = await self.db.execute(
@@ -60,6 +81,7 @@ class ActivityRepository:
         self.db.add(activity)
         await self.db.flush()
         await self.db.refresh(activity)
+        await self.changes.record(ACTIVITY, [activity.id], UPSERT)
         return activity
 
     async def update(
@@ -74,15 +96,21 @@ class ActivityRepository:
             setattr(activity, field, value)
 
         await self.db.flush()
+        # Название и предки деятельности входят в документы организаций
+        await self.documents.refresh_activity(activity_id)
+        await self.changes.record(ACTIVITY, [activity_id], UPSERT)
         await self.db.refresh(activity)
         return activity
 
     async def delete(self, activity_id: int) -> bool:
-        """Удалить деятельность"""
-        activity = await self.get(activity_id)
-        if not activity:
-            return False
+        """Удалить деятельность и оставить надгробие в журнале
 
-        await self.db.delete(activity)
-        await self.db.flush()
+        Дочерние деятельности и связи с организациями нарушают внешние ключи.
+        """
+        result = await self.db.execute(
+            delete(Activity).where(activity_id == Activity.id).returning(Activity.id)
+        )
+        if result.scalar_one_or_none() is None:
+            return False
+        await self.changes.record(ACTIVITY, [activity_id], DELETE)
         return True
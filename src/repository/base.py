@@ -1,9 +1,10 @@
 import logging
 from abc import ABC
+from collections.abc import Collection
 from typing import Generic, TypeVar
 
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 ModelType = TypeVar("ModelType")
@@ -31,6 +32,17 @@ class BaseRepository(ABC, Generic[ModelType, CreateSchemaType, UpdateSchemaType]
             logger.error(f"Error getting {self.model.__name__} {id}: {str(e)}")
             raise
 
+    async def get_many(self, ids: Collection[int]) -> dict[int, ModelType]:
+        """Получить объекты по списку ID одним запросом"""
+        try:
+            result = await self.db.execute(
+                select(self.model).where(self.model.id.in_(ids))
+            )
+            return {db_obj.id: db_obj for db_obj in result.scalars().all()}
+        except Exception as e:
+            logger.error(f"Error getting {self.model.__name__} list by ids: {str(e)}")
+            raise
+
     async def get_multi(
         self, skip: int = 0, limit: int = 100, **filters
     ) -> list[ModelType]:
@@ -82,15 +94,12 @@ class BaseRepository(ABC, Generic[ModelType, CreateSchemaType, UpdateSchemaType]
             raise
 
     async def delete(self, id: int) -> bool:
-        """Удалить объект"""
+        """Удалить объект одним запросом, не загружая его и связи"""
         try:
-            db_obj = await self.get(id)
-            if not db_obj:
-                return False
-
-            await self.db.delete(db_obj)
-            await self.db.flush()
-            return True
+            result = await self.db.execute(
+                delete(self.model).where(self.model.id == id).returning(self.model.id)
+            )
+            return result.scalar_one_or_none() is not None
         except Exception as e:
             logger.error(f"Error deleting {self.model.__name__} {id}: {str(e)}")
             raise
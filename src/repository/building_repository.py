@@ -4,12 +4,43 @@ from sqlalchemy.orm import selectinload
 
 from ..dto.building import BuildingCreate
 from ..model.building import Building
+from ..model.change import BUILDING, DELETE, UPSERT
 from .base import BaseRepository
+from .change_log_repository import ChangeLogRepository
+from .organization_document_repository import OrganizationDocumentRepository
 
 
 class BuildingRepository(BaseRepository[Building, BuildingCreate, BuildingCreate]):
     def __init__(self, db: AsyncSession):
         super().__init__(db, Building)
+        self.documents = OrganizationDocumentRepository(db)
+        self.changes = ChangeLogRepository(db)
+
+    async def create(self, obj_in: BuildingCreate) -> Building:
+        """Создать здание и записать изменение в журнал"""
+        building = await super().create(obj_in)
+        await self.changes.record(BUILDING, [building.id], UPSERT)
+        return building
+
+    async def update(self, id: int, obj_in: BuildingCreate) -> Building | None:
+        """Обновить здание и документы его организаций"""
+        building = await super().update(id, obj_in)
+        if building:
+            await self.documents.refresh_building(id)
+            await self.changes.record(BUILDING, [id], UPSERT)
+        return building
+
+    async def delete(self, id: int) -> bool:
+        """Удалить здание и оставить надгробие в журнале"""
+        deleted = await super().delete(id)
+        if deleted:
+            await self.changes.record(BUILDING, [id], DELETE)
+        return deleted
+
+    async def get_addresses(self) -> list[tuple[int, str]]:
+        """(id, address) всех зданий"""
+        result = await self.db.execute(select(Building.id, Building.address))
+        return result.all()
 
     async def get_with_organizations(self, building_id: int) -> Building | None:
         """Получить здание с организациями"""
@@ -0,0 +1,97 @@
+from collections.abc import Collection
+
+from sqlalchemy import BigInteger, Text, cast, func, insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..change_feed import PENDING_EVENTS, notify_payloads
+from ..config import settings
+from ..model import Building, Change, Organization
+from ..model.change import BUILDING, ORGANIZATION
+
+
+class ChangeLogRepository:
+    """Журнал изменений сущностей для инкрементальной синхронизации
+
+    Номер записи выдаётся при вставке, а не при фиксации, поэтому запись с
+    меньшим id может стать видимой позже. Журнал отдаётся в порядке
+    (txid, id) и только для транзакций старше самой старой активной: все их
+    записи уже видны, и за курсором новые записи появиться не могут.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def record(
+        self, entity_type: str, entity_ids: Collection[int], operation: str
+    ) -> None:
+        """Записать изменение сущностей в текущей транзакции"""
+        if not entity_ids:
+            return
+        await self.db.execute(
+            insert(Change),
+            [
+                {
+                    "entity_type": entity_type,
+                    "entity_id": entity_id,
+                    "operation": operation,
+                }
+                for entity_id in entity_ids
+            ],
+        )
+        if settings.CHANGE_FEED_ENABLED:
+            await self._emit(entity_type, entity_ids, operation)
+
+    async def get_since(
+        self, cursor: tuple[int, int] | None = None, limit: int = 100
+    ) -> list[Change]:
+        """Получить зафиксированные изменения после курсора (txid, id)"""
+        visible_xmin = cast(
+            cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), Text), BigInteger
+        )
+        query = select(Change).where(Change.txid < visible_xmin)
+        if cursor is not None:
+            query = query.where(tuple_(Change.txid, Change.id) > cursor)
+        result = await self.db.execute(
+            query.order_by(Change.txid, Change.id).limit(limit)
+        )
+        return result.scalars().all()
+
+    async def _emit(
+        self, entity_type: str, entity_ids: Collection[int], operation: str
+    ) -> None:
+        """Отправить события в ленту изменений после фиксации транзакции"""
+        locations = await self._locations(entity_type, entity_ids)
+        changes = [
+            {
+                "entity_type": entity_type,
+                "entity_id": entity_id,
+                "operation": operation,
+                "latitude": locations.get(entity_id, (None, None))[0],
+                "longitude": locations.get(entity_id, (None, None))[1],
+            }
+            for entity_id in entity_ids
+        ]
+        if settings.CHANGE_FEED_NOTIFY:
+            # NOTIFY доставляется слушателям только при фиксации транзакции
+            for payload in notify_payloads(changes):
+                await self.db.execute(
+                    select(func.pg_notify(settings.CHANGE_FEED_CHANNEL, payload))
+                )
+        else:
+            self.db.info.setdefault(PENDING_EVENTS, []).extend(changes)
+
+    async def _locations(
+        self, entity_type: str, entity_ids: Collection[int]
+    ) -> dict[int, tuple[float, float]]:
+        """Координаты зданий для фильтра подписчиков по области"""
+        if entity_type == BUILDING:
+            query = select(Building.id, Building.latitude, Building.longitude)
+            query = query.where(Building.id.in_(entity_ids))
+        elif entity_type == ORGANIZATION:
+            query = select(Organization.id, Building.latitude, Building.longitude)
+            query = query.join(Building, Building.id == Organization.building_id)
+            query = query.where(Organization.id.in_(entity_ids))
+        else:
+            return {}
+        result = await self.db.execute(query)
+        return {entity_id: (lat, lng) for entity_id, lat, lng in result.all()}
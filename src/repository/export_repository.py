@@ -0,0 +1,89 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import suppress
+
+from sqlalchemy import Table, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..model import Activity, Building, Organization, OrganizationPhone
+from ..model.organization import organization_activity
+
+# Таблицы колоночной выгрузки по именам ExportTable
+EXPORT_TABLES: dict[str, Table] = {
+    "organizations": Organization.__table__,
+    "buildings": Building.__table__,
+    "phones": OrganizationPhone.__table__,
+    "activities": Activity.__table__,
+    "organization_activity": organization_activity,
+}
+
+# Сколько кусков COPY держать в очереди, пока предыдущий блок разбирается
+_COPY_QUEUE_SIZE = 64
+
+
+def _last_record_end(data: bytearray) -> int:
+    """Позиция после последнего перевода строки вне кавычек CSV, 0 - нет такого
+
+    Кавычки внутри значений удваиваются, поэтому перевод строки завершает
+    запись, если до него чётное число кавычек.
+    """
+    quotes = data.count(b'"')
+    end = len(data)
+    while (newline := data.rfind(b"\n", 0, end)) != -1:
+        quotes -= data.count(b'"', newline, end)
+        if quotes % 2 == 0:
+            return newline + 1
+        end = newline
+    return 0
+
+
+class ExportRepository:
+    """Чтение таблиц справочника в CSV для колоночной выгрузки
+
+    Строки отдаёт COPY TO STDOUT: сервер пишет их потоком, без построчного
+    разбора в объекты Python на стороне приложения.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def copy_csv(self, table: str, block_size: int) -> AsyncIterator[bytes]:
+        """CSV строк таблицы по первичному ключу блоками целых записей
+
+        Блоки не меньше block_size байт, кроме последнего. Пока блок
+        обрабатывается, COPY продолжает читаться в ограниченную очередь.
+        """
+        source = EXPORT_TABLES[table]
+        query = select(source).order_by(*source.primary_key.columns)
+        sql = str(query.compile(dialect=postgresql.dialect()))
+        connection = await (await self.db.connection()).get_raw_connection()
+
+        chunks: asyncio.Queue[bytes | None] = asyncio.Queue(_COPY_QUEUE_SIZE)
+
+        async def copy() -> None:
+            try:
+                await connection.driver_connection.copy_from_query(
+                    sql, output=chunks.put, format="csv"
+                )
+            finally:
+                # После отмены читатель очередь уже не разбирает
+                if not asyncio.current_task().cancelling():
+                    await chunks.put(None)
+
+        copying = asyncio.create_task(copy())
+        try:
+            buffer = bytearray()
+            while (chunk := await chunks.get()) is not None:
+                buffer += chunk
+                if len(buffer) >= block_size and (end := _last_record_end(buffer)):
+                    yield bytes(buffer[:end])
+                    del buffer[:end]
+            await copying
+            if buffer:
+                yield bytes(buffer)
+        finally:
+            # Соединение возвращается сессии только после остановки COPY
+            copying.cancel()
+            with suppress(asyncio.CancelledError):
+                await copying
@@ -0,0 +1,163 @@
+from collections.abc import Mapping
+from datetime import timedelta
+
+from sqlalchemy import case, func, or_, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..model import Job
+from ..model.job import ACTIVE_STATUSES, CANCELLED, QUEUED, RUNNING
+
+
+class JobRepository:
+    """Очередь фоновых задач в таблице jobs
+
+    Записи выполняющейся задачи ограничены номером попытки, с которым она
+    забрана: после истечения аренды и повторной выдачи прежний исполнитель
+    уже ничего не меняет и получает None (или False).
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, kind: str, params: dict) -> Job:
+        """Поставить задачу в очередь"""
+        job = Job(kind=kind, params=params)
+        self.db.add(job)
+        await self.db.flush()
+        await self.db.refresh(job)
+        return job
+
+    async def get(self, job_id: int) -> Job | None:
+        return await self.db.get(Job, job_id)
+
+    async def get_multi(
+        self, status: str | None = None, skip: int = 0, limit: int = 100
+    ) -> list[Job]:
+        """Задачи от новых к старым"""
+        query = select(Job).order_by(Job.id.desc()).offset(skip).limit(limit)
+        if status is not None:
+            query = query.where(Job.status == status)
+        result = await self.db.execute(query)
+        return result.scalars().all()
+
+    async def claim(self, lease_s: float) -> Job | None:
+        """Забрать следующую задачу: из очереди или с истёкшей арендой
+
+        SKIP LOCKED позволяет исполнителям разных процессов забирать задачи
+        одновременно, не дожидаясь друг друга.
+        """
+        expired = func.now() - timedelta(seconds=lease_s)
+        candidate = (
+            select(Job.id)
+            .where(
+                or_(
+                    Job.status == QUEUED,
+                    (Job.status == RUNNING) & (Job.heartbeat_at < expired),
+                )
+            )
+            .order_by(Job.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = await self.db.execute(
+            update(Job)
+            .where(Job.id == candidate)
+            .values(
+                status=RUNNING,
+                attempts=Job.attempts + 1,
+                started_at=func.coalesce(Job.started_at, func.now()),
+                heartbeat_at=func.now(),
+            )
+            .returning(Job)
+        )
+        return result.scalar_one_or_none()
+
+    async def save_progress(
+        self,
+        job_id: int,
+        attempt: int,
+        done: int,
+        total: int | None = None,
+        checkpoint: dict | None = None,
+    ) -> bool | None:
+        """Записать прогресс и точку продолжения, вернуть запрошена ли отмена
+
+        None - задача уже выдана другой попытке.
+        """
+        values = {"progress_done": done, "heartbeat_at": func.now()}
+        if total is not None:
+            values["progress_total"] = total
+        if checkpoint is not None:
+            values["checkpoint"] = checkpoint
+        result = await self.db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == RUNNING, Job.attempts == attempt)
+            .values(**values)
+            .returning(Job.cancel_requested)
+        )
+        return result.scalar_one_or_none()
+
+    async def heartbeat(self, job_id: int, attempt: int) -> bool | None:
+        """Продлить аренду задачи, вернуть запрошена ли отмена
+
+        None - задача уже выдана другой попытке.
+        """
+        result = await self.db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == RUNNING, Job.attempts == attempt)
+            .values(heartbeat_at=func.now())
+            .returning(Job.cancel_requested)
+        )
+        return result.scalar_one_or_none()
+
+    async def finish(
+        self,
+        job_id: int,
+        attempt: int,
+        status: str,
+        result: dict | None = None,
+        error: str | None = None,
+    ) -> bool:
+        """Завершить задачу с итогом или ошибкой, False - она выдана другой попытке"""
+        finished = await self.db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == RUNNING, Job.attempts == attempt)
+            .values(status=status, result=result, error=error, finished_at=func.now())
+            .returning(Job.id)
+        )
+        return finished.scalar_one_or_none() is not None
+
+    async def cancel(self, job_id: int) -> Job | None:
+        """Отменить задачу в очереди сразу, выполняемой - запросить отмену
+
+        Возвращает None, если незавершённой задачи с таким ID нет.
+        """
+        queued = Job.status == QUEUED
+        result = await self.db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status.in_(ACTIVE_STATUSES))
+            .values(
+                cancel_requested=True,
+                status=case((queued, CANCELLED), else_=Job.status),
+                finished_at=case((queued, func.now()), else_=Job.finished_at),
+            )
+            .returning(Job)
+        )
+        return result.scalar_one_or_none()
+
+    async def requeue(self, attempts: Mapping[int, int]) -> None:
+        """Вернуть в очередь задачи, прерванные остановкой исполнителя
+
+        attempts - номер попытки каждой задачи по её ID.
+        """
+        if not attempts:
+            return
+        await self.db.execute(
+            update(Job)
+            .where(
+                tuple_(Job.id, Job.attempts).in_(list(attempts.items())),
+                Job.status == RUNNING,
+            )
+            .values(status=QUEUED, attempts=Job.attempts - 1)
+        )
@@ -0,0 +1,60 @@
+import asyncio
+from collections.abc import Collection
+from functools import partial
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..dataloader import DataLoader
+from ..model import Activity, Building, Organization
+from .activity_repository import ActivityRepository
+from .building_repository import BuildingRepository
+from .organization_document_repository import OrganizationDocumentRepository
+from .organization_repository import OrganizationRepository
+
+
+class Loaders:
+    """Загрузчики сущностей по ID, общие для всех сервисов одного запроса"""
+
+    def __init__(self, db: AsyncSession):
+        self._organization_repo = OrganizationRepository(db)
+        self._lock = asyncio.Lock()
+        self.buildings: DataLoader[int, Building] = DataLoader(
+            BuildingRepository(db).get_many, self._lock
+        )
+        self.activities: DataLoader[int, Activity] = DataLoader(
+            ActivityRepository(db).get_many, self._lock
+        )
+        self.organization_documents: DataLoader[int, dict] = DataLoader(
+            OrganizationDocumentRepository(db).get_many, self._lock
+        )
+        self._organizations: dict[frozenset[str] | None, DataLoader] = {}
+
+    def organizations(
+        self, include: Collection[str] | None = None
+    ) -> DataLoader[int, Organization]:
+        """Загрузчик организаций с заданным набором связей"""
+        key = frozenset(include) if include is not None else None
+        loader = self._organizations.get(key)
+        if loader is None:
+            loader = self._organizations[key] = DataLoader(
+                partial(self._organization_repo.get_many, include=key), self._lock
+            )
+        return loader
+
+    def clear_organization(self, organization_id: int) -> None:
+        """Сбросить организацию из кэша всех загрузчиков организаций"""
+        for loader in self._organizations.values():
+            loader.clear(organization_id)
+        self.organization_documents.clear(organization_id)
+
+
+def get_loaders(db: AsyncSession) -> Loaders:
+    """Загрузчики, привязанные к сессии БД
+
+    Сессия создаётся на запрос и передаётся во все сервисы, поэтому
+    загрузчики в session.info живут ровно один запрос.
+    """
+    loaders = db.info.get("loaders")
+    if loaders is None:
+        loaders = db.info["loaders"] = Loaders(db)
+    return loaders
@@ -0,0 +1,157 @@
+from collections import Counter
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..model import (
+    Activity,
+    ActivityOrganizationCount,
+    Building,
+    BuildingOrganizationCount,
+)
+
+# Полный пересчёт по нормализованным таблицам
+_RECOMPUTE_BUILDING_COUNTS = text(
+    """
+    INSERT INTO building_organization_counts (building_id, organization_count)
+    SELECT building_id, count(*)
+    FROM organizations
+    WHERE building_id IS NOT NULL
+    GROUP BY building_id
+    """
+)
+_RECOMPUTE_ACTIVITY_COUNTS = text(
+    """
+    WITH RECURSIVE ancestors(activity_id, ancestor_id) AS (
+        SELECT id, id FROM activities
+        UNION
+        SELECT ancestors.activity_id, activities.parent_id
+        FROM ancestors
+        JOIN activities ON activities.id = ancestors.ancestor_id
+        WHERE activities.parent_id IS NOT NULL
+    )
+    INSERT INTO activity_organization_counts (activity_id, organization_count)
+    SELECT an.ancestor_id, count(DISTINCT oa.organization_id)
+    FROM organization_activity oa
+    JOIN organizations o ON o.id = oa.organization_id
+    JOIN ancestors an ON an.activity_id = oa.activity_id
+    WHERE o.building_id IS NOT NULL
+    GROUP BY an.ancestor_id
+    """
+)
+
+
+class OrganizationCountRepository:
+    """Счётчики организаций по зданиям и поддеревьям деятельностей"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_activity_counts(self) -> list[tuple[int, int]]:
+        """Число организаций в поддереве каждой деятельности"""
+        result = await self.db.execute(
+            select(
+                Activity.id,
+                func.coalesce(ActivityOrganizationCount.organization_count, 0),
+            )
+            .outerjoin(
+                ActivityOrganizationCount,
+                ActivityOrganizationCount.activity_id == Activity.id,
+            )
+            .order_by(Activity.id)
+        )
+        return result.all()
+
+    async def get_building_counts(
+        self, skip: int = 0, limit: int = 100
+    ) -> list[tuple[int, int]]:
+        """Число организаций в каждом здании"""
+        result = await self.db.execute(
+            select(
+                Building.id,
+                func.coalesce(BuildingOrganizationCount.organization_count, 0),
+            )
+            .outerjoin(
+                BuildingOrganizationCount,
+                BuildingOrganizationCount.building_id == Building.id,
+            )
+            .order_by(Building.id)
+            .offset(skip)
+            .limit(limit)
+        )
+        return result.all()
+
+    async def apply(
+        self,
+        before: dict[int, tuple[int, list[int]]],
+        after: dict[int, tuple[int, list[int]]],
+    ) -> None:
+        """Изменить счётчики на разницу между старыми и новыми документами
+
+        Документ задаётся парой (building_id, activity_path_ids).
+        """
+        buildings: Counter[int] = Counter()
+        activities: Counter[int] = Counter()
+        for building_id, activity_path_ids in before.values():
+            buildings[building_id] -= 1
+            activities.update(dict.fromkeys(activity_path_ids, -1))
+        for building_id, activity_path_ids in after.values():
+            buildings[building_id] += 1
+            activities.update(activity_path_ids)
+
+        await self._increment(BuildingOrganizationCount, "building_id", buildings)
+        await self._increment(ActivityOrganizationCount, "activity_id", activities)
+
+    async def recompute(self) -> tuple[int, int]:
+        """Пересчитать все счётчики, вернуть число исправленных (здания, деятельности)"""
+        # Блокируем инкременты на время пересчёта, чтения не блокируются
+        await self.db.execute(
+            text(
+                "LOCK TABLE building_organization_counts, activity_organization_counts "
+                "IN SHARE ROW EXCLUSIVE MODE"
+            )
+        )
+        drift = []
+        for model, key, statement in (
+            (BuildingOrganizationCount, "building_id", _RECOMPUTE_BUILDING_COUNTS),
+            (ActivityOrganizationCount, "activity_id", _RECOMPUTE_ACTIVITY_COUNTS),
+        ):
+            before = await self._snapshot(model, key)
+            await self.db.execute(model.__table__.delete())
+            await self.db.execute(statement)
+            after = await self._snapshot(model, key)
+            drift.append(
+                sum(
+                    1
+                    for entity_id in before.keys() | after.keys()
+                    if before.get(entity_id, 0) != after.get(entity_id, 0)
+                )
+            )
+        return drift[0], drift[1]
+
+    async def _snapshot(self, model, key: str) -> dict[int, int]:
+        result = await self.db.execute(
+            select(getattr(model, key), model.organization_count)
+        )
+        return dict(result.all())
+
+    async def _increment(self, model, key: str, deltas: Counter[int]) -> None:
+        # Сортировка задаёт один порядок блокировок строк для всех транзакций
+        rows = [
+            {key: entity_id, "organization_count": delta}
+            for entity_id, delta in sorted(deltas.items())
+            if delta
+        ]
+        if not rows:
+            return
+        statement = insert(model).values(rows)
+        await self.db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[key],
+                set_={
+                    "organization_count": model.organization_count
+                    + statement.excluded.organization_count
+                },
+            )
+        )
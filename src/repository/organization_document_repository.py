@@ -0,0 +1,250 @@
+from collections.abc import AsyncIterator, Collection
+
+from sqlalchemy import Integer, Select, bindparam, delete, select, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..model import Organization, OrganizationDocument
+from .organization_count_repository import OrganizationCountRepository
+
+# Документ строится одним запросом по нормализованным таблицам, форма
+# document совпадает с DTO Organization
+_REFRESH_DOCUMENTS = text(
+    """
+    WITH RECURSIVE ancestors(activity_id, ancestor_id) AS (
+        SELECT DISTINCT activity_id, activity_id
+        FROM organization_activity
+        WHERE organization_id = ANY(:ids)
+        UNION
+        SELECT ancestors.activity_id, activities.parent_id
+        FROM ancestors
+        JOIN activities ON activities.id = ancestors.ancestor_id
+        WHERE activities.parent_id IS NOT NULL
+    )
+    INSERT INTO organization_documents (
+        organization_id, name, building_id, latitude, longitude,
+        activity_ids, activity_path_ids, document
+    )
+    SELECT
+        o.id,
+        o.name,
+        o.building_id,
+        b.latitude,
+        b.longitude,
+        ARRAY(
+            SELECT oa.activity_id
+            FROM organization_activity oa
+            WHERE oa.organization_id = o.id
+            ORDER BY oa.activity_id
+        ),
+        ARRAY(
+            SELECT DISTINCT an.ancestor_id
+            FROM organization_activity oa
+            JOIN ancestors an ON an.activity_id = oa.activity_id
+            WHERE oa.organization_id = o.id
+            ORDER BY an.ancestor_id
+        ),
+        jsonb_build_object(
+            'id', o.id,
+            'name', o.name,
+            'building_id', o.building_id,
+            'building', jsonb_build_object(
+                'id', b.id,
+                'address', b.address,
+                'latitude', b.latitude,
+                'longitude', b.longitude
+            ),
+            'phone_numbers', COALESCE(
+                (
+                    SELECT jsonb_agg(
+                        jsonb_build_object('id', p.id, 'phone_number', p.phone_number)
+                        ORDER BY p.id
+                    )
+                    FROM organization_phones p
+                    WHERE p.organization_id = o.id
+                ),
+                '[]'::jsonb
+            ),
+            'activities', COALESCE(
+                (
+                    SELECT jsonb_agg(
+                        jsonb_build_object(
+                            'id', a.id, 'name', a.name, 'parent_id', a.parent_id
+                        )
+                        ORDER BY a.id
+                    )
+                    FROM organization_activity oa
+                    JOIN activities a ON a.id = oa.activity_id
+                    WHERE oa.organization_id = o.id
+                ),
+                '[]'::jsonb
+            )
+        )
+    FROM organizations o
+    JOIN buildings b ON b.id = o.building_id
+    WHERE o.id = ANY(:ids)
+    ON CONFLICT (organization_id) DO UPDATE SET
+        name = EXCLUDED.name,
+        building_id = EXCLUDED.building_id,
+        latitude = EXCLUDED.latitude,
+        longitude = EXCLUDED.longitude,
+        activity_ids = EXCLUDED.activity_ids,
+        activity_path_ids = EXCLUDED.activity_path_ids,
+        document = EXCLUDED.document
+    RETURNING organization_id, building_id, activity_path_ids, document
+    """
+).bindparams(bindparam("ids", type_=ARRAY(Integer)))
+
+
+def _by_building(building_id: int) -> Select:
+    return select(OrganizationDocument.document).where(
+        building_id == OrganizationDocument.building_id
+    )
+
+
+def _by_activity(activity_id: int) -> Select:
+    return select(OrganizationDocument.document).where(
+        OrganizationDocument.activity_path_ids.contains([activity_id])
+    )
+
+
+def _by_name(name: str) -> Select:
+    return select(OrganizationDocument.document).where(
+        OrganizationDocument.name.ilike(f"%{name}%")
+    )
+
+
+class OrganizationDocumentRepository:
+    """Денормализованные документы организаций для чтения одной таблицей"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.model = OrganizationDocument
+        self.counts = OrganizationCountRepository(db)
+
+    async def get(self, organization_id: int) -> dict | None:
+        """Получить документ организации по ID"""
+        result = await self.db.execute(
+            select(OrganizationDocument.document).where(
+                organization_id == OrganizationDocument.organization_id
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def get_many(self, organization_ids: Collection[int]) -> dict[int, dict]:
+        """Получить документы по списку ID одним запросом"""
+        result = await self.db.execute(
+            select(OrganizationDocument.document).where(
+                OrganizationDocument.organization_id.in_(organization_ids)
+            )
+        )
+        return {document["id"]: document for document in result.scalars().all()}
+
+    async def get_all(self, skip: int = 0, limit: int = 100) -> list[dict]:
+        """Получить документы всех организаций"""
+        result = await self.db.execute(
+            select(OrganizationDocument.document)
+            .order_by(OrganizationDocument.organization_id)
+            .offset(skip)
+            .limit(limit)
+        )
+        return result.scalars().all()
+
+    async def get_by_building(self, building_id: int) -> list[dict]:
+        """Получить документы организаций в здании"""
+        result = await self.db.execute(_by_building(building_id))
+        return result.scalars().all()
+
+    async def get_by_activity(self, activity_id: int) -> list[dict]:
+        """Получить документы организаций с деятельностью или её потомками"""
+        result = await self.db.execute(_by_activity(activity_id))
+        return result.scalars().all()
+
+    async def search_by_name(self, name: str) -> list[dict]:
+        """Поиск документов по названию организации"""
+        result = await self.db.execute(_by_name(name))
+        return result.scalars().all()
+
+    def stream_by_building(
+        self, building_id: int, chunk_size: int
+    ) -> AsyncIterator[list[dict]]:
+        """Документы организаций в здании частями по chunk_size"""
+        return self._stream(_by_building(building_id), chunk_size)
+
+    def stream_by_activity(
+        self, activity_id: int, chunk_size: int
+    ) -> AsyncIterator[list[dict]]:
+        """Документы организаций с деятельностью или её потомками частями"""
+        return self._stream(_by_activity(activity_id), chunk_size)
+
+    def stream_by_name(self, name: str, chunk_size: int) -> AsyncIterator[list[dict]]:
+        """Поиск документов по названию организации частями"""
+        return self._stream(_by_name(name), chunk_size)
+
+    async def _stream(
+        self, query: Select, chunk_size: int
+    ) -> AsyncIterator[list[dict]]:
+        """Читать результат серверным курсором, не держа его целиком в памяти"""
+        result = await self.db.stream(query.execution_options(yield_per=chunk_size))
+        async for documents in result.scalars().partitions():
+            yield documents
+
+    async def refresh(self, organization_ids: Collection[int]) -> dict[int, dict]:
+        """Пересобрать документы организаций из нормализованных таблиц
+
+        Возвращает новые документы по ID организаций.
+        """
+        if not organization_ids:
+            return {}
+
+        organization_ids = list(organization_ids)
+        result = await self.db.execute(
+            select(
+                OrganizationDocument.organization_id,
+                OrganizationDocument.building_id,
+                OrganizationDocument.activity_path_ids,
+            )
+            .where(OrganizationDocument.organization_id.in_(organization_ids))
+            .with_for_update()
+        )
+        before = {row[0]: row[1:] for row in result.all()}
+        result = await self.db.execute(_REFRESH_DOCUMENTS, {"ids": organization_ids})
+        rows = result.all()
+        after = {row[0]: (row[1], row[2]) for row in rows}
+        await self.counts.apply(before, after)
+        return {row[0]: row[3] for row in rows}
+
+    async def refresh_building(self, building_id: int) -> None:
+        """Пересобрать документы организаций здания"""
+        result = await self.db.execute(
+            select(Organization.id).where(building_id == Organization.building_id)
+        )
+        await self.refresh(result.scalars().all())
+
+    async def refresh_activity(self, activity_id: int) -> None:
+        """Пересобрать документы организаций с деятельностью или её потомками"""
+        result = await self.db.execute(
+            select(OrganizationDocument.organization_id).where(
+                OrganizationDocument.activity_path_ids.contains([activity_id])
+            )
+        )
+        await self.refresh(result.scalars().all())
+
+    async def delete(self, organization_id: int) -> None:
+        """Удалить документ организации"""
+        await self.delete_many([organization_id])
+
+    async def delete_many(self, organization_ids: Collection[int]) -> None:
+        """Удалить документы организаций"""
+        if not organization_ids:
+            return
+        result = await self.db.execute(
+            delete(OrganizationDocument)
+            .where(OrganizationDocument.organization_id.in_(organization_ids))
+            .returning(
+                OrganizationDocument.organization_id,
+                OrganizationDocument.building_id,
+                OrganizationDocument.activity_path_ids,
+            )
+        )
+        await self.counts.apply({row[0]: row[1:] for row in result.all()}, {})
@@ -1,15 +1,64 @@
-from sqlalchemy import delete, select
+from collections import Counter
+from collections.abc import AsyncIterator, Collection
+
+from sqlalchemy import Select, delete, func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import load_only, selectinload
+
+from ..dto.organization import (
+    ORGANIZATION_RELATIONS,
+    OrganizationCreate,
+    OrganizationUpdate,
+)
+from ..model import Activity, Organization, OrganizationDocument, OrganizationPhone
+from ..model.change import DELETE, ORGANIZATION, UPSERT
+from ..model.organization import organization_activity
+from .change_log_repository import ChangeLogRepository
+from .organization_document_repository import OrganizationDocumentRepository
+
+
+def _load_options(include: Collection[str] | None = None) -> list:
+    """Опции загрузки: колонки организации и только запрошенные связи"""
+    if include is None:
+        include = ORGANIZATION_RELATIONS
+    return [
+        load_only(Organization.id, Organization.name, Organization.building_id),
+        *(selectinload(getattr(Organization, relation)) for relation in include),
+    ]
+
+
+def _by_building(building_id: int, include: Collection[str] | None) -> Select:
+    return (
+        select(Organization)
+        .where(building_id == Organization.building_id)
+        .options(*_load_options(include))
+    )
+
 
-from ..dto.organization import OrganizationCreate, OrganizationUpdate
-from ..model import Activity, Organization, OrganizationPhone
+def _by_activities(activity_ids: list[int], include: Collection[str] | None) -> Select:
+    return (
+        select(Organization)
+        .join(Organization.activities)
+        .where(Activity.id.in_(activity_ids))
+        .options(*_load_options(include))
+        .distinct()
+    )
+
+
+def _by_name(name: str, include: Collection[str] | None) -> Select:
+    return (
+        select(Organization)
+        .where(Organization.name.ilike(f"%{name}%"))
+        .options(*_load_options(include))
+    )
 
 
 class OrganizationRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.model = Organization
+        self.documents = OrganizationDocumentRepository(db)
+        self.changes = ChangeLogRepository(db)
 
     async def get(self, organization_id: int) -> Organization | None:
         """Получить организацию по ID"""
@@ -18,19 +67,30 @@ class OrganizationRepository:
         )
         return result.scalar_one_or_none()
 
-    async def get_with_relations(self, organization_id: int) -> Organization | None:
-        """Получить организацию со всеми связями"""
+    async def get_with_relations(
+        self, organization_id: int, include: Collection[str] | None = None
+    ) -> Organization | None:
+        """Получить организацию со связями (по умолчанию со всеми)"""
         result = await self.db.execute(
             select(Organization)
             .where(organization_id == Organization.id)
-            .options(
-                selectinload(Organization.phone_numbers),
-                selectinload(Organization.activities),
-                selectinload(Organization.building),
-            )
+            .options(*_load_options(include))
         )
         return result.scalar_one_or_none()
 
+    async def get_many(
+        self, organization_ids: Collection[int], include: Collection[str] | None = None
+    ) -> dict[int, Organization]:
+        """Получить организации по списку ID одним запросом"""
+        result = await self.db.execute(
+            select(Organization)
+            .where(Organization.id.in_(organization_ids))
+            .options(*_load_options(include))
+        )
+        return {
+            organization.id: organization for organization in result.scalars().all()
+        }
+
     async def get_by_name(self, name: str) -> Organization | None:
         """Получить организацию по имени"""
         result = await self.db.execute(
@@ -38,136 +98,360 @@ class OrganizationRepository:
         )
         return result.scalar_one_or_none()
 
-    async def get_all(self, skip: int = 0, limit: int = 100) -> list[Organization]:
+    async def get_existing_names(self, names: list[str]) -> list[str]:
+        """Какие из названий уже заняты"""
+        result = await self.db.execute(
+            select(Organization.name).where(Organization.name.in_(names))
+        )
+        return result.scalars().all()
+
+    async def get_names(self) -> list[str]:
+        """Названия всех организаций"""
+        result = await self.db.execute(select(Organization.name))
+        return result.scalars().all()
+
+    async def get_all(
+        self, skip: int = 0, limit: int = 100, include: Collection[str] | None = None
+    ) -> list[Organization]:
         """Получить все организации"""
         result = await self.db.execute(
             select(Organization)
             .offset(skip)
             .limit(limit)
-            .options(
-                selectinload(Organization.phone_numbers),
-                selectinload(Organization.activities),
-                selectinload(Organization.building),
-            )
+            .options(*_load_options(include))
         )
         return result.scalars().all()
 
-    async def get_by_building(self, building_id: int) -> list[Organization]:
+    async def get_by_building(
+        self, building_id: int, include: Collection[str] | None = None
+    ) -> list[Organization]:
         """Получить организации в здании"""
-        result = await self.db.execute(
-            select(Organization)
-            .where(building_id == Organization.building_id)
-            .options(
-                selectinload(Organization.phone_numbers),
-                selectinload(Organization.activities),
-            )
-        )
+        result = await self.db.execute(_by_building(building_id, include))
         return result.scalars().all()
 
-    async def get_by_activities(self, activity_ids: list[int]) -> list[Organization]:
+    async def get_by_activities(
+        self, activity_ids: list[int], include: Collection[str] | None = None
+    ) -> list[Organization]:
         """Получить организации по видам деятельности"""
-        result = await self.db.execute(
-            select(Organization)
-            .join(Organization.activities)
-            .where(Activity.id.in_(activity_ids))
-            .options(
-                selectinload(Organization.phone_numbers),
-                selectinload(Organization.activities),
-                selectinload(Organization.building),
-            )
-            .distinct()
-        )
+        result = await self.db.execute(_by_activities(activity_ids, include))
         return result.scalars().all()
 
-    async def search_by_name(self, name: str) -> list[Organization]:
+    async def search_by_name(
+        self, name: str, include: Collection[str] | None = None
+    ) -> list[Organization]:
         """Поиск организаций по названию"""
+        result = await self.db.execute(_by_name(name, include))
+        return result.scalars().all()
+
+    def stream_by_building(
+        self, building_id: int, chunk_size: int, include: Collection[str] | None = None
+    ) -> AsyncIterator[list[Organization]]:
+        """Организации в здании частями по chunk_size"""
+        return self._stream(_by_building(building_id, include), chunk_size)
+
+    def stream_by_activities(
+        self,
+        activity_ids: list[int],
+        chunk_size: int,
+        include: Collection[str] | None = None,
+    ) -> AsyncIterator[list[Organization]]:
+        """Организации по видам деятельности частями по chunk_size"""
+        return self._stream(_by_activities(activity_ids, include), chunk_size)
+
+    def stream_by_name(
+        self, name: str, chunk_size: int, include: Collection[str] | None = None
+    ) -> AsyncIterator[list[Organization]]:
+        """Поиск организаций по названию частями по chunk_size"""
+        return self._stream(_by_name(name, include), chunk_size)
+
+    async def _stream(
+        self, query: Select, chunk_size: int
+    ) -> AsyncIterator[list[Organization]]:
+        """Читать результат серверным курсором, связи - по каждой части
+
+        Сессия держит неизменённые объекты по слабым ссылкам, поэтому
+        обработанные части не накапливаются в ней.
+        """
+        result = await self.db.stream(query.execution_options(yield_per=chunk_size))
+        async for organizations in result.scalars().partitions():
+            yield organizations
+
+    async def get_ids_by_phone(self, digits: str, prefix: bool = False) -> list[int]:
+        """Найти ID организаций по цифрам телефона или их началу"""
+        condition = (
+            OrganizationPhone.phone_digits.startswith(digits, autoescape=True)
+            if prefix
+            else OrganizationPhone.phone_digits == digits
+        )
         result = await self.db.execute(
-            select(Organization)
-            .where(Organization.name.ilike(f"%{name}%"))
-            .options(
-                selectinload(Organization.phone_numbers),
-                selectinload(Organization.activities),
-                selectinload(Organization.building),
-            )
+            select(OrganizationPhone.organization_id)
+            .where(condition)
+            .distinct()
+            .order_by(OrganizationPhone.organization_id)
         )
         return result.scalars().all()
 
-    async def create(self, organization_data: OrganizationCreate) -> Organization:
-        """Создать новую организацию"""
+    async def create(
+        self, organization_data: OrganizationCreate, phone_digits: list[str]
+    ) -> Organization:
+        """Создать новую организацию
+
+        phone_digits - нормализованные номера в порядке phone_numbers.
+        Несуществующая деятельность нарушает внешний ключ связи.
+        """
+        # Связи задаём до flush: у новой организации нечего загружать лениво
         organization = Organization(
-            name=organization_data.name, building_id=organization_data.building_id
+            name=organization_data.name,
+            building_id=organization_data.building_id,
+            phone_numbers=[
+                OrganizationPhone(
+                    phone_number=phone_data.phone_number, phone_digits=digits
+                )
+                for phone_data, digits in zip(
+                    organization_data.phone_numbers, phone_digits, strict=True
+                )
+            ],
         )
         self.db.add(organization)
         await self.db.flush()
+        await self._link_activities(organization.id, organization_data.activity_ids)
 
-        # Добавляем телефоны
-        for phone_data in organization_data.phone_numbers:
-            phone = OrganizationPhone(
-                phone_number=phone_data.phone_number, organization_id=organization.id
-            )
-            self.db.add(phone)
+        await self.documents.refresh([organization.id])
+        await self.changes.record(ORGANIZATION, [organization.id], UPSERT)
+        return await self._reload(organization.id)
 
-        # Добавляем деятельности
-        if organization_data.activity_ids:
-            activities_result = await self.db.execute(
-                select(Activity).where(Activity.id.in_(organization_data.activity_ids))
+    async def create_many(
+        self, organizations: list[OrganizationCreate], phone_digits: list[list[str]]
+    ) -> list[dict]:
+        """Создать организации многострочными INSERT
+
+        phone_digits - нормализованные номера каждой организации. Возвращает
+        документы созданных организаций (форма DTO Organization) в порядке
+        списка.
+        """
+        result = await self.db.execute(
+            insert(Organization).returning(
+                Organization.id, sort_by_parameter_order=True
+            ),
+            [
+                {"name": data.name, "building_id": data.building_id}
+                for data in organizations
+            ],
+        )
+        organization_ids = list(result.scalars().all())
+
+        phones = [
+            {
+                "organization_id": organization_id,
+                "phone_number": phone_data.phone_number,
+                "phone_digits": digits,
+            }
+            for organization_id, data, organization_digits in zip(
+                organization_ids, organizations, phone_digits, strict=True
+            )
+            for phone_data, digits in zip(
+                data.phone_numbers, organization_digits, strict=True
+            )
+        ]
+        if phones:
+            await self.db.execute(insert(OrganizationPhone), phones)
+        links = [
+            {"organization_id": organization_id, "activity_id": activity_id}
+            for organization_id, data in zip(
+                organization_ids, organizations, strict=True
             )
-            activities = activities_result.scalars().all()
-            organization.activities.extend(activities)
+            for activity_id in dict.fromkeys(data.activity_ids or ())
+        ]
+        if links:
+            await self.db.execute(insert(organization_activity), links)
 
-        await self.db.flush()
-        await self.db.refresh(organization)
-        return organization
+        documents = await self.documents.refresh(organization_ids)
+        await self.changes.record(ORGANIZATION, organization_ids, UPSERT)
+        return [documents[organization_id] for organization_id in organization_ids]
 
     async def update(
-        self, organization_id: int, update_data: OrganizationUpdate
-    ) -> Organization | None:
-        """Обновить организацию"""
-        organization = await self.get_with_relations(organization_id)
-        if not organization:
-            return None
+        self,
+        organization_id: int,
+        update_data: OrganizationUpdate,
+        phone_digits: list[str] | None = None,
+    ) -> dict | None:
+        """Обновить организацию, изменив только то, что отличается
 
-        # Обновляем базовые поля
-        if update_data.name is not None:
-            organization.name = update_data.name
-        if update_data.building_id is not None:
-            organization.building_id = update_data.building_id
+        phone_digits - нормализованные номера в порядке phone_numbers.
+        Телефоны и деятельности сравниваются с текущими: удаляются и
+        добавляются только отличающиеся, поэтому правка организации с
+        множеством связей стоит нескольких небольших запросов. Возвращает
+        документ организации (форма DTO Organization) или None, если её нет.
+        Несуществующие здание и деятельность нарушают внешние ключи.
+        """
+        values = update_data.model_dump(
+            include={"name", "building_id"}, exclude_none=True
+        )
+        # Телефоны и деятельности меняют организацию, даже если её строка та же
+        result = await self.db.execute(
+            update(Organization)
+            .where(organization_id == Organization.id)
+            .values(**values, updated_at=func.now())
+            .returning(Organization.id)
+        )
+        if result.scalar_one_or_none() is None:
+            return None
 
-        # Обновляем телефоны
         if update_data.phone_numbers is not None:
-            # Удаляем старые телефоны
+            await self._replace_phones(
+                organization_id,
+                [phone.phone_number for phone in update_data.phone_numbers],
+                phone_digits,
+            )
+        if update_data.activity_ids is not None:
+            await self._replace_activities(organization_id, update_data.activity_ids)
+
+        documents = await self.documents.refresh([organization_id])
+        await self.changes.record(ORGANIZATION, [organization_id], UPSERT)
+        return documents[organization_id]
+
+    async def _replace_phones(
+        self, organization_id: int, phone_numbers: list[str], phone_digits: list[str]
+    ) -> None:
+        """Привести телефоны организации к списку, сохранив совпадающие строки"""
+        result = await self.db.execute(
+            select(OrganizationPhone.id, OrganizationPhone.phone_number).where(
+                organization_id == OrganizationPhone.organization_id
+            )
+        )
+        wanted = Counter(phone_numbers)
+        stale = []
+        for phone_id, phone_number in result.all():
+            if wanted[phone_number]:
+                wanted[phone_number] -= 1
+            else:
+                stale.append(phone_id)
+
+        if stale:
             await self.db.execute(
-                delete(OrganizationPhone).where(
-                    organization_id == OrganizationPhone.organization_id
+                delete(OrganizationPhone).where(OrganizationPhone.id.in_(stale))
+            )
+        added = []
+        for phone_number, digits in zip(phone_numbers, phone_digits, strict=True):
+            if wanted[phone_number]:
+                wanted[phone_number] -= 1
+                added.append(
+                    {
+                        "organization_id": organization_id,
+                        "phone_number": phone_number,
+                        "phone_digits": digits,
+                    }
                 )
+        if added:
+            await self.db.execute(insert(OrganizationPhone), added)
+
+    async def _replace_activities(
+        self, organization_id: int, activity_ids: list[int]
+    ) -> None:
+        """Привести связи с деятельностями к списку ID"""
+        result = await self.db.execute(
+            select(organization_activity.c.activity_id).where(
+                organization_activity.c.organization_id == organization_id
             )
-            # Добавляем новые
-            for phone_data in update_data.phone_numbers:
-                phone = OrganizationPhone(
-                    phone_number=phone_data.phone_number,
-                    organization_id=organization_id,
+        )
+        current = set(result.scalars().all())
+        wanted = dict.fromkeys(activity_ids)
+
+        stale = current.difference(wanted)
+        if stale:
+            await self.db.execute(
+                delete(organization_activity).where(
+                    organization_activity.c.organization_id == organization_id,
+                    organization_activity.c.activity_id.in_(stale),
                 )
-                self.db.add(phone)
+            )
+        await self._link_activities(
+            organization_id, [id for id in wanted if id not in current]
+        )
 
-        # Обновляем деятельности
-        if update_data.activity_ids is not None:
-            organization.activities.clear()
-            activities_result = await self.db.execute(
-                select(Activity).where(Activity.id.in_(update_data.activity_ids))
+    async def get_ids(
+        self,
+        building_id: int | None = None,
+        activity_id: int | None = None,
+        organization_ids: Collection[int] | None = None,
+    ) -> list[int]:
+        """ID организаций по фильтрам, объединённым через И
+
+        activity_id включает потомков деятельности.
+        """
+        query = select(Organization.id).order_by(Organization.id)
+        if building_id is not None:
+            query = query.where(building_id == Organization.building_id)
+        if activity_id is not None:
+            query = query.where(
+                Organization.id.in_(
+                    select(OrganizationDocument.organization_id).where(
+                        OrganizationDocument.activity_path_ids.contains([activity_id])
+                    )
+                )
             )
-            activities = activities_result.scalars().all()
-            organization.activities.extend(activities)
+        if organization_ids is not None:
+            query = query.where(Organization.id.in_(organization_ids))
+        result = await self.db.execute(query)
+        return result.scalars().all()
 
-        await self.db.flush()
-        await self.db.refresh(organization)
-        return organization
+    async def get_ids_after(self, after_id: int, limit: int) -> list[int]:
+        """Следующие limit ID организаций после after_id по возрастанию"""
+        result = await self.db.execute(
+            select(Organization.id)
+            .where(Organization.id > after_id)
+            .order_by(Organization.id)
+            .limit(limit)
+        )
+        return result.scalars().all()
+
+    async def count(self) -> int:
+        result = await self.db.execute(select(func.count(Organization.id)))
+        return result.scalar_one()
 
     async def delete(self, organization_id: int) -> bool:
         """Удалить организацию"""
-        organization = await self.get(organization_id)
-        if not organization:
-            return False
+        return bool(await self.delete_many([organization_id]))
 
-        await self.db.delete(organization)
-        await self.db.flush()
-        return True
+    async def delete_many(self, organization_ids: Collection[int]) -> list[int]:
+        """Удалить организации по ID, вернуть ID удалённых
+
+        Организации не загружаются в сессию: строки удаляются запросами
+        DELETE ... RETURNING, телефоны и связи с деятельностями удаляет БД
+        каскадом. Документы удаляются первыми, по ним уменьшаются счётчики.
+        """
+        if not organization_ids:
+            return []
+        await self.documents.delete_many(organization_ids)
+        result = await self.db.execute(
+            delete(Organization)
+            .where(Organization.id.in_(organization_ids))
+            .returning(Organization.id)
+        )
+        deleted = result.scalars().all()
+        await self.changes.record(ORGANIZATION, deleted, DELETE)
+        return deleted
+
+    async def _link_activities(
+        self, organization_id: int, activity_ids: list[int] | None
+    ) -> None:
+        """Связать организацию с деятельностями по ID, без их загрузки"""
+        if not activity_ids:
+            return
+        await self.db.execute(
+            insert(organization_activity),
+            [
+                {"organization_id": organization_id, "activity_id": activity_id}
+                for activity_id in dict.fromkeys(activity_ids)
+            ],
+        )
+
+    async def _reload(self, organization_id: int) -> Organization:
+        """Перечитать организацию со всеми связями поверх объекта в сессии"""
+        result = await self.db.execute(
+            select(Organization)
+            .where(organization_id == Organization.id)
+            .options(*_load_options())
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one()
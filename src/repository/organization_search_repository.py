@@ -0,0 +1,277 @@
+import logging
+import math
+import re
+from dataclasses import dataclass
+
+from sqlalchemy import exists, func, literal_column, select
+from sqlalchemy.dialects.postgresql import JSONB, aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from ..dto.organization import OrganizationSearch, OrganizationSearchPlan
+from ..model import (
+    ActivityOrganizationCount,
+    Building,
+    BuildingOrganizationCount,
+    OrganizationDocument,
+    OrganizationPhone,
+)
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.32
+
+Document = OrganizationDocument
+
+
+@dataclass
+class SearchPredicate:
+    """Условие поиска с оценкой числа подходящих организаций"""
+
+    name: str
+    clause: ColumnElement
+    estimate: int
+
+
+@dataclass
+class SearchPage:
+    total: int
+    items: list[dict]
+    buildings: dict | None = None
+    activities: dict | None = None
+
+
+def _radius_bbox(
+    latitude: float, longitude: float, radius_km: float
+) -> tuple[float, float, float, float]:
+    """Прямоугольник, описанный вокруг круга поиска"""
+    lat_delta = radius_km / KM_PER_DEGREE
+    cos_lat = max(math.cos(math.radians(latitude)), 0.01)
+    lng_delta = min(radius_km / (KM_PER_DEGREE * cos_lat), 180.0)
+    return (
+        latitude - lat_delta,
+        latitude + lat_delta,
+        longitude - lng_delta,
+        longitude + lng_delta,
+    )
+
+
+def _in_bbox(latitude, longitude, bbox: tuple[float, float, float, float]):
+    min_lat, max_lat, min_lng, max_lng = bbox
+    return latitude.between(min_lat, max_lat) & longitude.between(min_lng, max_lng)
+
+
+def _distance_km(latitude: float, longitude: float):
+    """Расстояние по формуле гаверсинусов от точки до здания организации"""
+    lat = func.radians(Document.latitude)
+    center_lat = math.radians(latitude)
+    return (
+        2
+        * EARTH_RADIUS_KM
+        * func.asin(
+            func.sqrt(
+                func.power(func.sin((lat - center_lat) / 2), 2)
+                + math.cos(center_lat)
+                * func.cos(lat)
+                * func.power(
+                    func.sin(
+                        (func.radians(Document.longitude) - math.radians(longitude)) / 2
+                    ),
+                    2,
+                )
+            )
+        )
+    )
+
+
+def _json_object(subquery) -> ColumnElement:
+    return func.coalesce(
+        select(
+            func.jsonb_object_agg(subquery.c.key, subquery.c.count, type_=JSONB)
+        ).scalar_subquery(),
+        literal_column("'{}'::jsonb"),
+    )
+
+
+class OrganizationSearchRepository:
+    """Комбинированный поиск по документам организаций
+
+    Условия компилируются в один запрос. Самое избирательное условие по
+    оценке из счётчиков организаций выполняется первым в материализованном
+    CTE, остальные проверяются только на его результатах.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def plan(
+        self, criteria: OrganizationSearch
+    ) -> tuple[list[SearchPredicate], OrganizationSearchPlan]:
+        """Оценить условия и упорядочить их по избирательности"""
+        geo_bbox = criteria.bbox
+        if criteria.radius_km is not None:
+            geo_bbox = _radius_bbox(
+                criteria.latitude, criteria.longitude, criteria.radius_km
+            )
+
+        # Все оценки получаем одним запросом к небольшим таблицам счётчиков
+        estimates = {
+            "total": select(
+                func.coalesce(func.sum(BuildingOrganizationCount.organization_count), 0)
+            ).scalar_subquery()
+        }
+        if criteria.building_id is not None:
+            estimates["building"] = (
+                select(BuildingOrganizationCount.organization_count)
+                .where(BuildingOrganizationCount.building_id == criteria.building_id)
+                .scalar_subquery()
+            )
+        if criteria.activity_ids:
+            estimates["activity"] = (
+                select(func.sum(ActivityOrganizationCount.organization_count))
+                .where(ActivityOrganizationCount.activity_id.in_(criteria.activity_ids))
+                .scalar_subquery()
+            )
+        if geo_bbox is not None:
+            estimates["geo"] = (
+                select(func.sum(BuildingOrganizationCount.organization_count))
+                .join(Building, Building.id == BuildingOrganizationCount.building_id)
+                .where(_in_bbox(Building.latitude, Building.longitude, geo_bbox))
+                .scalar_subquery()
+            )
+        result = await self.db.execute(
+            select(*(value.label(key) for key, value in estimates.items()))
+        )
+        counts = {key: int(value or 0) for key, value in result.one()._mapping.items()}
+        total = counts["total"]
+
+        predicates = []
+        if criteria.building_id is not None:
+            predicates.append(
+                SearchPredicate(
+                    "building",
+                    Document.building_id == criteria.building_id,
+                    counts["building"],
+                )
+            )
+        if criteria.activity_ids:
+            predicates.append(
+                SearchPredicate(
+                    "activity",
+                    Document.activity_path_ids.overlap(criteria.activity_ids),
+                    min(counts["activity"], total),
+                )
+            )
+        if geo_bbox is not None:
+            clause = _in_bbox(Document.latitude, Document.longitude, geo_bbox)
+            if criteria.radius_km is not None:
+                clause &= (
+                    _distance_km(criteria.latitude, criteria.longitude)
+                    <= criteria.radius_km
+                )
+            predicates.append(SearchPredicate("geo", clause, counts["geo"]))
+        if criteria.name is not None:
+            # Для подстроки индекса нет: считаем, что каждый символ вдвое
+            # сужает выборку
+            predicates.append(
+                SearchPredicate(
+                    "name",
+                    Document.name.ilike(f"%{criteria.name}%"),
+                    max(1, int(total * 0.5 ** (len(criteria.name) - 1))),
+                )
+            )
+        if criteria.phone is not None:
+            # Номера хранятся нормализованными, префикс ищется по индексу
+            digits = re.sub(r"\D", "", criteria.phone)
+            predicates.append(
+                SearchPredicate(
+                    "phone",
+                    exists().where(
+                        OrganizationPhone.organization_id == Document.organization_id,
+                        OrganizationPhone.phone_digits.startswith(
+                            digits, autoescape=True
+                        ),
+                    ),
+                    max(1, int(total * 0.1 ** (len(digits) - 1))),
+                )
+            )
+
+        predicates.sort(key=lambda predicate: predicate.estimate)
+        plan = OrganizationSearchPlan(
+            driver=predicates[0].name if predicates else None,
+            filters=[predicate.name for predicate in predicates[1:]],
+            estimates={
+                "total": total,
+                **{predicate.name: predicate.estimate for predicate in predicates},
+            },
+        )
+        return predicates, plan
+
+    async def search(
+        self, criteria: OrganizationSearch
+    ) -> tuple[SearchPage, OrganizationSearchPlan]:
+        """Найти страницу организаций, общее число и фасеты одним запросом"""
+        predicates, plan = await self.plan(criteria)
+        logger.debug("Organization search plan: %s", plan)
+
+        matched = select(
+            Document.organization_id,
+            Document.building_id,
+            Document.activity_ids,
+            Document.document,
+        )
+        if predicates:
+            driver, *filters = predicates
+            candidates = (
+                select(Document.organization_id)
+                .where(driver.clause)
+                .cte("candidates")
+                .prefix_with("MATERIALIZED")
+            )
+            matched = matched.join(
+                candidates, candidates.c.organization_id == Document.organization_id
+            ).where(*(predicate.clause for predicate in filters))
+        matched = matched.cte("matched")
+
+        page = (
+            select(matched.c.organization_id, matched.c.document)
+            .order_by(matched.c.organization_id)
+            .offset(criteria.skip)
+            .limit(criteria.limit)
+            .subquery("page")
+        )
+        columns = [
+            select(func.count()).select_from(matched).scalar_subquery().label("total"),
+            func.coalesce(
+                select(
+                    func.jsonb_agg(
+                        aggregate_order_by(page.c.document, page.c.organization_id),
+                        type_=JSONB,
+                    )
+                ).scalar_subquery(),
+                literal_column("'[]'::jsonb"),
+            ).label("items"),
+        ]
+        if criteria.facets:
+            buildings = (
+                select(matched.c.building_id.label("key"), func.count().label("count"))
+                .group_by(matched.c.building_id)
+                .subquery("building_facets")
+            )
+            activity_ids = select(
+                func.unnest(matched.c.activity_ids).label("activity_id")
+            ).subquery("activity_ids")
+            activities = (
+                select(
+                    activity_ids.c.activity_id.label("key"),
+                    func.count().label("count"),
+                )
+                .group_by(activity_ids.c.activity_id)
+                .subquery("activity_facets")
+            )
+            columns.append(_json_object(buildings).label("buildings"))
+            columns.append(_json_object(activities).label("activities"))
+
+        result = await self.db.execute(select(*columns))
+        return SearchPage(**result.one()._mapping), plan
@@ -0,0 +1,69 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..model import Activity, Building, Organization, OrganizationPhone
+from ..model.organization import organization_activity
+
+
+class SnapshotRepository:
+    """Полная выгрузка справочника для снимков в памяти и на диске
+
+    Читаются только нужные колонки, без ORM-объектов: строки сразу
+    превращаются в компактные записи снимка.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_buildings(self) -> list[tuple]:
+        """(id, address, latitude, longitude) всех зданий по возрастанию ID"""
+        result = await self.db.execute(
+            select(
+                Building.id, Building.address, Building.latitude, Building.longitude
+            ).order_by(Building.id)
+        )
+        return result.all()
+
+    async def get_activities(self) -> list[tuple]:
+        """(id, name, parent_id) всех деятельностей по возрастанию ID"""
+        result = await self.db.execute(
+            select(Activity.id, Activity.name, Activity.parent_id).order_by(Activity.id)
+        )
+        return result.all()
+
+    async def get_organizations(self) -> list[tuple]:
+        """(id, name, building_id) организаций со зданием по возрастанию ID
+
+        Организации без здания в снимок не попадают и читаются из БД.
+        """
+        result = await self.db.execute(
+            select(Organization.id, Organization.name, Organization.building_id)
+            .where(Organization.building_id.is_not(None))
+            .order_by(Organization.id)
+        )
+        return result.all()
+
+    async def get_phones(self) -> list[tuple]:
+        """(id, organization_id, phone_number, phone_digits) всех телефонов"""
+        result = await self.db.execute(
+            select(
+                OrganizationPhone.id,
+                OrganizationPhone.organization_id,
+                OrganizationPhone.phone_number,
+                OrganizationPhone.phone_digits,
+            ).order_by(OrganizationPhone.id)
+        )
+        return result.all()
+
+    async def get_organization_activities(self) -> list[tuple]:
+        """(organization_id, activity_id) всех связей организаций с деятельностями"""
+        result = await self.db.execute(
+            select(
+                organization_activity.c.organization_id,
+                organization_activity.c.activity_id,
+            ).order_by(
+                organization_activity.c.organization_id,
+                organization_activity.c.activity_id,
+            )
+        )
+        return result.all()
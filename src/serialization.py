@@ -0,0 +1,61 @@
+from collections.abc import AsyncIterator
+from functools import cache
+from typing import Any
+
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+
+from .config import settings
+
+
+@cache
+def type_adapter(type_: Any) -> TypeAdapter:
+    """Скомпилированный TypeAdapter для типа (один на процесс)"""
+    return TypeAdapter(type_)
+
+
+def from_orm(type_: Any, obj: Any) -> Any:
+    """Преобразовать ORM-объекты в DTO за один проход валидации"""
+    return type_adapter(type_).validate_python(obj, from_attributes=True)
+
+
+def json_response(type_: Any, content: Any, exclude_unset: bool = False) -> Any:
+    """Сериализовать DTO сразу в JSON-байты
+
+    Ответ, возвращённый маршрутом как Response, FastAPI не валидирует
+    повторно по response_model. response_model при этом остаётся на
+    маршруте и описывает ответ в OpenAPI. При выключенном
+    FAST_SERIALIZATION content возвращается как есть.
+    """
+    if not settings.FAST_SERIALIZATION:
+        return content
+    return Response(
+        content=type_adapter(type_).dump_json(content, exclude_unset=exclude_unset),
+        media_type="application/json",
+    )
+
+
+def json_stream(
+    type_: Any, chunks: AsyncIterator[list], exclude_unset: bool = False
+) -> StreamingResponse:
+    """Отдать JSON-массив потоком, кодируя каждую часть сразу после чтения
+
+    type_ - тип элемента массива. В памяти одновременно находится только
+    одна часть, размер ответа на пиковую память не влияет.
+    """
+    adapter = type_adapter(list[type_])
+
+    async def encode():
+        yield b"["
+        separator = b""
+        async for items in chunks:
+            if not items:
+                continue
+            yield separator
+            # Части склеиваются в один массив без своих скобок
+            yield adapter.dump_json(items, exclude_unset=exclude_unset)[1:-1]
+            separator = b","
+        yield b"]"
+
+    return StreamingResponse(encode(), media_type="application/json")
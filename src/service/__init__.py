@@ -1,5 +1,13 @@
 from .activity_service import ActivityService
 from .building_service import BuildingService
+from .change_service import ChangeService
+from .job_service import JobService
 from .organization_service import OrganizationService
 
-__all__ = ["ActivityService", "BuildingService", "OrganizationService"]
+__all__ = [
+    "ActivityService",
+    "BuildingService",
+    "ChangeService",
+    "JobService",
+    "OrganizationService",
+]
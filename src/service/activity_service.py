@@ -2,35 +2,84 @@ import logging
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..database import with_transaction
-from ..dto.activity import ActivityCreate, ActivityTree
+from ..database import constraint_errors, with_transaction
+from ..dto.activity import (
+    Activity,
+    ActivityCreate,
+    ActivityOrganizationCount,
+    ActivityTree,
+)
+from ..existence_filter import existence_filters
+from ..repository import OrganizationCountRepository, get_loaders
 from ..repository.activity_repository import ActivityRepository
+from ..serialization import from_orm
+from ..snapshot import current_snapshot
 
 logger = logging.getLogger(__name__)
 
+# Проверки, которые при точном промахе фильтра существования выполняет БД
+_CONSTRAINT_ERRORS = {
+    "ux_activities_parent_id_name": (
+        "Деятельность с таким именем уже существует на этом уровне"
+    ),
+}
+_DELETE_CONSTRAINT_ERRORS = {
+    "activities_parent_id_fkey": "Нельзя удалить деятельность с дочерними элементами",
+    "organization_activity_activity_id_fkey": (
+        "Нельзя удалить деятельность с привязанными организациями"
+    ),
+}
+
 
 class ActivityService:
     def __init__(self, db: AsyncSession):
         self.repository = ActivityRepository(db)
+        self.count_repo = OrganizationCountRepository(db)
+        self.loaders = get_loaders(db)
 
-    async def get_activity(self, activity_id: int) -> ActivityCreate | None:
+    async def get_activity_by_id(self, activity_id: int) -> Activity | None:
         """Получить деятельность по ID (бизнес-логика)"""
-        activity = await self.repository.get_with_relations(activity_id)
+        snapshot = current_snapshot()
+        if snapshot is not None:
+            activity = snapshot.activity(activity_id)
+        else:
+            activity = await self.loaders.activities.load(activity_id)
         if activity:
-            return ActivityCreate.model_validate(activity)
+            return Activity.model_validate(activity)
         return None
 
-    async def get_all_activities(self) -> list[ActivityCreate]:
+    async def get_all_activities(self) -> list[Activity]:
         """Получить все деятельности (бизнес-логика)"""
+        snapshot = current_snapshot()
+        if snapshot is not None:
+            return from_orm(list[Activity], snapshot.activities[:])
+
         activities = await self.repository.get_all()
-        return [ActivityCreate.model_validate(activity) for activity in activities]
+        return from_orm(list[Activity], activities)
+
+    async def get_activity_counts(self) -> list[ActivityOrganizationCount]:
+        """Число организаций в поддереве каждой деятельности (бизнес-логика)"""
+        snapshot = current_snapshot()
+        if snapshot is not None:
+            counts = snapshot.activity_counts()
+        else:
+            counts = await self.count_repo.get_activity_counts()
+        return [
+            ActivityOrganizationCount(
+                activity_id=activity_id, organization_count=organization_count
+            )
+            for activity_id, organization_count in counts
+        ]
 
     @with_transaction
-    async def create_activity(self, activity_data: ActivityCreate) -> ActivityCreate:
+    async def create_activity(self, activity_data: ActivityCreate) -> Activity:
         """Создать новую деятельность (бизнес-логика)"""
         # Проверяем бизнес-правила
-        existing_activity = await self.repository.get_by_name_and_parent(
-            activity_data.name, activity_data.parent_id
+        existing_activity = await existence_filters.activity_keys.probe(
+            (activity_data.parent_id, activity_data.name),
+            lambda: self.repository.get_by_name_and_parent(
+                activity_data.name, activity_data.parent_id
+            ),
         )
         if existing_activity:
             raise ValueError(
@@ -43,12 +92,15 @@ class ActivityService:
             if parent_level >= 2:
                 raise ValueError("Максимальная вложенность - 3 уровня")
 
-        activity = await self.repository.create(activity_data)
-        return ActivityCreate.model_validate(activity)
+        with constraint_errors(_CONSTRAINT_ERRORS):
+            activity = await self.repository.create(activity_data)
+        existence_filters.activity_keys.add((activity.parent_id, activity.name))
+        existence_filters.activity_ids.add(activity.id)
+        return Activity.model_validate(activity)
 
     async def update_activity(
         self, activity_id: int, activity_data: ActivityCreate
-    ) -> ActivityCreate | None:
+    ) -> Activity | None:
         """Обновить деятельность (бизнес-логика)"""
         existing_activity = await self.repository.get(activity_id)
         if not existing_activity:
@@ -59,8 +111,11 @@ class ActivityService:
             activity_data.name != existing_activity.name
             or activity_data.parent_id != existing_activity.parent_id
         ):
-            activity_with_same_name = await self.repository.get_by_name_and_parent(
-                activity_data.name, activity_data.parent_id
+            activity_with_same_name = await existence_filters.activity_keys.probe(
+                (activity_data.parent_id, activity_data.name),
+                lambda: self.repository.get_by_name_and_parent(
+                    activity_data.name, activity_data.parent_id
+                ),
             )
             if activity_with_same_name and activity_with_same_name.id != activity_id:
                 raise ValueError(
@@ -74,28 +129,25 @@ class ActivityService:
                     "Нельзя создавать циклические зависимости в дереве деятельностей"
                 )
 
-        updated_activity = await self.repository.update(activity_id, activity_data)
+        with constraint_errors(_CONSTRAINT_ERRORS):
+            updated_activity = await self.repository.update(activity_id, activity_data)
         if updated_activity:
-            return ActivityCreate.model_validate(updated_activity)
+            existence_filters.activity_keys.add(
+                (updated_activity.parent_id, updated_activity.name)
+            )
+            return Activity.model_validate(updated_activity)
         return None
 
     async def delete_activity(self, activity_id: int) -> bool:
         """Удалить деятельность (бизнес-логика)"""
-        activity = await self.repository.get_with_relations(activity_id)
-        if not activity:
-            return False
-
-        # Проверяем бизнес-правила
-        if activity.children:
-            raise ValueError("Нельзя удалить деятельность с дочерними элементами")
-
-        if activity.organizations:
-            raise ValueError("Нельзя удалить деятельность с привязанными организациями")
-
-        return await self.repository.delete(activity_id)
+        # Бизнес-правила проверяют внешние ключи, связи не загружаются
+        self.loaders.activities.clear(activity_id)
+        with constraint_errors(_DELETE_CONSTRAINT_ERRORS):
+            return await self.repository.delete(activity_id)
 
     async def get_activity_tree(self, max_level: int = 3) -> list[ActivityTree]:
         """Получить дерево деятельностей (бизнес-логика)"""
+        snapshot = current_snapshot()
 
         async def build_tree(
             parent_id: int | None = None, level: int = 0
@@ -103,7 +155,10 @@ class ActivityService:
             if level >= max_level:
                 return []
 
-            children = await self.repository.get_children(parent_id)
+            if snapshot is not None:
+                children = snapshot.children(parent_id)
+            else:
+                children = await self.repository.get_children(parent_id)
 
             tree = []
             for child in children:
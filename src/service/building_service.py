@@ -3,36 +3,94 @@ import logging
 from geopy.distance import geodesic
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..database import with_transaction
-from ..dto.building import BuildingCreate, CoordinateRange, RadiusSearch
+from ..database import constraint_errors, with_transaction
+from ..dto.building import (
+    Building,
+    BuildingCreate,
+    BuildingOrganizationCount,
+    CoordinateRange,
+    RadiusSearch,
+)
+from ..existence_filter import existence_filters
+from ..repository import OrganizationCountRepository, get_loaders
 from ..repository.building_repository import BuildingRepository
+from ..serialization import from_orm
+from ..snapshot import current_snapshot
 
 logger = logging.getLogger(__name__)
 
+# Проверки, которые при точном промахе фильтра существования выполняет БД
+_CONSTRAINT_ERRORS = {"ix_buildings_address": "Здание с таким адресом уже существует"}
+_DELETE_CONSTRAINT_ERRORS = {
+    "organizations_building_id_fkey": (
+        "Нельзя удалить здание с привязанными организациями"
+    ),
+}
+
 
 class BuildingService:
     def __init__(self, db: AsyncSession):
         self.repository = BuildingRepository(db)
+        self.count_repo = OrganizationCountRepository(db)
+        self.loaders = get_loaders(db)
 
-    async def get_building(self, building_id: int) -> BuildingCreate | None:
+    async def get_building_by_id(self, building_id: int) -> Building | None:
         """Получить здание по ID (бизнес-логика)"""
-        building = await self.repository.get_with_organizations(building_id)
+        snapshot = current_snapshot()
+        if snapshot is not None:
+            building = snapshot.building(building_id)
+        else:
+            building = await self.loaders.buildings.load(building_id)
         if building:
-            return BuildingCreate.model_validate(building)
+            return Building.model_validate(building)
         return None
 
+    async def get_buildings_by_ids(self, building_ids: list[int]) -> list[Building]:
+        """Получить здания по списку ID в порядке запроса (бизнес-логика)"""
+        snapshot = current_snapshot()
+        if snapshot is not None:
+            buildings = [snapshot.building(building_id) for building_id in building_ids]
+        else:
+            buildings = await self.loaders.buildings.load_many(building_ids)
+        return from_orm(
+            list[Building], [building for building in buildings if building]
+        )
+
     async def get_all_buildings(
         self, skip: int = 0, limit: int = 100
-    ) -> list[BuildingCreate]:
+    ) -> list[Building]:
         """Получить список зданий (бизнес-логика)"""
+        snapshot = current_snapshot()
+        if snapshot is not None:
+            return from_orm(list[Building], snapshot.buildings[skip : skip + limit])
+
         buildings = await self.repository.get_multi(skip=skip, limit=limit)
-        return [BuildingCreate.model_validate(building) for building in buildings]
+        return from_orm(list[Building], buildings)
+
+    async def get_building_counts(
+        self, skip: int = 0, limit: int = 100
+    ) -> list[BuildingOrganizationCount]:
+        """Число организаций в каждом здании (бизнес-логика)"""
+        snapshot = current_snapshot()
+        if snapshot is not None:
+            counts = snapshot.building_counts(skip=skip, limit=limit)
+        else:
+            counts = await self.count_repo.get_building_counts(skip=skip, limit=limit)
+        return [
+            BuildingOrganizationCount(
+                building_id=building_id, organization_count=organization_count
+            )
+            for building_id, organization_count in counts
+        ]
 
     @with_transaction
-    async def create_building(self, building_data: BuildingCreate) -> BuildingCreate:
+    async def create_building(self, building_data: BuildingCreate) -> Building:
         """Создать новое здание (бизнес-логика)"""
         # Проверяем бизнес-правила
-        existing_building = await self.repository.get_by_address(building_data.address)
+        existing_building = await existence_filters.building_addresses.probe(
+            building_data.address,
+            lambda: self.repository.get_by_address(building_data.address),
+        )
         if existing_building:
             raise ValueError("Здание с таким адресом уже существует")
 
@@ -42,12 +100,15 @@ class BuildingService:
         if not (-180 <= building_data.longitude <= 180):
             raise ValueError("Долгота должна быть в диапазоне от -180 до 180")
 
-        building = await self.repository.create(building_data)
-        return BuildingCreate.model_validate(building)
+        with constraint_errors(_CONSTRAINT_ERRORS):
+            building = await self.repository.create(building_data)
+        existence_filters.building_addresses.add(building.address)
+        existence_filters.building_ids.add(building.id)
+        return Building.model_validate(building)
 
     async def update_building(
         self, building_id: int, building_data: BuildingCreate
-    ) -> BuildingCreate | None:
+    ) -> Building | None:
         """Обновить здание (бизнес-логика)"""
         existing_building = await self.repository.get(building_id)
         if not existing_building:
@@ -55,8 +116,11 @@ class BuildingService:
 
         # Проверяем уникальность адреса
         if building_data.address != existing_building.address:
-            building_with_same_address = await self.repository.get_by_address(
-                building_data.address
+            building_with_same_address = (
+                await existence_filters.building_addresses.probe(
+                    building_data.address,
+                    lambda: self.repository.get_by_address(building_data.address),
+                )
             )
             if (
                 building_with_same_address
@@ -64,39 +128,56 @@ class BuildingService:
             ):
                 raise ValueError("Здание с таким адресом уже существует")
 
-        updated_building = await self.repository.update(building_id, building_data)
+        with constraint_errors(_CONSTRAINT_ERRORS):
+            updated_building = await self.repository.update(building_id, building_data)
         if updated_building:
-            return BuildingCreate.model_validate(updated_building)
+            existence_filters.building_addresses.add(updated_building.address)
+            return Building.model_validate(updated_building)
         return None
 
     async def delete_building(self, building_id: int) -> bool:
         """Удалить здание (бизнес-логика)"""
-        building = await self.repository.get_with_organizations(building_id)
-        if not building:
-            return False
-
-        # Проверяем бизнес-правило: нельзя удалить здание с организациями
-        if building.organizations:
-            raise ValueError("Нельзя удалить здание с привязанными организациями")
+        # Бизнес-правило "нельзя удалить здание с организациями" проверяет
+        # внешний ключ, организации не загружаются
+        self.loaders.buildings.clear(building_id)
+        with constraint_errors(_DELETE_CONSTRAINT_ERRORS):
+            return await self.repository.delete(building_id)
 
-        return await self.repository.delete(building_id)
-
-    async def search_buildings_in_range(
+    async def get_buildings_in_range(
         self, coord_range: CoordinateRange
-    ) -> list[BuildingCreate]:
+    ) -> list[Building]:
         """Поиск зданий в прямоугольной области (бизнес-логика)"""
+        snapshot = current_snapshot()
+        if snapshot is not None:
+            return from_orm(
+                list[Building],
+                snapshot.buildings_in_range(
+                    coord_range.min_lat,
+                    coord_range.max_lat,
+                    coord_range.min_lng,
+                    coord_range.max_lng,
+                ),
+            )
+
         buildings = await self.repository.get_in_coordinate_range(
             coord_range.min_lat,
             coord_range.max_lat,
             coord_range.min_lng,
             coord_range.max_lng,
         )
-        return [BuildingCreate.model_validate(building) for building in buildings]
+        return from_orm(list[Building], buildings)
 
-    async def search_buildings_in_radius(
-        self, search: RadiusSearch
-    ) -> list[BuildingCreate]:
+    async def get_buildings_in_radius(self, search: RadiusSearch) -> list[Building]:
         """Поиск зданий в радиусе (бизнес-логика)"""
+        snapshot = current_snapshot()
+        if snapshot is not None:
+            return from_orm(
+                list[Building],
+                snapshot.buildings_in_radius(
+                    search.latitude, search.longitude, search.radius_km
+                ),
+            )
+
         all_buildings = await self.repository.get_all_with_organizations()
 
         center_point = (search.latitude, search.longitude)
@@ -107,6 +188,6 @@ class BuildingService:
             distance = geodesic(center_point, building_point).kilometers
 
             if distance <= search.radius_km:
-                buildings_in_radius.append(BuildingCreate.model_validate(building))
+                buildings_in_radius.append(building)
 
-        return buildings_in_radius
+        return from_orm(list[Building], buildings_in_radius)
@@ -0,0 +1,93 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..dto.activity import Activity
+from ..dto.building import Building
+from ..dto.change import ChangePage, EntityChange
+from ..model.change import ACTIVITY, BUILDING, ORGANIZATION, UPSERT
+from ..repository import ChangeLogRepository, get_loaders
+from ..serialization import from_orm
+from .organization_service import OrganizationService
+
+
+def format_cursor(txid: int, change_id: int) -> str:
+    return f"{txid}:{change_id}"
+
+
+def parse_cursor(cursor: str) -> tuple[int, int]:
+    """Разобрать курсор вида txid:id"""
+    txid, separator, change_id = cursor.partition(":")
+    if not separator:
+        raise ValueError("Неверный формат курсора")
+    return int(txid), int(change_id)
+
+
+class ChangeService:
+    def __init__(self, db: AsyncSession):
+        self.change_repo = ChangeLogRepository(db)
+        self.organization_service = OrganizationService(db)
+        self.loaders = get_loaders(db)
+
+    async def get_changes(
+        self, cursor: tuple[int, int] | None = None, limit: int = 100
+    ) -> ChangePage:
+        """Изменения после курсора с текущим состоянием сущностей (бизнес-логика)"""
+        changes = await self.change_repo.get_since(cursor, limit)
+        if not changes:
+            return ChangePage(
+                changes=[], cursor=format_cursor(*cursor) if cursor else None
+            )
+
+        # Из нескольких изменений одной сущности на странице достаточно
+        # последнего: состояние всё равно читается текущее
+        latest = {}
+        for change in changes:
+            latest.pop((change.entity_type, change.entity_id), None)
+            latest[(change.entity_type, change.entity_id)] = change
+
+        upserted = {ORGANIZATION: [], BUILDING: [], ACTIVITY: []}
+        for (entity_type, entity_id), change in latest.items():
+            if change.operation == UPSERT:
+                upserted[entity_type].append(entity_id)
+        entities = await self._load_entities(upserted)
+
+        items = []
+        for key, change in latest.items():
+            data = entities.get(key)
+            # Сущность удалена позже: её надгробие придёт дальше по журналу
+            if change.operation == UPSERT and data is None:
+                continue
+            items.append(
+                EntityChange(
+                    cursor=format_cursor(change.txid, change.id),
+                    entity_type=change.entity_type,
+                    entity_id=change.entity_id,
+                    operation=change.operation,
+                    changed_at=change.changed_at,
+                    data=data,
+                )
+            )
+
+        last = changes[-1]
+        return ChangePage(
+            changes=items,
+            cursor=format_cursor(last.txid, last.id),
+            has_more=len(changes) == limit,
+        )
+
+    async def _load_entities(self, upserted: dict[str, list[int]]) -> dict:
+        """Загрузить текущее состояние изменённых сущностей по типам"""
+        entities = {}
+        organizations = await self.organization_service.get_organizations_by_ids(
+            upserted[ORGANIZATION]
+        )
+        for organization in organizations:
+            entities[(ORGANIZATION, organization.id)] = organization
+
+        buildings = await self.loaders.buildings.load_many(upserted[BUILDING])
+        for building in from_orm(list[Building], [b for b in buildings if b]):
+            entities[(BUILDING, building.id)] = building
+
+        activities = await self.loaders.activities.load_many(upserted[ACTIVITY])
+        for activity in from_orm(list[Activity], [a for a in activities if a]):
+            entities[(ACTIVITY, activity.id)] = activity
+        return entities
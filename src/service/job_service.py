@@ -0,0 +1,31 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..dto.job import Job, JobCreate
+from ..repository import JobRepository
+
+
+class JobService:
+    def __init__(self, db: AsyncSession):
+        self.job_repo = JobRepository(db)
+
+    async def create_job(self, job_data: JobCreate) -> Job:
+        """Поставить задачу в очередь (бизнес-логика)"""
+        job = await self.job_repo.create(
+            job_data.kind, job_data.model_dump(mode="json")
+        )
+        return Job.model_validate(job)
+
+    async def get_job(self, job_id: int) -> Job | None:
+        job = await self.job_repo.get(job_id)
+        return Job.model_validate(job) if job else None
+
+    async def get_jobs(
+        self, status: str | None = None, skip: int = 0, limit: int = 100
+    ) -> list[Job]:
+        jobs = await self.job_repo.get_multi(status, skip, limit)
+        return [Job.model_validate(job) for job in jobs]
+
+    async def cancel_job(self, job_id: int) -> Job | None:
+        """Отменить незавершённую задачу, None - такой задачи нет (бизнес-логика)"""
+        job = await self.job_repo.cancel(job_id)
+        return Job.model_validate(job) if job else None
@@ -1,35 +1,116 @@
 import logging
+import re
+from collections.abc import AsyncIterator, Collection
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..database import with_transaction
-from ..dto.organization import Organization, OrganizationCreate, OrganizationUpdate
-from ..repository import ActivityRepository, BuildingRepository, OrganizationRepository
+from ..config import settings
+from ..database import constraint_errors, with_transaction
+from ..dto.organization import (
+    Organization,
+    OrganizationBulkDelete,
+    OrganizationCreate,
+    OrganizationPartial,
+    OrganizationSearch,
+    OrganizationSearchFacets,
+    OrganizationSearchResult,
+    OrganizationUpdate,
+)
+from ..existence_filter import existence_filters
+from ..repository import (
+    ActivityRepository,
+    BuildingRepository,
+    OrganizationDocumentRepository,
+    OrganizationRepository,
+    OrganizationSearchRepository,
+    get_loaders,
+)
+from ..serialization import from_orm
 from ..service import ActivityService
+from ..snapshot import current_snapshot
 
 logger = logging.getLogger(__name__)
 
+# Проверки, которые при точном промахе фильтра существования выполняет БД
+_CONSTRAINT_ERRORS = {
+    "ix_organizations_name": "Организация с таким названием уже существует",
+    "organizations_building_id_fkey": "Указанное здание не существует",
+    "organization_activity_activity_id_fkey": "Указанная деятельность не существует",
+}
+
 
 class OrganizationService:
     def __init__(self, db: AsyncSession):
         self.organization_repo = OrganizationRepository(db)
+        self.document_repo = OrganizationDocumentRepository(db)
+        self.search_repo = OrganizationSearchRepository(db)
         self.building_repo = BuildingRepository(db)
         self.activity_repo = ActivityRepository(db)
         self.activity_service = ActivityService(db)
+        self.loaders = get_loaders(db)
 
-    async def get_organization(self, organization_id: int) -> Organization | None:
+    async def get_organization_by_id(
+        self, organization_id: int, include: Collection[str] | None = None
+    ) -> Organization | OrganizationPartial | None:
         """Получить организацию по ID (бизнес-логика)"""
-        organization = await self.organization_repo.get_with_relations(organization_id)
+        snapshot = current_snapshot()
+        if snapshot is not None:
+            organization = snapshot.organization(organization_id)
+            if organization:
+                return self._documents_to_dto_list(
+                    [snapshot.document(organization)], include
+                )[0]
+            # Организаций без здания в снимке нет: ищем в БД
+
+        if settings.READ_MODEL_ENABLED:
+            document = await self.loaders.organization_documents.load(organization_id)
+            if document:
+                return self._documents_to_dto_list([document], include)[0]
+            return None
+
+        organization = await self.loaders.organizations(include).load(organization_id)
         if organization:
-            return Organization.model_validate(organization)
+            return self._to_dto_list([organization], include)[0]
         return None
 
+    async def get_organizations_by_ids(
+        self, organization_ids: list[int], include: Collection[str] | None = None
+    ) -> list[Organization] | list[OrganizationPartial]:
+        """Получить организации по списку ID в порядке запроса (бизнес-логика)"""
+        snapshot = current_snapshot()
+        if snapshot is None:
+            return await self._get_organizations_from_db(organization_ids, include)
+
+        organizations = {i: snapshot.organization(i) for i in organization_ids}
+        found = self._documents_to_dto_list(
+            [snapshot.document(o) for o in organizations.values() if o], include
+        )
+        # Организаций без здания в снимке нет: их читаем из БД
+        missing = [i for i, organization in organizations.items() if not organization]
+        if missing:
+            found += await self._get_organizations_from_db(missing, include)
+        by_id = {organization.id: organization for organization in found}
+        return [by_id[i] for i in organization_ids if i in by_id]
+
     async def get_all_organizations(
-        self, skip: int = 0, limit: int = 100
-    ) -> list[Organization]:
+        self, skip: int = 0, limit: int = 100, include: Collection[str] | None = None
+    ) -> list[Organization] | list[OrganizationPartial]:
         """Получить все организации (бизнес-логика)"""
-        organizations = await self.organization_repo.get_all(skip=skip, limit=limit)
-        return [Organization.model_validate(org) for org in organizations]
+        snapshot = current_snapshot()
+        if snapshot is not None:
+            organizations = snapshot.organizations_page(skip=skip, limit=limit)
+            return self._documents_to_dto_list(
+                [snapshot.document(o) for o in organizations], include
+            )
+
+        if settings.READ_MODEL_ENABLED:
+            documents = await self.document_repo.get_all(skip=skip, limit=limit)
+            return self._documents_to_dto_list(documents, include)
+
+        organizations = await self.organization_repo.get_all(
+            skip=skip, limit=limit, include=include
+        )
+        return self._to_dto_list(organizations, include)
 
     @with_transaction
     async def create_organization(
@@ -39,46 +120,157 @@ class OrganizationService:
         # Проверяем бизнес-правила
 
         # 1. Проверяем уникальность имени
-        existing_organization = await self.organization_repo.get_by_name(
-            organization_data.name
+        existing_organization = await existence_filters.organization_names.probe(
+            organization_data.name,
+            lambda: self.organization_repo.get_by_name(organization_data.name),
         )
         if existing_organization:
             raise ValueError("Организация с таким названием уже существует")
 
         # 2. Проверяем существование здания
-        building = await self.building_repo.get(organization_data.building_id)
-        if not building:
-            raise ValueError("Указанное здание не существует")
+        await self._check_building_exists(organization_data.building_id)
 
         # 3. Проверяем существование деятельностей
         if organization_data.activity_ids:
-            for activity_id in organization_data.activity_ids:
-                activity = await self.activity_repo.get(activity_id)
-                if not activity:
-                    raise ValueError(f"Деятельность с ID {activity_id} не существует")
+            await self._check_activities_exist(organization_data.activity_ids)
 
         # 4. Проверяем формат телефонов
         for phone in organization_data.phone_numbers:
             if not self._validate_phone_format(phone.phone_number):
                 raise ValueError(f"Неверный формат телефона: {phone.phone_number}")
 
-        organization = await self.organization_repo.create(organization_data)
+        with constraint_errors(_CONSTRAINT_ERRORS):
+            organization = await self.organization_repo.create(
+                organization_data,
+                [
+                    self._normalize_phone(phone.phone_number)
+                    for phone in organization_data.phone_numbers
+                ],
+            )
+        existence_filters.organization_names.add(organization.name)
         return Organization.model_validate(organization)
 
+    async def create_organizations(
+        self, organizations: list[OrganizationCreate]
+    ) -> list[Organization | ValueError]:
+        """Создать пакет организаций в одной транзакции (бизнес-логика)
+
+        Правила те же, что у create_organization, но каждое проверяется одним
+        запросом на весь пакет. Вместо организации, не прошедшей проверку,
+        возвращается её ValueError, остальные создаются.
+        """
+        names = existence_filters.organization_names
+        candidates = [
+            name
+            for name in dict.fromkeys(data.name for data in organizations)
+            if names.check(name)
+        ]
+        taken = set()
+        if candidates:
+            taken = set(await self.organization_repo.get_existing_names(candidates))
+        for name in candidates:
+            names.confirm(name in taken)
+
+        # ID, которых точно нет в фильтрах, проверят внешние ключи
+        building_ids = [
+            building_id
+            for building_id in dict.fromkeys(data.building_id for data in organizations)
+            if existence_filters.building_ids.check(building_id)
+        ]
+        buildings = dict(
+            zip(
+                building_ids,
+                await self.loaders.buildings.load_many(building_ids),
+                strict=True,
+            )
+        )
+        activity_ids = [
+            activity_id
+            for activity_id in dict.fromkeys(
+                activity_id
+                for data in organizations
+                for activity_id in data.activity_ids
+            )
+            if existence_filters.activity_ids.check(activity_id)
+        ]
+        activities = dict(
+            zip(
+                activity_ids,
+                await self.loaders.activities.load_many(activity_ids),
+                strict=True,
+            )
+        )
+        for building in buildings.values():
+            existence_filters.building_ids.confirm(building is not None)
+        for activity in activities.values():
+            existence_filters.activity_ids.confirm(activity is not None)
+
+        results: list[Organization | ValueError | None] = []
+        accepted = []
+        for data in organizations:
+            error = self._batch_error(data, taken, buildings, activities)
+            if error:
+                results.append(ValueError(error))
+                continue
+            # Повтор названия внутри пакета - такой же дубликат
+            taken.add(data.name)
+            accepted.append(data)
+            results.append(None)
+
+        if accepted:
+            documents = await self.organization_repo.create_many(
+                accepted,
+                [
+                    [
+                        self._normalize_phone(phone.phone_number)
+                        for phone in data.phone_numbers
+                    ]
+                    for data in accepted
+                ],
+            )
+            for data in accepted:
+                names.add(data.name)
+            # Из документов транзакции пакета: в снимке новых организаций ещё нет
+            created = iter(self._documents_to_dto_list(documents, None))
+        return [next(created) if result is None else result for result in results]
+
+    def _batch_error(
+        self,
+        data: OrganizationCreate,
+        taken: set[str],
+        buildings: dict,
+        activities: dict,
+    ) -> str | None:
+        """Ошибка проверки организации из пакета (вспомогательный метод)"""
+        if data.name in taken:
+            return "Организация с таким названием уже существует"
+        if data.building_id in buildings and buildings[data.building_id] is None:
+            return "Указанное здание не существует"
+        for activity_id in data.activity_ids:
+            if activity_id in activities and activities[activity_id] is None:
+                return f"Деятельность с ID {activity_id} не существует"
+        for phone in data.phone_numbers:
+            if not self._validate_phone_format(phone.phone_number):
+                return f"Неверный формат телефона: {phone.phone_number}"
+        return None
+
     async def update_organization(
         self, organization_id: int, update_data: OrganizationUpdate
     ) -> Organization | None:
-        """Обновить организацию (бизнес-логика)"""
-        existing_organization = await self.organization_repo.get(organization_id)
-        if not existing_organization:
-            return None
+        """Обновить организацию (бизнес-логика)
 
+        Незаданные поля не меняются. Ответ строится из пересобранного
+        документа организации, без повторного чтения связей.
+        """
         # Проверяем бизнес-правила
 
-        # 1. Проверяем уникальность имени
-        if update_data.name and update_data.name != existing_organization.name:
-            organization_with_same_name = await self.organization_repo.get_by_name(
-                update_data.name
+        # 1. Проверяем уникальность имени (своё же имя - не дубликат)
+        if update_data.name:
+            organization_with_same_name = (
+                await existence_filters.organization_names.probe(
+                    update_data.name,
+                    lambda: self.organization_repo.get_by_name(update_data.name),
+                )
             )
             if (
                 organization_with_same_name
@@ -88,16 +280,11 @@ class OrganizationService:
 
         # 2. Проверяем существование здания
         if update_data.building_id:
-            building = await self.building_repo.get(update_data.building_id)
-            if not building:
-                raise ValueError("Указанное здание не существует")
+            await self._check_building_exists(update_data.building_id)
 
         # 3. Проверяем существование деятельностей
         if update_data.activity_ids:
-            for activity_id in update_data.activity_ids:
-                activity = await self.activity_repo.get(activity_id)
-                if not activity:
-                    raise ValueError(f"Деятельность с ID {activity_id} не существует")
+            await self._check_activities_exist(update_data.activity_ids)
 
         # 4. Проверяем формат телефонов
         if update_data.phone_numbers:
@@ -105,64 +292,369 @@ class OrganizationService:
                 if not self._validate_phone_format(phone.phone_number):
                     raise ValueError(f"Неверный формат телефона: {phone.phone_number}")
 
-        updated_organization = await self.organization_repo.update(
-            organization_id, update_data
-        )
-        if updated_organization:
-            return Organization.model_validate(updated_organization)
-        return None
+        phone_digits = None
+        if update_data.phone_numbers is not None:
+            phone_digits = [
+                self._normalize_phone(phone.phone_number)
+                for phone in update_data.phone_numbers
+            ]
+        with constraint_errors(_CONSTRAINT_ERRORS):
+            document = await self.organization_repo.update(
+                organization_id, update_data, phone_digits
+            )
+        if document is None:
+            return None
+        self.loaders.clear_organization(organization_id)
+        existence_filters.organization_names.add(document["name"])
+        return Organization.model_validate(document)
 
     async def delete_organization(self, organization_id: int) -> bool:
         """Удалить организацию (бизнес-логика)"""
-        organization = await self.organization_repo.get(organization_id)
-        if not organization:
-            return False
-
         # Дополнительные бизнес-правила при удалении могут быть добавлены здесь
 
+        self.loaders.clear_organization(organization_id)
         return await self.organization_repo.delete(organization_id)
 
+    async def delete_organizations(self, criteria: OrganizationBulkDelete) -> list[int]:
+        """Удалить организации по списку ID и фильтрам (бизнес-логика)
+
+        Возвращает ID удалённых организаций.
+        """
+        organization_ids = criteria.ids
+        if criteria.building_id is not None or criteria.activity_id is not None:
+            organization_ids = await self.organization_repo.get_ids(
+                criteria.building_id, criteria.activity_id, organization_ids
+            )
+        deleted = await self.organization_repo.delete_many(organization_ids)
+        for organization_id in deleted:
+            self.loaders.clear_organization(organization_id)
+        return deleted
+
     async def get_organizations_by_building(
-        self, building_id: int
-    ) -> list[Organization]:
+        self, building_id: int, include: Collection[str] | None = None
+    ) -> list[Organization] | list[OrganizationPartial]:
         """Получить организации в здании (бизнес-логика)"""
+        snapshot = current_snapshot()
+        if snapshot is not None:
+            if snapshot.building(building_id) is None:
+                raise ValueError("Здание не существует")
+            organizations = snapshot.organizations_in_building(building_id)
+            return self._documents_to_dto_list(
+                [snapshot.document(o) for o in organizations], include
+            )
+
         # Проверяем существование здания
-        building = await self.building_repo.get(building_id)
+        building = await self.loaders.buildings.load(building_id)
         if not building:
             raise ValueError("Здание не существует")
 
-        organizations = await self.organization_repo.get_by_building(building_id)
-        return [Organization.model_validate(org) for org in organizations]
+        if settings.READ_MODEL_ENABLED:
+            documents = await self.document_repo.get_by_building(building_id)
+            return self._documents_to_dto_list(documents, include)
+
+        organizations = await self.organization_repo.get_by_building(
+            building_id, include
+        )
+        return self._to_dto_list(organizations, include)
 
     async def get_organizations_by_activity(
-        self, activity_id: int
-    ) -> list[Organization]:
+        self, activity_id: int, include: Collection[str] | None = None
+    ) -> list[Organization] | list[OrganizationPartial]:
         """Получить организации по виду деятельности (бизнес-логика)"""
+        snapshot = current_snapshot()
+        if snapshot is not None:
+            if snapshot.activity(activity_id) is None:
+                raise ValueError("Деятельность не существует")
+            organizations = snapshot.organizations_in_activity(activity_id)
+            return self._documents_to_dto_list(
+                [snapshot.document(o) for o in organizations], include
+            )
+
         # Проверяем существование деятельности
-        activity = await self.activity_repo.get(activity_id)
+        activity = await self.loaders.activities.load(activity_id)
         if not activity:
             raise ValueError("Деятельность не существует")
 
+        # Документы хранят предков деятельностей, потомков искать не нужно
+        if settings.READ_MODEL_ENABLED:
+            documents = await self.document_repo.get_by_activity(activity_id)
+            return self._documents_to_dto_list(documents, include)
+
         # Получаем всех потомков деятельности
         activity_ids = await self.activity_service.get_descendant_activity_ids(
             activity_id
         )
 
-        organizations = await self.organization_repo.get_by_activities(activity_ids)
-        return [Organization.model_validate(org) for org in organizations]
+        organizations = await self.organization_repo.get_by_activities(
+            activity_ids, include
+        )
+        return self._to_dto_list(organizations, include)
 
-    async def search_organizations_by_name(self, name: str) -> list[Organization]:
+    async def search_organizations_by_name(
+        self, name: str, include: Collection[str] | None = None
+    ) -> list[Organization] | list[OrganizationPartial]:
         """Поиск организаций по названию (бизнес-логика)"""
         if len(name) < 2:
             raise ValueError("Поисковый запрос должен содержать минимум 2 символа")
 
-        organizations = await self.organization_repo.search_by_name(name)
-        return [Organization.model_validate(org) for org in organizations]
+        snapshot = current_snapshot()
+        if snapshot is not None:
+            organizations = snapshot.organizations_by_name(name)
+            return self._documents_to_dto_list(
+                [snapshot.document(o) for o in organizations], include
+            )
+
+        if settings.READ_MODEL_ENABLED:
+            documents = await self.document_repo.search_by_name(name)
+            return self._documents_to_dto_list(documents, include)
+
+        organizations = await self.organization_repo.search_by_name(name, include)
+        return self._to_dto_list(organizations, include)
+
+    async def search_organizations_by_phone(
+        self,
+        phone: str,
+        prefix: bool = False,
+        include: Collection[str] | None = None,
+    ) -> list[Organization] | list[OrganizationPartial]:
+        """Поиск организаций по номеру телефона или его началу (бизнес-логика)"""
+        digits = self._normalize_phone(phone)
+        if len(digits) < 2:
+            raise ValueError("Номер телефона должен содержать минимум 2 цифры")
+
+        snapshot = current_snapshot()
+        if snapshot is not None:
+            organization_ids = snapshot.organization_ids_by_phone(digits, prefix)
+        else:
+            organization_ids = await self.organization_repo.get_ids_by_phone(
+                digits, prefix
+            )
+        return await self.get_organizations_by_ids(organization_ids, include)
+
+    async def search_organizations(
+        self, criteria: OrganizationSearch
+    ) -> OrganizationSearchResult:
+        """Комбинированный поиск организаций с фасетами (бизнес-логика)"""
+        snapshot = current_snapshot()
+        if snapshot is not None:
+            total, items, buildings, activities, plan = snapshot.search(criteria)
+        else:
+            page, plan = await self.search_repo.search(criteria)
+            total, items = page.total, page.items
+            buildings, activities = page.buildings, page.activities
+
+        facets = None
+        if criteria.facets:
+            facets = OrganizationSearchFacets(
+                buildings=buildings, activities=activities
+            )
+        return OrganizationSearchResult(
+            total=total,
+            items=from_orm(list[Organization], items),
+            facets=facets,
+            # План запроса показываем только в режиме отладки
+            plan=plan if settings.DEBUG else None,
+        )
+
+    async def _check_building_exists(self, building_id: int) -> None:
+        """Проверить существование здания (вспомогательный метод)
+
+        ID, которого точно нет в фильтре, проверит внешний ключ при записи.
+        """
+        building_ids = existence_filters.building_ids
+        if not building_ids.check(building_id):
+            return
+        building = await self.loaders.buildings.load(building_id)
+        building_ids.confirm(building is not None)
+        if not building:
+            raise ValueError("Указанное здание не существует")
+
+    async def _check_activities_exist(self, activity_ids: list[int]) -> None:
+        """Проверить существование деятельностей одним запросом (вспомогательный метод)
+
+        ID, которых точно нет в фильтре, проверит внешний ключ при записи.
+        """
+        activity_ids = [
+            i for i in activity_ids if existence_filters.activity_ids.check(i)
+        ]
+        if not activity_ids:
+            return
+        activities = await self.loaders.activities.load_many(activity_ids)
+        for activity_id, activity in zip(activity_ids, activities, strict=True):
+            existence_filters.activity_ids.confirm(activity is not None)
+            if not activity:
+                raise ValueError(f"Деятельность с ID {activity_id} не существует")
+
+    async def stream_organizations_by_building(
+        self, building_id: int, include: Collection[str] | None = None
+    ) -> AsyncIterator[list[Organization] | list[OrganizationPartial]]:
+        """Организации в здании частями по STREAM_CHUNK_SIZE (бизнес-логика)
+
+        Проверки выполняются сразу, чтение - по мере обхода результата.
+        """
+        snapshot = current_snapshot()
+        if snapshot is not None:
+            if snapshot.building(building_id) is None:
+                raise ValueError("Здание не существует")
+            return self._snapshot_dto_chunks(
+                snapshot, snapshot.organizations_in_building(building_id), include
+            )
+
+        building = await self.loaders.buildings.load(building_id)
+        if not building:
+            raise ValueError("Здание не существует")
+
+        chunk_size = settings.STREAM_CHUNK_SIZE
+        if settings.READ_MODEL_ENABLED:
+            return self._document_dto_chunks(
+                self.document_repo.stream_by_building(building_id, chunk_size), include
+            )
+        return self._orm_dto_chunks(
+            self.organization_repo.stream_by_building(building_id, chunk_size, include),
+            include,
+        )
+
+    async def stream_organizations_by_activity(
+        self, activity_id: int, include: Collection[str] | None = None
+    ) -> AsyncIterator[list[Organization] | list[OrganizationPartial]]:
+        """Организации по виду деятельности частями (бизнес-логика)"""
+        snapshot = current_snapshot()
+        if snapshot is not None:
+            if snapshot.activity(activity_id) is None:
+                raise ValueError("Деятельность не существует")
+            return self._snapshot_dto_chunks(
+                snapshot, snapshot.organizations_in_activity(activity_id), include
+            )
+
+        activity = await self.loaders.activities.load(activity_id)
+        if not activity:
+            raise ValueError("Деятельность не существует")
+
+        chunk_size = settings.STREAM_CHUNK_SIZE
+        if settings.READ_MODEL_ENABLED:
+            return self._document_dto_chunks(
+                self.document_repo.stream_by_activity(activity_id, chunk_size), include
+            )
+        activity_ids = await self.activity_service.get_descendant_activity_ids(
+            activity_id
+        )
+        return self._orm_dto_chunks(
+            self.organization_repo.stream_by_activities(
+                activity_ids, chunk_size, include
+            ),
+            include,
+        )
+
+    async def stream_organizations_by_name(
+        self, name: str, include: Collection[str] | None = None
+    ) -> AsyncIterator[list[Organization] | list[OrganizationPartial]]:
+        """Поиск организаций по названию частями (бизнес-логика)"""
+        if len(name) < 2:
+            raise ValueError("Поисковый запрос должен содержать минимум 2 символа")
+
+        snapshot = current_snapshot()
+        if snapshot is not None:
+            return self._snapshot_dto_chunks(
+                snapshot, snapshot.organizations_by_name(name), include
+            )
+
+        chunk_size = settings.STREAM_CHUNK_SIZE
+        if settings.READ_MODEL_ENABLED:
+            return self._document_dto_chunks(
+                self.document_repo.stream_by_name(name, chunk_size), include
+            )
+        return self._orm_dto_chunks(
+            self.organization_repo.stream_by_name(name, chunk_size, include), include
+        )
+
+    async def _snapshot_dto_chunks(
+        self, snapshot, organizations: list, include: Collection[str] | None
+    ) -> AsyncIterator[list[Organization] | list[OrganizationPartial]]:
+        """Части DTO из снимка: документы строятся по мере обхода"""
+        chunk_size = settings.STREAM_CHUNK_SIZE
+        for start in range(0, len(organizations), chunk_size):
+            yield self._documents_to_dto_list(
+                [
+                    snapshot.document(organization)
+                    for organization in organizations[start : start + chunk_size]
+                ],
+                include,
+            )
+
+    async def _document_dto_chunks(
+        self, chunks: AsyncIterator[list[dict]], include: Collection[str] | None
+    ) -> AsyncIterator[list[Organization] | list[OrganizationPartial]]:
+        async for documents in chunks:
+            yield self._documents_to_dto_list(documents, include)
+
+    async def _orm_dto_chunks(
+        self, chunks: AsyncIterator[list], include: Collection[str] | None
+    ) -> AsyncIterator[list[Organization] | list[OrganizationPartial]]:
+        async for organizations in chunks:
+            yield self._to_dto_list(organizations, include)
+
+    async def _get_organizations_from_db(
+        self, organization_ids: list[int], include: Collection[str] | None
+    ) -> list[Organization] | list[OrganizationPartial]:
+        """Организации по списку ID из БД в порядке запроса (вспомогательный метод)"""
+        if settings.READ_MODEL_ENABLED:
+            documents = await self.loaders.organization_documents.load_many(
+                organization_ids
+            )
+            return self._documents_to_dto_list(
+                [document for document in documents if document], include
+            )
+
+        organizations = await self.loaders.organizations(include).load_many(
+            organization_ids
+        )
+        return self._to_dto_list(
+            [organization for organization in organizations if organization], include
+        )
+
+    def _to_dto_list(
+        self, organizations: list, include: Collection[str] | None
+    ) -> list[Organization] | list[OrganizationPartial]:
+        """Преобразовать организации в DTO с учётом запрошенных связей (вспомогательный метод)"""
+        if include is None:
+            return from_orm(list[Organization], organizations)
+
+        # Незагруженные связи нельзя трогать: обращение к ним вызовет ленивую загрузку
+        return from_orm(
+            list[OrganizationPartial],
+            [
+                {
+                    "id": organization.id,
+                    "name": organization.name,
+                    "building_id": organization.building_id,
+                    **{
+                        relation: getattr(organization, relation)
+                        for relation in include
+                    },
+                }
+                for organization in organizations
+            ],
+        )
+
+    def _documents_to_dto_list(
+        self, documents: list[dict], include: Collection[str] | None
+    ) -> list[Organization] | list[OrganizationPartial]:
+        """Преобразовать документы организаций в DTO (вспомогательный метод)"""
+        if include is None:
+            return from_orm(list[Organization], documents)
+
+        fields = ("id", "name", "building_id", *include)
+        return from_orm(
+            list[OrganizationPartial],
+            [{field: document[field] for field in fields} for document in documents],
+        )
+
+    def _normalize_phone(self, phone: str) -> str:
+        """Оставить в номере только цифры (вспомогательный метод)"""
+        return re.sub(r"\D", "", phone)
 
     def _validate_phone_format(self, phone: str) -> bool:
         """Валидация формата телефона (вспомогательный метод)"""
         # Простая валидация - можно заменить на более сложную логику
-        import re
-
         phone_pattern = re.compile(r"^[\d\s\-\+\(\)]+$")
         return bool(phone_pattern.match(phone)) and len(phone) >= 5
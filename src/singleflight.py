@@ -0,0 +1,66 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+from .config import settings
+
+
+class SingleFlight:
+    """Объединение одинаковых одновременных вычислений
+
+    Пока вычисление с ключом выполняется, остальные вызовы с тем же ключом
+    ждут его результата, а не запускают своё. Вычисление идёт в отдельной
+    задаче: отмена одного из ожидающих не отменяет его для остальных.
+    Поэтому вычисление не должно использовать ресурсы конкретного запроса
+    (например, его сессию БД) и должно открывать свои.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self._flights: dict[Hashable, asyncio.Task] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Выполнить fn или дождаться уже идущего вычисления с тем же ключом"""
+        self.calls += 1
+        if not settings.SINGLE_FLIGHT_ENABLED:
+            self.executions += 1
+            return await fn()
+
+        task = self._flights.get(key)
+        if task is None:
+            self.executions += 1
+            task = self._flights[key] = asyncio.create_task(fn())
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        if not task.cancelled():
+            # Помечаем исключение полученным, даже если все ожидающие отменены
+            task.exception()
+
+
+_single_flights: dict[str, SingleFlight] = {}
+
+
+def single_flight(name: str) -> SingleFlight:
+    """Именованная группа объединяемых вычислений"""
+    flight = _single_flights.get(name)
+    if flight is None:
+        flight = _single_flights[name] = SingleFlight(name)
+    return flight
+
+
+def single_flight_stats() -> list[SingleFlight]:
+    """Все группы объединяемых вычислений для метрик"""
+    return list(_single_flights.values())
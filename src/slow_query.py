@@ -0,0 +1,244 @@
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from logging.handlers import RotatingFileHandler
+
+import greenlet
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger("slow_query")
+
+_REPOSITORY_DIR = os.path.join(os.path.dirname(__file__), "repository")
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+_EXPANDED_PARAMS = re.compile(r"\$\d+(?:\s*,\s*\$\d+)+")
+_MAX_PARAMETERS_LENGTH = 1000
+
+# ASGI scope текущего запроса. Маршрут проставляется роутером уже после
+# middleware, поэтому храним сам scope и читаем из него маршрут лениво.
+request_scope: ContextVar[dict | None] = ContextVar("request_scope", default=None)
+
+
+@dataclass
+class SlowQueryStats:
+    statement: str
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    origin: str | None = None
+    route: str | None = None
+    last_parameters: str | None = None
+    last_plan: str | None = None
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+
+class SlowQueryRegistry:
+    """Агрегированная статистика медленных запросов"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._stats: dict[str, SlowQueryStats] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        statement: str,
+        elapsed_ms: float,
+        origin: str | None = None,
+        route: str | None = None,
+        parameters: str | None = None,
+        plan: str | None = None,
+    ) -> SlowQueryStats:
+        """Учесть выполнение медленного запроса"""
+        key = normalize_statement(statement)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                if len(self._stats) >= self.max_size:
+                    # Вытесняем запрос с наименьшим суммарным временем
+                    cheapest = min(self._stats.values(), key=lambda s: s.total_ms)
+                    del self._stats[cheapest.statement]
+                stats = self._stats[key] = SlowQueryStats(statement=key)
+
+            stats.count += 1
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+            stats.origin = origin or stats.origin
+            stats.route = route or stats.route
+            stats.last_parameters = parameters
+            if plan is not None:
+                stats.last_plan = plan
+            return stats
+
+    def top(self, limit: int = 20) -> list[SlowQueryStats]:
+        """Запросы, упорядоченные по суммарному времени выполнения"""
+        with self._lock:
+            ranked = sorted(
+                self._stats.values(), key=lambda s: s.total_ms, reverse=True
+            )
+        return ranked[:limit]
+
+    def reset(self) -> None:
+        """Сбросить накопленную статистику"""
+        with self._lock:
+            self._stats.clear()
+
+
+slow_query_registry = SlowQueryRegistry(settings.SLOW_QUERY_STATS_SIZE)
+
+
+def normalize_statement(statement: str) -> str:
+    """Привести запрос к виду, по которому агрегируется статистика"""
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    # IN-списки разной длины считаем одним и тем же запросом
+    return _EXPANDED_PARAMS.sub("...", statement)
+
+
+def current_route() -> str | None:
+    """Маршрут, в рамках которого выполняется запрос"""
+    scope = request_scope.get()
+    if scope is None:
+        return None
+    path = getattr(scope.get("route"), "path", scope.get("path"))
+    return f"{scope.get('method')} {path}"
+
+
+def _find_origin() -> str | None:
+    """Найти метод репозитория, из которого выполняется запрос"""
+    # AsyncSession выполняет запрос в дочернем greenlet, поэтому стек
+    # вызывающей корутины ищем во фрейме родительского greenlet
+    current = greenlet.getcurrent()
+    frame = current.parent.gr_frame if current.parent else sys._getframe()
+    while frame is not None:
+        if frame.f_code.co_filename.startswith(_REPOSITORY_DIR):
+            owner = frame.f_locals.get("self")
+            owner_name = (
+                type(owner).__name__
+                if owner is not None
+                else frame.f_globals["__name__"]
+            )
+            return f"{owner_name}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+def _format_parameters(parameters) -> str | None:
+    if not parameters:
+        return None
+    return repr(parameters)[:_MAX_PARAMETERS_LENGTH]
+
+
+def _explain(conn, statement: str, parameters) -> str | None:
+    """Получить EXPLAIN (ANALYZE, BUFFERS) для запроса
+
+    Выполняется отдельным курсором DBAPI, чтобы не затронуть результат
+    исходного запроса, и внутри точки сохранения. ANALYZE выполняет запрос
+    ещё раз, поэтому точка сохранения всегда откатывается: изменения
+    данных из WITH ... INSERT/UPDATE/DELETE не применяются повторно, а
+    ошибка EXPLAIN не переводит транзакцию в аварийное состояние.
+    """
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+            return "\n".join(row[0] for row in cursor.fetchall())
+        except Exception as e:
+            logger.warning(f"Failed to explain slow query: {str(e)}")
+            return None
+        finally:
+            cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+    finally:
+        cursor.close()
+
+
+def _before_cursor_execute(conn, **_kw):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, statement, parameters, executemany, **_kw):
+    started = conn.info["query_start_time"].pop()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if elapsed_ms < settings.SLOW_QUERY_THRESHOLD_MS:
+        return
+
+    plan = None
+    # ANALYZE повторно выполняет запрос; его изменения откатываются в _explain
+    if (
+        settings.SLOW_QUERY_EXPLAIN
+        and not executemany
+        and _EXPLAINABLE.match(statement)
+    ):
+        plan = _explain(conn, statement, parameters)
+
+    origin = _find_origin()
+    route = current_route()
+    formatted_parameters = _format_parameters(parameters)
+    slow_query_registry.record(
+        statement,
+        elapsed_ms,
+        origin=origin,
+        route=route,
+        parameters=formatted_parameters,
+        plan=plan,
+    )
+    slow_query_logger.warning(
+        json.dumps(
+            {
+                "duration_ms": round(elapsed_ms, 2),
+                "statement": normalize_statement(statement),
+                "parameters": formatted_parameters,
+                "origin": origin,
+                "route": route,
+                "plan": plan,
+            },
+            ensure_ascii=False,
+        )
+    )
+
+
+def _handle_error(exception_context):
+    # Запрос завершился ошибкой: after_cursor_execute не будет вызван
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        conn.info["query_start_time"].pop()
+
+
+def _configure_file_logger() -> None:
+    if slow_query_logger.handlers:
+        return
+    directory = os.path.dirname(settings.SLOW_QUERY_LOG_FILE)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    handler = RotatingFileHandler(
+        settings.SLOW_QUERY_LOG_FILE,
+        maxBytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+        backupCount=settings.SLOW_QUERY_LOG_BACKUP_COUNT,
+        encoding="utf-8",
+    )
+    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    slow_query_logger.addHandler(handler)
+    slow_query_logger.setLevel(logging.WARNING)
+    slow_query_logger.propagate = False
+
+
+def install_slow_query_log(engine: Engine) -> None:
+    """Подключить журнал медленных запросов к движку БД"""
+    _configure_file_logger()
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute, named=True)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute, named=True)
+    event.listen(engine, "handle_error", _handle_error)
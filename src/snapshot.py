@@ -0,0 +1,679 @@
+import asyncio
+import bisect
+import logging
+import time
+from array import array
+from collections import Counter, defaultdict
+from collections.abc import Awaitable, Callable, Sequence
+
+from geopy.distance import geodesic
+
+from .change_feed import broadcaster
+from .config import settings
+from .database import transaction
+from .dto.change import ChangeFeedFilter
+from .dto.organization import OrganizationSearch, OrganizationSearchPlan
+from .repository.snapshot_repository import SnapshotRepository
+from .snapshot_file import SECTIONS, SnapshotFile, StringTableBuilder, file_identity
+
+logger = logging.getLogger(__name__)
+
+
+class BuildingRecord:
+    __slots__ = ("id", "address", "latitude", "longitude")
+
+    def __init__(self, id: int, address: str, latitude: float, longitude: float):
+        self.id = id
+        self.address = address
+        self.latitude = latitude
+        self.longitude = longitude
+
+
+class ActivityRecord:
+    __slots__ = ("id", "name", "parent_id")
+
+    def __init__(self, id: int, name: str, parent_id: int | None):
+        self.id = id
+        self.name = name
+        self.parent_id = parent_id
+
+
+class PhoneRecord:
+    __slots__ = ("id", "phone_number", "phone_digits")
+
+    def __init__(self, id: int, phone_number: str, phone_digits: str):
+        self.id = id
+        self.phone_number = phone_number
+        self.phone_digits = phone_digits
+
+
+class OrganizationRecord:
+    __slots__ = ("id", "name", "folded_name", "building_id", "phones", "activity_ids")
+
+    def __init__(self, id: int, name: str, building_id: int):
+        self.id = id
+        self.name = name
+        # Для поиска без учёта регистра, как ILIKE
+        self.folded_name = name.lower()
+        self.building_id = building_id
+        self.phones: tuple[PhoneRecord, ...] = ()
+        self.activity_ids: tuple[int, ...] = ()
+
+
+class DirectorySnapshot:
+    """Неизменяемый снимок справочника в памяти
+
+    Записи лежат в списках по возрастанию ID, словари ID -> позиция дают
+    доступ по ключу, производные индексы хранят позиции организаций. Снимок
+    после построения не меняется: обновление - это сборка нового снимка и
+    замена ссылки на него.
+    """
+
+    __slots__ = (
+        "buildings",
+        "building_offsets",
+        "activities",
+        "activity_offsets",
+        "activity_children",
+        "organizations",
+        "organization_offsets",
+        "organizations_by_building",
+        "organizations_by_activity",
+        "phone_index",
+        "built_at",
+        "build_ms",
+    )
+
+    def __init__(
+        self,
+        buildings: list[tuple],
+        activities: list[tuple],
+        organizations: list[tuple],
+        phones: list[tuple],
+        organization_activities: list[tuple],
+    ):
+        started = time.perf_counter()
+        self.buildings = [BuildingRecord(*row) for row in buildings]
+        self.building_offsets = {b.id: i for i, b in enumerate(self.buildings)}
+
+        self.activities = [ActivityRecord(*row) for row in activities]
+        self.activity_offsets = {a.id: i for i, a in enumerate(self.activities)}
+        children = defaultdict(list)
+        for offset, activity in enumerate(self.activities):
+            children[activity.parent_id].append(offset)
+        self.activity_children = {key: tuple(value) for key, value in children.items()}
+        # Деятельность вместе со всеми предками, как activity_path_ids документов
+        activity_paths: dict[int, tuple[int, ...]] = {}
+        for activity in self.activities:
+            path, current = [], activity
+            while current is not None and current.id not in path:
+                path.append(current.id)
+                parent = self.activity_offsets.get(current.parent_id)
+                current = self.activities[parent] if parent is not None else None
+            activity_paths[activity.id] = tuple(path)
+
+        self.organizations = [OrganizationRecord(*row) for row in organizations]
+        self.organization_offsets = {o.id: i for i, o in enumerate(self.organizations)}
+
+        phones_by_organization = defaultdict(list)
+        phone_index = []
+        for phone_id, organization_id, phone_number, phone_digits in phones:
+            if organization_id in self.organization_offsets:
+                phones_by_organization[organization_id].append(
+                    PhoneRecord(phone_id, phone_number, phone_digits)
+                )
+                phone_index.append((phone_digits, organization_id))
+        phone_index.sort()
+        self.phone_index = phone_index
+
+        activities_by_organization = defaultdict(list)
+        for organization_id, activity_id in organization_activities:
+            activities_by_organization[organization_id].append(activity_id)
+
+        by_building = defaultdict(list)
+        by_activity = defaultdict(list)
+        for offset, organization in enumerate(self.organizations):
+            organization.phones = tuple(phones_by_organization[organization.id])
+            organization.activity_ids = tuple(
+                activities_by_organization[organization.id]
+            )
+            by_building[organization.building_id].append(offset)
+            path_ids = {
+                path_id
+                for activity_id in organization.activity_ids
+                for path_id in activity_paths.get(activity_id, ())
+            }
+            for path_id in path_ids:
+                by_activity[path_id].append(offset)
+        self.organizations_by_building = {
+            key: tuple(value) for key, value in by_building.items()
+        }
+        self.organizations_by_activity = {
+            key: tuple(value) for key, value in by_activity.items()
+        }
+
+        self.built_at = time.time()
+        self.build_ms = (time.perf_counter() - started) * 1000
+
+    # Здания
+
+    def building(self, building_id: int) -> BuildingRecord | None:
+        offset = self.building_offsets.get(building_id)
+        return self.buildings[offset] if offset is not None else None
+
+    def buildings_in_range(
+        self, min_lat: float, max_lat: float, min_lng: float, max_lng: float
+    ) -> list[BuildingRecord]:
+        return [
+            b
+            for b in self.buildings
+            if min_lat <= b.latitude <= max_lat and min_lng <= b.longitude <= max_lng
+        ]
+
+    def buildings_in_radius(
+        self, latitude: float, longitude: float, radius_km: float
+    ) -> list[BuildingRecord]:
+        center = (latitude, longitude)
+        return [
+            b
+            for b in self.buildings
+            if geodesic(center, (b.latitude, b.longitude)).kilometers <= radius_km
+        ]
+
+    def building_counts(self, skip: int = 0, limit: int = 100) -> list[tuple[int, int]]:
+        return [
+            (b.id, len(self.organizations_by_building.get(b.id, ())))
+            for b in self.buildings[skip : skip + limit]
+        ]
+
+    # Деятельности
+
+    def activity(self, activity_id: int) -> ActivityRecord | None:
+        offset = self.activity_offsets.get(activity_id)
+        return self.activities[offset] if offset is not None else None
+
+    def children(self, parent_id: int | None) -> list[ActivityRecord]:
+        return [self.activities[i] for i in self.activity_children.get(parent_id, ())]
+
+    def activity_counts(self) -> list[tuple[int, int]]:
+        return [
+            (a.id, len(self.organizations_by_activity.get(a.id, ())))
+            for a in self.activities
+        ]
+
+    # Организации
+
+    def document(self, organization: OrganizationRecord) -> dict:
+        """Организация в форме документа модели чтения"""
+        return {
+            "id": organization.id,
+            "name": organization.name,
+            "building_id": organization.building_id,
+            "building": self.building(organization.building_id),
+            "phone_numbers": organization.phones,
+            "activities": [
+                self.activities[self.activity_offsets[activity_id]]
+                for activity_id in organization.activity_ids
+            ],
+        }
+
+    def organization(self, organization_id: int) -> OrganizationRecord | None:
+        offset = self.organization_offsets.get(organization_id)
+        return self.organizations[offset] if offset is not None else None
+
+    def organizations_page(
+        self, skip: int = 0, limit: int = 100
+    ) -> list[OrganizationRecord]:
+        return self.organizations[skip : skip + limit]
+
+    def organizations_in_building(self, building_id: int) -> list[OrganizationRecord]:
+        return [
+            self.organizations[i]
+            for i in self.organizations_by_building.get(building_id, ())
+        ]
+
+    def organizations_in_activity(self, activity_id: int) -> list[OrganizationRecord]:
+        """Организации с деятельностью или любой из её потомков"""
+        return [
+            self.organizations[i]
+            for i in self.organizations_by_activity.get(activity_id, ())
+        ]
+
+    def organizations_by_name(self, name: str) -> list[OrganizationRecord]:
+        folded = name.lower()
+        return [o for o in self.organizations if folded in o.folded_name]
+
+    def organization_ids_by_phone(self, digits: str, prefix: bool = False) -> list[int]:
+        """ID организаций по цифрам телефона, бинарным поиском по индексу"""
+        start = bisect.bisect_left(self.phone_index, (digits,))
+        organization_ids = set()
+        for position in range(start, len(self.phone_index)):
+            phone_digits, organization_id = self.phone_index[position]
+            matched = (
+                phone_digits.startswith(digits) if prefix else phone_digits == digits
+            )
+            if not matched:
+                break
+            organization_ids.add(organization_id)
+        return sorted(organization_ids)
+
+    def search(
+        self, criteria: OrganizationSearch
+    ) -> tuple[int, list[dict], Counter | None, Counter | None, OrganizationSearchPlan]:
+        """Комбинированный поиск: ведущий индекс и проверка остальных условий"""
+        candidates = None
+        driver = None
+        if criteria.building_id is not None:
+            driver = "building"
+            candidates = set(
+                self.organizations_by_building.get(criteria.building_id, ())
+            )
+        if criteria.activity_ids:
+            offsets = {
+                offset
+                for activity_id in criteria.activity_ids
+                for offset in self.organizations_by_activity.get(activity_id, ())
+            }
+            if candidates is None or len(offsets) < len(candidates):
+                driver = "activity"
+            candidates = offsets if candidates is None else candidates & offsets
+
+        checks = []
+        if criteria.name is not None:
+            folded = criteria.name.lower()
+            checks.append(("name", lambda o: folded in o.folded_name))
+        if criteria.bbox is not None:
+            min_lat, max_lat, min_lng, max_lng = criteria.bbox
+
+            def in_bbox(o: OrganizationRecord) -> bool:
+                b = self.building(o.building_id)
+                return (
+                    min_lat <= b.latitude <= max_lat
+                    and min_lng <= b.longitude <= max_lng
+                )
+
+            checks.append(("geo", in_bbox))
+        if criteria.radius_km is not None:
+            radius_buildings = {
+                b.id
+                for b in self.buildings_in_radius(
+                    criteria.latitude, criteria.longitude, criteria.radius_km
+                )
+            }
+            checks.append(("geo", lambda o: o.building_id in radius_buildings))
+        if criteria.phone is not None:
+            digits = "".join(filter(str.isdigit, criteria.phone))
+            phone_ids = set(self.organization_ids_by_phone(digits, prefix=True))
+            checks.append(("phone", lambda o: o.id in phone_ids))
+
+        offsets = (
+            sorted(candidates)
+            if candidates is not None
+            else range(len(self.organizations))
+        )
+        matched = [
+            self.organizations[offset]
+            for offset in offsets
+            if all(check(self.organizations[offset]) for _, check in checks)
+        ]
+
+        buildings = activities = None
+        if criteria.facets:
+            buildings = Counter(o.building_id for o in matched)
+            activities = Counter(a for o in matched for a in o.activity_ids)
+        page = matched[criteria.skip : criteria.skip + criteria.limit]
+        plan = OrganizationSearchPlan(
+            driver=driver,
+            filters=[name for name, _ in checks],
+            estimates={"total": len(self.organizations)},
+        )
+        return (
+            len(matched),
+            [self.document(o) for o in page],
+            buildings,
+            activities,
+            plan,
+        )
+
+    # Файл снимка
+
+    def sections(self) -> dict[str, array]:
+        """Секции файла снимка: колонки записей и индексы в виде позиций"""
+        strings = StringTableBuilder()
+        sections = {name: array(typecode) for name, typecode in SECTIONS}
+
+        for building in self.buildings:
+            sections["building_ids"].append(building.id)
+            sections["building_latitudes"].append(building.latitude)
+            sections["building_longitudes"].append(building.longitude)
+            sections["building_addresses"].append(strings.add(building.address))
+
+        for activity in self.activities:
+            sections["activity_ids"].append(activity.id)
+            sections["activity_parents"].append(
+                -1 if activity.parent_id is None else activity.parent_id
+            )
+            sections["activity_names"].append(strings.add(activity.name))
+        # Группа 0 - корневые деятельности, далее группа на каждую деятельность
+        sections["activity_children_starts"], sections["activity_children"] = (
+            _pack_groups(
+                self.activity_children.get(parent_id, ())
+                for parent_id in (None, *(a.id for a in self.activities))
+            )
+        )
+
+        phone_keys = []
+        sections["organization_activity_starts"].append(0)
+        sections["organization_phone_starts"].append(0)
+        for organization in self.organizations:
+            sections["organization_ids"].append(organization.id)
+            sections["organization_buildings"].append(organization.building_id)
+            sections["organization_names"].append(strings.add(organization.name))
+            sections["organization_activities"].extend(organization.activity_ids)
+            sections["organization_activity_starts"].append(
+                len(sections["organization_activities"])
+            )
+            for phone in organization.phones:
+                position = len(sections["phone_ids"])
+                phone_keys.append((phone.phone_digits, organization.id, position))
+                sections["phone_ids"].append(phone.id)
+                sections["phone_organizations"].append(organization.id)
+                sections["phone_numbers"].append(strings.add(phone.phone_number))
+                sections["phone_digits"].append(strings.add(phone.phone_digits))
+            sections["organization_phone_starts"].append(len(sections["phone_ids"]))
+        sections["phone_index"].extend(position for *_, position in sorted(phone_keys))
+
+        sections["building_organization_starts"], sections["building_organizations"] = (
+            _pack_groups(
+                self.organizations_by_building.get(b.id, ()) for b in self.buildings
+            )
+        )
+        sections["activity_organization_starts"], sections["activity_organizations"] = (
+            _pack_groups(
+                self.organizations_by_activity.get(a.id, ()) for a in self.activities
+            )
+        )
+
+        sections["string_starts"] = strings.starts
+        sections["string_data"] = array("B", strings.data)
+        return sections
+
+
+def _pack_groups(groups) -> tuple[array, array]:
+    """Группы позиций подряд в одном массиве и массив начал групп"""
+    starts, values = array("I", [0]), array("I")
+    for group in groups:
+        values.extend(group)
+        starts.append(len(values))
+    return starts, values
+
+
+class _Records(Sequence):
+    """Последовательность записей, собираемых из колонок файла при обращении"""
+
+    __slots__ = ("_length", "_make")
+
+    def __init__(self, length: int, make: Callable[[int], object]):
+        self._length = length
+        self._make = make
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._make(i) for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(index)
+        return self._make(index)
+
+
+class _OffsetIndex:
+    """ID -> позиция бинарным поиском по упорядоченной колонке ID"""
+
+    __slots__ = ("_ids",)
+
+    def __init__(self, ids: memoryview):
+        self._ids = ids
+
+    def get(self, key: int | None, default: int | None = None) -> int | None:
+        if key is None:
+            return default
+        offset = bisect.bisect_left(self._ids, key)
+        if offset < len(self._ids) and self._ids[offset] == key:
+            return offset
+        return default
+
+    def __getitem__(self, key: int) -> int:
+        offset = self.get(key)
+        if offset is None:
+            raise KeyError(key)
+        return offset
+
+    def __contains__(self, key: int) -> bool:
+        return self.get(key) is not None
+
+
+class _Groups:
+    """Группы позиций по ключу поверх массивов начал и значений"""
+
+    __slots__ = ("_group", "_starts", "_values")
+
+    def __init__(
+        self,
+        group: Callable[[int | None], int | None],
+        starts: memoryview,
+        values: memoryview,
+    ):
+        self._group = group
+        self._starts = starts
+        self._values = values
+
+    def get(self, key: int | None, default=()):
+        group = self._group(key)
+        if group is None:
+            return default
+        return self._values[self._starts[group] : self._starts[group + 1]]
+
+
+class MappedSnapshot(DirectorySnapshot):
+    """Снимок поверх файла, отображённого в память
+
+    Запросы те же, что у DirectorySnapshot, но вместо списков и словарей -
+    представления колонок файла. Записи создаются при обращении и не
+    кэшируются: процесс не держит своей копии справочника, а страницы файла
+    общие для всех воркеров.
+    """
+
+    __slots__ = ("file",)
+
+    def __init__(self, snapshot_file: SnapshotFile):
+        started = time.perf_counter()
+        self.file = snapshot_file
+        f = snapshot_file
+
+        self.building_offsets = _OffsetIndex(f["building_ids"])
+        self.buildings = _Records(len(f["building_ids"]), self._building)
+
+        self.activity_offsets = _OffsetIndex(f["activity_ids"])
+        self.activities = _Records(len(f["activity_ids"]), self._activity)
+        self.activity_children = _Groups(
+            self._activity_group, f["activity_children_starts"], f["activity_children"]
+        )
+
+        self.organization_offsets = _OffsetIndex(f["organization_ids"])
+        self.organizations = _Records(len(f["organization_ids"]), self._organization)
+        self.organizations_by_building = _Groups(
+            self.building_offsets.get,
+            f["building_organization_starts"],
+            f["building_organizations"],
+        )
+        self.organizations_by_activity = _Groups(
+            self.activity_offsets.get,
+            f["activity_organization_starts"],
+            f["activity_organizations"],
+        )
+        self.phone_index = _Records(len(f["phone_index"]), self._phone_key)
+
+        self.built_at = f.built_at
+        self.build_ms = (time.perf_counter() - started) * 1000
+
+    def _building(self, offset: int) -> BuildingRecord:
+        f = self.file
+        return BuildingRecord(
+            f["building_ids"][offset],
+            f.strings[f["building_addresses"][offset]],
+            f["building_latitudes"][offset],
+            f["building_longitudes"][offset],
+        )
+
+    def _activity(self, offset: int) -> ActivityRecord:
+        f = self.file
+        parent_id = f["activity_parents"][offset]
+        return ActivityRecord(
+            f["activity_ids"][offset],
+            f.strings[f["activity_names"][offset]],
+            None if parent_id < 0 else parent_id,
+        )
+
+    def _activity_group(self, parent_id: int | None) -> int | None:
+        if parent_id is None:
+            return 0
+        offset = self.activity_offsets.get(parent_id)
+        return None if offset is None else offset + 1
+
+    def _organization(self, offset: int) -> OrganizationRecord:
+        f = self.file
+        organization = OrganizationRecord(
+            f["organization_ids"][offset],
+            f.strings[f["organization_names"][offset]],
+            f["organization_buildings"][offset],
+        )
+        starts = f["organization_phone_starts"]
+        organization.phones = tuple(
+            PhoneRecord(
+                f["phone_ids"][position],
+                f.strings[f["phone_numbers"][position]],
+                f.strings[f["phone_digits"][position]],
+            )
+            for position in range(starts[offset], starts[offset + 1])
+        )
+        starts = f["organization_activity_starts"]
+        organization.activity_ids = tuple(
+            f["organization_activities"][starts[offset] : starts[offset + 1]]
+        )
+        return organization
+
+    def _phone_key(self, position: int) -> tuple[str, int]:
+        f = self.file
+        phone = f["phone_index"][position]
+        return f.strings[f["phone_digits"][phone]], f["phone_organizations"][phone]
+
+
+async def load_directory() -> DirectorySnapshot:
+    """Собрать снимок из БД
+
+    Выгрузка идёт в одной транзакции REPEATABLE READ: все таблицы читаются
+    на один момент времени.
+    """
+    async with transaction() as db:
+        await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        repository = SnapshotRepository(db)
+        rows = (
+            await repository.get_buildings(),
+            await repository.get_activities(),
+            await repository.get_organizations(),
+            await repository.get_phones(),
+            await repository.get_organization_activities(),
+        )
+    return DirectorySnapshot(*rows)
+
+
+async def follow_changes(refresh: Callable[[], Awaitable[None]]) -> None:
+    """Вызывать refresh после изменений и не реже SNAPSHOT_MAX_AGE_S
+
+    Изменения за SNAPSHOT_REFRESH_DELAY_S собираются в один вызов.
+    """
+    resubscribed = False
+    while True:
+        with broadcaster.subscribe(ChangeFeedFilter()) as subscriber:
+            # После переполнения очереди события потеряны: пересобираем
+            # уже после новой подписки, чтобы не пропустить изменения
+            if resubscribed:
+                await refresh()
+            while not subscriber.overflowed:
+                try:
+                    async with asyncio.timeout(settings.SNAPSHOT_MAX_AGE_S):
+                        await subscriber.queue.get()
+                except TimeoutError:
+                    pass
+                await asyncio.sleep(settings.SNAPSHOT_REFRESH_DELAY_S)
+                while not subscriber.queue.empty():
+                    subscriber.queue.get_nowait()
+                if not subscriber.overflowed:
+                    await refresh()
+        resubscribed = True
+
+
+class SnapshotStore:
+    """Текущий снимок и его обновление атомарной заменой ссылки"""
+
+    def __init__(self):
+        self.current: DirectorySnapshot | None = None
+        self.refreshes = 0
+        self._lock = asyncio.Lock()
+
+    async def refresh(self) -> DirectorySnapshot:
+        """Подменить текущий снимок новым: из файла SNAPSHOT_FILE или из БД"""
+        async with self._lock:
+            if settings.SNAPSHOT_FILE:
+                snapshot = MappedSnapshot(SnapshotFile(settings.SNAPSHOT_FILE))
+            else:
+                snapshot = await load_directory()
+            # Читатели видят либо старый снимок целиком, либо новый
+            self.current = snapshot
+            self.refreshes += 1
+            logger.info(
+                "Directory snapshot loaded: %d organizations in %.1f ms",
+                len(snapshot.organizations),
+                snapshot.build_ms,
+            )
+            return snapshot
+
+    async def run_refresher(self) -> None:
+        """Обновлять снимок: после изменений в БД или после подмены файла"""
+        if settings.SNAPSHOT_FILE:
+            await self._watch_file(settings.SNAPSHOT_FILE)
+        else:
+            await follow_changes(self._try_refresh)
+
+    async def _watch_file(self, path: str) -> None:
+        """Переоткрывать файл снимка, когда сборщик подменил его"""
+        while True:
+            await asyncio.sleep(settings.SNAPSHOT_REFRESH_DELAY_S)
+            identity = file_identity(path)
+            current = self.current
+            if identity is not None and (
+                not isinstance(current, MappedSnapshot)
+                or current.file.identity != identity
+            ):
+                await self._try_refresh()
+
+    async def _try_refresh(self) -> None:
+        try:
+            await self.refresh()
+        except Exception:
+            # Остаётся прежний снимок, следующая попытка - при новом изменении
+            logger.exception("Directory snapshot refresh failed")
+
+
+snapshot_store = SnapshotStore()
+
+
+def current_snapshot() -> DirectorySnapshot | None:
+    """Снимок для обслуживания чтений, None - читать из БД"""
+    if not settings.SNAPSHOT_ENABLED:
+        return None
+    return snapshot_store.current
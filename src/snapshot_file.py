@@ -0,0 +1,173 @@
+"""Файл снимка справочника, открываемый через mmap
+
+Файл состоит из заголовка, таблицы секций и самих секций. Каждая секция -
+массив значений фиксированной ширины (код типа модуля array), выровненный
+по 8 байт. Строки хранятся один раз в общей таблице: массив смещений и
+блок UTF-8, остальные секции ссылаются на строки по номеру.
+
+Файл записывается во временный и подменяется через os.replace, поэтому
+читатели видят либо старый файл целиком, либо новый. Все воркеры
+отображают один и тот же файл только на чтение и делят его страницы в
+кэше ОС. Порядок байт - родной для машины, файл не переносится между
+архитектурами.
+"""
+
+import mmap
+import os
+import struct
+from array import array
+
+MAGIC = b"ORGSNAP\x00"
+VERSION = 1
+
+# Записывается в родном порядке байт: на другой архитектуре не совпадёт
+BYTE_ORDER_MARK = 0x01020304
+
+# Секции в порядке таблицы: имя и код типа array
+SECTIONS: tuple[tuple[str, str], ...] = (
+    ("string_starts", "I"),
+    ("string_data", "B"),
+    ("building_ids", "q"),
+    ("building_latitudes", "d"),
+    ("building_longitudes", "d"),
+    ("building_addresses", "I"),
+    ("activity_ids", "q"),
+    ("activity_parents", "q"),
+    ("activity_names", "I"),
+    ("activity_children_starts", "I"),
+    ("activity_children", "I"),
+    ("organization_ids", "q"),
+    ("organization_buildings", "q"),
+    ("organization_names", "I"),
+    ("organization_activity_starts", "I"),
+    ("organization_activities", "q"),
+    ("organization_phone_starts", "I"),
+    ("phone_ids", "q"),
+    ("phone_organizations", "q"),
+    ("phone_numbers", "I"),
+    ("phone_digits", "I"),
+    ("phone_index", "I"),
+    ("building_organization_starts", "I"),
+    ("building_organizations", "I"),
+    ("activity_organization_starts", "I"),
+    ("activity_organizations", "I"),
+)
+
+_HEADER = struct.Struct("=8sIId")
+_SECTION = struct.Struct("=QQ")
+_ALIGNMENT = 8
+
+
+def _aligned(position: int) -> int:
+    return -(-position // _ALIGNMENT) * _ALIGNMENT
+
+
+class StringTableBuilder:
+    """Таблица строк для записи: одинаковые строки хранятся один раз"""
+
+    def __init__(self):
+        self.indexes: dict[str, int] = {}
+        self.starts = array("I", [0])
+        self.data = bytearray()
+
+    def add(self, value: str) -> int:
+        index = self.indexes.get(value)
+        if index is None:
+            index = self.indexes[value] = len(self.starts) - 1
+            self.data += value.encode()
+            self.starts.append(len(self.data))
+        return index
+
+
+class StringTable:
+    """Таблица строк поверх отображённых секций"""
+
+    __slots__ = ("starts", "data")
+
+    def __init__(self, starts: memoryview, data: memoryview):
+        self.starts = starts
+        self.data = data
+
+    def __len__(self) -> int:
+        return len(self.starts) - 1
+
+    def __getitem__(self, index: int) -> str:
+        return str(self.data[self.starts[index] : self.starts[index + 1]], "utf-8")
+
+
+def write_snapshot_file(path: str, sections: dict[str, array], built_at: float) -> int:
+    """Записать секции в файл атомарной заменой, вернуть размер файла"""
+    header_size = _HEADER.size + _SECTION.size * len(SECTIONS)
+    table = []
+    position = _aligned(header_size)
+    for name, typecode in SECTIONS:
+        values = sections[name]
+        if values.typecode != typecode:
+            raise ValueError(f"Секция {name} должна иметь тип {typecode}")
+        length = len(values) * values.itemsize
+        table.append((position, length))
+        position = _aligned(position + length)
+
+    temporary = f"{path}.tmp-{os.getpid()}"
+    try:
+        with open(temporary, "wb") as file:
+            file.write(_HEADER.pack(MAGIC, VERSION, BYTE_ORDER_MARK, built_at))
+            for offset, length in table:
+                file.write(_SECTION.pack(offset, length))
+            for (name, _), (offset, _) in zip(SECTIONS, table, strict=True):
+                file.write(b"\0" * (offset - file.tell()))
+                sections[name].tofile(file)
+            size = file.tell()
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.unlink(temporary)
+        raise
+    return size
+
+
+def file_identity(path: str) -> tuple[int, int] | None:
+    """Признак версии файла: меняется при каждой подмене"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns
+
+
+class SnapshotFile:
+    """Файл снимка, отображённый в память только на чтение
+
+    Секции - типизированные memoryview поверх mmap, без копирования.
+    Отображение живёт, пока на него ссылается хотя бы одна секция.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            stat = os.fstat(file.fileno())
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.path = path
+        self.identity = (stat.st_ino, stat.st_mtime_ns)
+        self.size = stat.st_size
+
+        magic, version, byte_order, self.built_at = _HEADER.unpack_from(buffer)
+        if magic != MAGIC or version != VERSION or byte_order != BYTE_ORDER_MARK:
+            raise ValueError(f"Файл {path} не является снимком версии {VERSION}")
+
+        view = memoryview(buffer)
+        self.sections: dict[str, memoryview] = {}
+        for index, (name, typecode) in enumerate(SECTIONS):
+            offset, length = _SECTION.unpack_from(
+                buffer, _HEADER.size + index * _SECTION.size
+            )
+            if offset + length > self.size:
+                raise ValueError(f"Файл {path} обрезан: секция {name}")
+            self.sections[name] = view[offset : offset + length].cast(typecode)
+        self.strings = StringTable(
+            self.sections["string_starts"], self.sections["string_data"]
+        )
+
+    def __getitem__(self, name: str) -> memoryview:
+        return self.sections[name]
@@ -0,0 +1,140 @@
+"""Запуск приложения: проверка схемы и прогрев до готовности
+
+Схему БД ведут только миграции alembic. При запуске ревизия БД сверяется с
+головной ревизией migrations/ одним запросом, вместо create_all, который в
+каждом воркере отражал схему и мог создать таблицы в обход миграций.
+
+Прогрев открывает соединения пула и один раз выполняет горячие чтения:
+SQLAlchemy компилирует и кэширует выражения, asyncpg готовит запросы,
+страницы таблиц и индексов попадают в кэш PostgreSQL, pydantic строит
+сериализаторы ответов. Пока прогрев не закончен, /ready отвечает 503.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+
+from .config import settings
+from .database import engine, transaction
+from .dto import (
+    Activity,
+    ActivityTree,
+    Building,
+    CoordinateRange,
+    Organization,
+    OrganizationPartial,
+    OrganizationSearchResult,
+    RadiusSearch,
+)
+from .serialization import type_adapter
+from .service import ActivityService, BuildingService, OrganizationService
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+
+# Типы ответов горячих маршрутов
+_RESPONSE_TYPES = (
+    Organization,
+    list[Organization],
+    list[OrganizationPartial],
+    OrganizationSearchResult,
+    list[Building],
+    list[Activity],
+    list[ActivityTree],
+)
+
+
+class Startup:
+    """Готовность приложения и длительность этапов запуска, мс"""
+
+    def __init__(self):
+        self.ready = False
+        self.phases: dict[str, float] = {}
+        self.total_ms: float | None = None
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round((time.perf_counter() - started) * 1000, 1)
+
+    def mark_ready(self) -> None:
+        self.total_ms = round((time.perf_counter() - self._started) * 1000, 1)
+        self.ready = True
+        logger.info("Startup finished in %.1f ms: %s", self.total_ms, self.phases)
+
+    def report(self) -> dict:
+        return {"total_ms": self.total_ms, "phases": self.phases}
+
+
+startup = Startup()
+
+
+async def check_schema() -> None:
+    """Убедиться, что БД на головной ревизии миграций"""
+    expected = set(ScriptDirectory(str(MIGRATIONS_DIR)).get_heads())
+    async with engine.connect() as conn:
+        current = await conn.run_sync(
+            lambda sync_conn: set(
+                MigrationContext.configure(sync_conn).get_current_heads()
+            )
+        )
+    if current != expected:
+        raise RuntimeError(
+            f"Database schema is at revision {sorted(current) or 'none'}, "
+            f"expected {sorted(expected)}: run `alembic upgrade head`"
+        )
+
+
+async def warm_pool(connections: int) -> None:
+    """Открыть соединения пула заранее, одновременно удерживая их"""
+    connections = min(connections, engine.pool.size())
+    opened = [engine.connect() for _ in range(connections)]
+    try:
+        await asyncio.gather(*(connection.start() for connection in opened))
+    finally:
+        # Закрытое соединение возвращается в пул и остаётся открытым
+        await asyncio.gather(*(connection.close() for connection in opened))
+
+
+async def warm_caches() -> None:
+    """Выполнить горячие чтения и построить сериализаторы ответов"""
+    for response_type in _RESPONSE_TYPES:
+        type_adapter(response_type)
+
+    async with transaction() as db:
+        await ActivityService(db).get_activity_tree()
+        await ActivityService(db).get_activity_counts()
+        buildings = BuildingService(db)
+        await buildings.get_buildings_in_range(
+            CoordinateRange(min_lat=0, max_lat=0.01, min_lng=0, max_lng=0.01)
+        )
+        await buildings.get_buildings_in_radius(
+            RadiusSearch(latitude=0, longitude=0, radius_km=1)
+        )
+        await OrganizationService(db).get_all_organizations(limit=1)
+
+
+async def warm_up() -> None:
+    """Прогреть пул и кэши, затем объявить готовность
+
+    Ошибка прогрева не мешает работе: приложение готово, но холодное.
+    """
+    try:
+        with startup.phase("warm_pool"):
+            await warm_pool(settings.WARMUP_POOL_CONNECTIONS)
+        with startup.phase("warm_caches"):
+            await warm_caches()
+    except Exception:
+        logger.exception("Warm-up failed")
+    startup.mark_ready()
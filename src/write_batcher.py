@@ -0,0 +1,124 @@
+import asyncio
+import contextvars
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBatcher:
+    """Групповая фиксация одновременных однотипных записей
+
+    Первая запись открывает окно WRITE_BATCH_WINDOW_MS, записи, пришедшие за
+    это время, выполняются вместе одной транзакцией: один INSERT на пакет и
+    одна фиксация вместо отдельных на каждый запрос. Пакет отправляется
+    сразу, как только набрал WRITE_BATCH_MAX_SIZE записей.
+
+    run_batch получает список записей и возвращает по результату на каждую,
+    ошибка отдельной записи возвращается как исключение на её месте. Если
+    пакет упал целиком (например, нарушено ограничение БД), записи
+    выполняются по одной через run_one, и каждый получает свою ошибку.
+    Пакет выполняется в отдельной задаче без контекста запросов: дедлайн
+    одного запроса не должен обрывать записи остальных, а отмена ожидающего
+    не отменяет его запись.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run_batch: Callable[[list[Any]], Awaitable[list[Any]]],
+        run_one: Callable[[Any], Awaitable[Any]],
+    ):
+        self.name = name
+        self.run_batch = run_batch
+        self.run_one = run_one
+        self.submitted = 0
+        self.batches = 0
+        self.largest_batch = 0
+        self.fallbacks = 0
+        self._pending: list[tuple[Any, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def submit(self, item: Any) -> Any:
+        """Поставить запись в ближайший пакет и дождаться её результата"""
+        self.submitted += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= settings.WRITE_BATCH_MAX_SIZE:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                settings.WRITE_BATCH_WINDOW_MS / 1000, self._flush
+            )
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self.batches += 1
+        self.largest_batch = max(self.largest_batch, len(batch))
+        task = asyncio.create_task(self._execute(batch), context=contextvars.Context())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _execute(self, batch: list[tuple[Any, asyncio.Future]]) -> None:
+        try:
+            results = await self.run_batch([item for item, _ in batch])
+        except Exception:
+            logger.warning(
+                "Write batch %s of %d failed, retrying one by one",
+                self.name,
+                len(batch),
+                exc_info=True,
+            )
+            self.fallbacks += 1
+            for item, future in batch:
+                try:
+                    result = await self.run_one(item)
+                except Exception as e:
+                    result = e
+                self._resolve(future, result)
+            return
+        for (_, future), result in zip(batch, results, strict=True):
+            self._resolve(future, result)
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, result: Any) -> None:
+        if future.done():
+            return
+        if isinstance(result, Exception):
+            future.set_exception(result)
+        else:
+            future.set_result(result)
+
+
+_write_batchers: dict[str, WriteBatcher] = {}
+
+
+def write_batcher(
+    name: str,
+    run_batch: Callable[[list[Any]], Awaitable[list[Any]]],
+    run_one: Callable[[Any], Awaitable[Any]],
+) -> WriteBatcher:
+    """Именованная группа объединяемых записей"""
+    batcher = _write_batchers.get(name)
+    if batcher is None:
+        batcher = _write_batchers[name] = WriteBatcher(name, run_batch, run_one)
+    return batcher
+
+
+def write_batcher_stats() -> list[WriteBatcher]:
+    """Все группы объединяемых записей для метрик"""
+    return list(_write_batchers.values())
@@ -2,10 +2,17 @@ import os
 import sys
 
 import pytest
+import pytest_asyncio
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.database import Base
 
 # Добавляем путь к src для импорта модулей
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
 # Фикстуры для тестов
 
 
@@ -23,3 +30,41 @@ def sample_activity_tree_data():
         "name": "Root Activity",
         "children": [{"id": 2, "name": "Child Activity", "children": []}],
     }
+
+
+@pytest.fixture
+def seed_rows():
+    """Фикстура со строками для тестовой БД: пары (таблица, строки)
+
+    Модули тестов переопределяют её своими данными.
+    """
+    return []
+
+
+@pytest_asyncio.fixture
+async def engine(seed_rows):
+    """Фикстура с движком тестовой БД, заполненной строками seed_rows
+
+    Тесты с БД пропускаются, если не задан TEST_DATABASE_URL.
+    """
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    engine = create_async_engine(TEST_DATABASE_URL)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        for table, rows in seed_rows:
+            await conn.execute(insert(table), rows)
+
+    yield engine
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def session(engine):
+    """Фикстура с сессией тестовой БД"""
+    async with AsyncSession(engine) as session:
+        yield session
@@ -0,0 +1,158 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from src import admission
+from src.admission import (
+    LOOKUP,
+    SEARCH,
+    WRITE,
+    AdmissionLimiter,
+    AdmissionMiddleware,
+    Overloaded,
+    classify,
+)
+
+
+class TestClassify:
+    """Тесты для определения класса маршрута"""
+
+    @pytest.mark.parametrize(
+        "method, path, expected",
+        [
+            ("GET", "/organizations/1", LOOKUP),
+            ("GET", "/buildings/", LOOKUP),
+            ("GET", "/organizations/search/name", SEARCH),
+            ("POST", "/buildings/search/radius", SEARCH),
+            ("GET", "/activities/tree", SEARCH),
+            ("GET", "/organizations/activity/3", SEARCH),
+            ("POST", "/organizations/", WRITE),
+            ("DELETE", "/buildings/1", WRITE),
+            ("GET", "/admin/admission", None),
+            ("GET", "/health", None),
+            ("GET", "/changes/stream", None),
+            ("GET", "/", None),
+        ],
+    )
+    def test_classify(self, method, path, expected):
+        """Тест классов маршрутов"""
+        # Act & Assert
+        assert classify(method, path) == expected
+
+
+class TestAdmissionLimiter:
+    """Тесты для ограничения одновременных запросов"""
+
+    @pytest.fixture
+    def limiter(self):
+        """Фикстура для ограничителя на один запрос с очередью из одного"""
+        return AdmissionLimiter("test", limit=1, queue_size=1)
+
+    @pytest.fixture
+    def release(self):
+        """Фикстура для события, отпускающего занятые слоты"""
+        return asyncio.Event()
+
+    async def hold(self, limiter, release):
+        async with limiter.slot():
+            await release.wait()
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_queue_is_full(self, limiter, release):
+        """Тест отказа при заполненной очереди"""
+        # Arrange
+        holder = asyncio.create_task(self.hold(limiter, release))
+        queued = asyncio.create_task(self.hold(limiter, release))
+        await asyncio.sleep(0)
+
+        # Act
+        with pytest.raises(Overloaded) as exc_info:
+            await self.hold(limiter, release)
+
+        # Assert
+        assert exc_info.value.retry_after >= 1
+        assert (limiter.active, limiter.waiting, limiter.rejected) == (1, 1, 1)
+
+        release.set()
+        await asyncio.gather(holder, queued)
+        assert (limiter.active, limiter.waiting, limiter.admitted) == (0, 0, 2)
+
+    @pytest.mark.asyncio
+    async def test_queue_timeout(self, limiter, release, monkeypatch):
+        """Тест отказа по истечении ожидания в очереди"""
+        # Arrange
+        monkeypatch.setattr(admission.settings, "ADMISSION_QUEUE_TIMEOUT_S", 0.01)
+        holder = asyncio.create_task(self.hold(limiter, release))
+        await asyncio.sleep(0)
+
+        # Act
+        with pytest.raises(Overloaded):
+            await self.hold(limiter, release)
+
+        # Assert
+        assert (limiter.timed_out, limiter.waiting) == (1, 0)
+        release.set()
+        await holder
+        assert limiter.active == 0
+
+    @pytest.mark.asyncio
+    async def test_adaptive_limit_follows_db_latency(self, monkeypatch):
+        """Тест уменьшения и восстановления адаптивного лимита"""
+        # Arrange
+        limiter = AdmissionLimiter("test", limit=10, queue_size=1, adaptive=True)
+        monkeypatch.setattr(admission.settings, "ADMISSION_ADJUST_INTERVAL_S", 0)
+        monkeypatch.setattr(admission.db_latency, "ewma_ms", 1000.0)
+
+        # Act
+        async with limiter.slot():
+            pass
+        decreased = limiter.current_limit
+        monkeypatch.setattr(admission.db_latency, "ewma_ms", 1.0)
+        for _ in range(50):
+            async with limiter.slot():
+                pass
+
+        # Assert
+        assert decreased == 9
+        assert limiter.current_limit == 10
+
+
+class TestAdmissionMiddleware:
+    """Тесты для допуска запросов в ASGI-middleware"""
+
+    @pytest.mark.parametrize(
+        "path",
+        [
+            "/organizations/activity/1",
+            "/organizations/building/1",
+            "/organizations/search/name",
+            "/export/phones",
+        ],
+    )
+    def test_slot_held_while_streaming(self, path, monkeypatch):
+        """Тест занятого слота, пока тело потокового ответа не отправлено"""
+        # Arrange
+        route_class = classify("GET", path)
+        limiter = AdmissionLimiter(route_class, limit=1, queue_size=0)
+        monkeypatch.setitem(admission.limiters, route_class, limiter)
+        active_while_streaming = []
+
+        async def body():
+            for part in (b"[", b"1", b"]"):
+                active_while_streaming.append(limiter.active)
+                yield part
+
+        app = FastAPI()
+        app.add_middleware(AdmissionMiddleware)
+        app.add_api_route(path, lambda: StreamingResponse(body()))
+
+        # Act
+        response = TestClient(app).get(path)
+
+        # Assert
+        assert response.content == b"[1]"
+        assert active_while_streaming == [1, 1, 1]
+        assert limiter.active == 0
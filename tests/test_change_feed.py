@@ -0,0 +1,72 @@
+import pytest
+
+from src.change_feed import ChangeBroadcaster, stream_events
+from src.dto import ChangeFeedFilter
+
+
+def _change(entity_type="organization", entity_id=1, latitude=55.75, longitude=37.61):
+    return {
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "operation": "upsert",
+        "latitude": latitude,
+        "longitude": longitude,
+    }
+
+
+class TestChangeBroadcaster:
+    """Тесты для раздачи событий ленты изменений"""
+
+    @pytest.fixture
+    def broadcaster(self):
+        """Фикстура для раздачи с очередью на два события"""
+        return ChangeBroadcaster(queue_size=2, max_subscribers=10)
+
+    @pytest.mark.asyncio
+    async def test_filters_by_type_and_area(self, broadcaster):
+        """Тест фильтрации событий по типу сущности и области"""
+        # Arrange
+        moscow = ChangeFeedFilter(min_lat=55, max_lat=56, min_lng=37, max_lng=38)
+        buildings = ChangeFeedFilter(entity_types=["building"])
+
+        with (
+            broadcaster.subscribe(moscow) as in_area,
+            broadcaster.subscribe(buildings) as by_type,
+        ):
+            # Act
+            broadcaster.publish(
+                [
+                    _change(entity_id=1),
+                    _change(entity_id=2, latitude=55.03, longitude=82.92),
+                    _change("activity", 3, None, None),
+                ]
+            )
+
+            # Assert
+            assert [in_area.queue.get_nowait()["entity_id"] for _ in range(2)] == [1, 3]
+            assert by_type.queue.empty()
+
+        assert not broadcaster.subscribers
+
+    @pytest.mark.asyncio
+    async def test_overflow_resets_slow_subscriber(self, broadcaster):
+        """Тест отключения подписчика, не успевающего читать события"""
+        # Arrange
+        with broadcaster.subscribe(ChangeFeedFilter()) as subscriber:
+            broadcaster.publish([_change(entity_id=i) for i in range(3)])
+
+            # Act
+            chunks = [chunk async for chunk in stream_events(subscriber)]
+
+        # Assert
+        assert subscriber.overflowed
+        assert broadcaster.dropped == 1
+        assert chunks[0] == "retry: 3000\n\n"
+        assert sum(chunk.startswith("event: organization") for chunk in chunks) == 2
+        assert chunks[-1] == "event: reset\ndata: {}\n\n"
+
+    def test_filter_requires_complete_area(self):
+        """Тест ошибки при неполной области фильтра"""
+        # Act & Assert
+        with pytest.raises(ValueError):
+            ChangeFeedFilter(min_lat=55)
@@ -0,0 +1,52 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.model.change import DELETE, ORGANIZATION, UPSERT
+from src.repository import ChangeLogRepository
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _read(engine, cursor=None) -> list[tuple[int, str]]:
+    async with AsyncSession(engine) as session:
+        changes = await ChangeLogRepository(session).get_since(cursor)
+        return [(change.entity_id, change.operation) for change in changes]
+
+
+class TestChangeLog:
+    """Тесты для журнала изменений"""
+
+    async def test_changes_wait_for_older_transactions(self, engine):
+        """Тест выдачи изменений только после фиксации более старых транзакций"""
+        # Arrange
+        async with AsyncSession(engine) as older, AsyncSession(engine) as newer:
+            await ChangeLogRepository(older).record(ORGANIZATION, [1], UPSERT)
+            await ChangeLogRepository(newer).record(ORGANIZATION, [2], DELETE)
+            await newer.commit()
+
+            # Act
+            while_older_open = await _read(engine)
+            await older.commit()
+            after_commit = await _read(engine)
+
+        # Assert
+        assert while_older_open == []
+        assert after_commit == [(1, UPSERT), (2, DELETE)]
+
+    async def test_cursor_skips_delivered_changes(self, engine):
+        """Тест продолжения чтения с курсора"""
+        # Arrange
+        async with AsyncSession(engine) as session:
+            await ChangeLogRepository(session).record(ORGANIZATION, [1, 2], UPSERT)
+            await session.commit()
+        async with AsyncSession(engine) as session:
+            first, _ = await ChangeLogRepository(session).get_since()
+        async with AsyncSession(engine) as session:
+            await ChangeLogRepository(session).record(ORGANIZATION, [3], UPSERT)
+            await session.commit()
+
+        # Act
+        changes = await _read(engine, (first.txid, first.id))
+
+        # Assert
+        assert changes == [(2, UPSERT), (3, UPSERT)]
@@ -0,0 +1,81 @@
+import pytest
+
+from src.config import settings
+from src.model import Building, Organization
+from src.repository.export_repository import _last_record_end
+
+NAMES = ['ООО "Кавычки"', "Перевод\nстроки", "Запятая, точка", "Обычная"]
+
+
+@pytest.fixture
+def seed_rows():
+    """Фикстура со строками тестовой БД: здание и организации с CSV-символами"""
+    return [
+        (
+            Building,
+            [{"id": 1, "address": "Address 1", "latitude": 55.5, "longitude": 37.25}],
+        ),
+        (
+            Organization,
+            [
+                {"id": i, "name": name, "building_id": None if i == 2 else 1}
+                for i, name in enumerate(NAMES, start=1)
+            ],
+        ),
+    ]
+
+
+class TestCsvBlocks:
+    """Тесты для деления CSV из COPY на блоки целых записей"""
+
+    def test_newline_inside_quotes_is_not_record_end(self):
+        """Тест пропуска перевода строки внутри значения в кавычках"""
+        # Arrange
+        data = bytearray(b'1,"a""b"\n2,"c\nd')
+
+        # Act
+        end = _last_record_end(data)
+
+        # Assert
+        assert data[:end] == b'1,"a""b"\n'
+
+    def test_read_block_keeps_empty_strings(self):
+        """Тест разбора блока: NULL без кавычек, пустая строка в кавычках"""
+        # Arrange
+        pytest.importorskip("pyarrow")
+        from src.columnar_export import read_block, table_schema
+
+        stamp = "2025-01-01 10:00:00+00"
+        block = f'1,"Рога ""и"" Копыта",1,{stamp},{stamp}\n2,"",,{stamp},{stamp}\n'
+
+        # Act
+        table = read_block(table_schema("organizations"), block.encode())
+
+        # Assert
+        assert table.column("name").to_pylist() == ['Рога "и" Копыта', ""]
+        assert table.column("building_id").to_pylist() == [1, None]
+
+
+class TestColumnarExport:
+    """Тесты для выгрузки таблиц в Arrow IPC и Parquet"""
+
+    @pytest.mark.asyncio
+    async def test_export_matches_table(self, session, monkeypatch):
+        """Тест совпадения выгрузки с таблицей при блоках меньше записи"""
+        # Arrange
+        pa = pytest.importorskip("pyarrow")
+        from src.columnar_export import export_stream
+
+        monkeypatch.setattr(settings, "EXPORT_BLOCK_SIZE", 16)
+
+        # Act
+        body = b"".join(
+            [chunk async for chunk in export_stream(session, "organizations", "arrow")]
+        )
+        table = pa.ipc.open_stream(body).read_all()
+
+        # Assert
+        assert table.column("name").to_pylist() == NAMES
+        assert table.column("building_id").to_pylist() == [1, None, 1, 1]
+        assert table.schema.field("id").nullable is False
+        assert str(table.schema.field("created_at").type) == "timestamp[us, tz=UTC]"
@@ -0,0 +1,128 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from src.config import settings
+from src.content_negotiation import (
+    ContentNegotiationMiddleware,
+    choose_encoding,
+    prefers_msgpack,
+)
+
+ITEMS = [{"id": i, "name": f"Организация {i}"} for i in range(100)]
+
+
+@pytest.fixture
+def client():
+    """Фикстура с приложением за слоем согласования"""
+    app = FastAPI()
+    app.add_middleware(ContentNegotiationMiddleware)
+
+    @app.get("/items")
+    async def items():
+        return ITEMS
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            yield b"["
+            yield b'{"id": 1}'
+            yield b"]"
+
+        return StreamingResponse(chunks(), media_type="application/json")
+
+    return TestClient(app)
+
+
+class TestContentNegotiation:
+    """Тесты для согласования формата и сжатия ответов"""
+
+    def test_choose_encoding_respects_weights(self):
+        """Тест выбора gzip при запрете остальных сжатий"""
+        # Assert
+        assert choose_encoding("gzip, zstd;q=0, br;q=0") == "gzip"
+        assert choose_encoding("identity") is None
+        assert choose_encoding("*;q=0") is None
+
+    def test_large_response_is_gzipped(self, client):
+        """Тест сжатия ответа больше порога"""
+        # Act
+        response = client.get("/items", headers={"Accept-Encoding": "gzip"})
+
+        # Assert
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert response.json() == ITEMS
+
+    def test_small_response_is_not_compressed(self, client, monkeypatch):
+        """Тест отдачи без сжатия ответа меньше порога"""
+        # Arrange
+        monkeypatch.setattr(settings, "COMPRESSION_MIN_SIZE", 1024 * 1024)
+
+        # Act
+        response = client.get("/items", headers={"Accept-Encoding": "gzip"})
+
+        # Assert
+        assert "content-encoding" not in response.headers
+        assert response.json() == ITEMS
+
+    def test_streaming_response_is_compressed_by_chunks(self, client):
+        """Тест потокового сжатия без буферизации ответа"""
+        # Act
+        response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+
+        # Assert
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert response.json() == [{"id": 1}]
+
+    def test_msgpack_built_from_same_data(self, client):
+        """Тест ответа в MessagePack по заголовку Accept"""
+        # Arrange
+        msgpack = pytest.importorskip("msgpack")
+
+        # Act
+        response = client.get(
+            "/items",
+            headers={"Accept": "application/msgpack", "Accept-Encoding": "identity"},
+        )
+
+        # Assert
+        assert prefers_msgpack("application/msgpack, application/json;q=0.5")
+        assert response.headers["content-type"] == "application/msgpack"
+        assert msgpack.unpackb(response.content) == ITEMS
+
+    def test_streaming_response_stays_json_for_msgpack(self, client):
+        """Тест потокового ответа в JSON без буферизации при Accept MessagePack"""
+        # Arrange
+        pytest.importorskip("msgpack")
+
+        # Act
+        response = client.get(
+            "/stream",
+            headers={"Accept": "application/msgpack", "Accept-Encoding": "gzip"},
+        )
+
+        # Assert
+        assert response.headers["content-type"] == "application/json"
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.json() == [{"id": 1}]
+
+    def test_reused_response_is_not_modified(self):
+        """Тест одинаковых ответов, когда маршрут отдаёт один и тот же Response"""
+        # Arrange
+        shared = Response(content=b"x" * 2000, media_type="application/json")
+        app = FastAPI()
+        app.add_middleware(ContentNegotiationMiddleware)
+        app.add_api_route("/shared", lambda: shared)
+        client = TestClient(app)
+
+        # Act
+        first = client.get("/shared", headers={"Accept-Encoding": "gzip"})
+        second = client.get("/shared", headers={"Accept-Encoding": "gzip"})
+
+        # Assert
+        assert first.content == second.content == b"x" * 2000
+        assert second.headers["content-encoding"] == "gzip"
+        assert "content-encoding" not in shared.headers
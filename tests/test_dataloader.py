@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from src.dataloader import DataLoader
+
+
+class TestDataLoader:
+    """Тесты для пакетного загрузчика"""
+
+    @pytest.fixture
+    def batches(self):
+        """Фикстура со списком выполненных пакетов"""
+        return []
+
+    @pytest.fixture
+    def loader(self, batches):
+        """Фикстура для загрузчика, возвращающего ключ, умноженный на 10"""
+
+        async def batch_load(keys):
+            batches.append(keys)
+            return {key: key * 10 for key in keys if key != 404}
+
+        return DataLoader(batch_load)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_loads_are_batched(self, loader, batches):
+        """Тест объединения параллельных загрузок в один пакет"""
+        # Act
+        result = await asyncio.gather(loader.load(1), loader.load(2), loader.load(1))
+
+        # Assert
+        assert result == [10, 20, 10]
+        assert batches == [[1, 2]]
+
+    @pytest.mark.asyncio
+    async def test_repeated_load_uses_cache(self, loader, batches):
+        """Тест повторной загрузки из кэша"""
+        # Act
+        await loader.load(1)
+        result = await loader.load_many([1, 404])
+
+        # Assert
+        assert result == [10, None]
+        assert batches == [[1], [404]]
+
+    @pytest.mark.asyncio
+    async def test_clear_and_prime(self, loader, batches):
+        """Тест сброса и предзаполнения кэша"""
+        # Arrange
+        await loader.load(1)
+
+        # Act
+        loader.clear(1)
+        reloaded = await loader.load(1)
+        loader.prime(2, 99)
+        primed = await loader.load(2)
+
+        # Assert
+        assert (reloaded, primed) == (10, 99)
+        assert batches == [[1], [1]]
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self, batches):
+        """Тест повторного запроса после ошибки загрузки"""
+        # Arrange
+        failures = [RuntimeError("db is down")]
+
+        async def batch_load(keys):
+            batches.append(keys)
+            if failures:
+                raise failures.pop()
+            return {key: key for key in keys}
+
+        loader = DataLoader(batch_load)
+
+        # Act
+        with pytest.raises(RuntimeError):
+            await loader.load(1)
+        result = await loader.load(1)
+
+        # Assert
+        assert result == 1
+        assert batches == [[1], [1]]
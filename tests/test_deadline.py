@@ -0,0 +1,148 @@
+import asyncio
+import os
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src import deadline
+from src.deadline import (
+    DeadlineMiddleware,
+    install_statement_timeout,
+    is_query_canceled,
+    request_deadline,
+    route_timeout_ms,
+)
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+
+class TestRouteTimeout:
+    """Тесты для выбора дедлайна маршрута"""
+
+    def test_route_override(self, monkeypatch):
+        """Тест дедлайна, заданного для маршрута"""
+        # Arrange
+        monkeypatch.setattr(deadline.settings, "ROUTE_TIMEOUTS_MS", {"/slow": 50})
+
+        # Act & Assert
+        assert route_timeout_ms("/slow") == 50
+        assert route_timeout_ms("/other") == deadline.settings.REQUEST_TIMEOUT_MS
+
+    def test_zero_disables_deadline(self, monkeypatch):
+        """Тест отключения дедлайна нулевым значением"""
+        # Arrange
+        monkeypatch.setattr(deadline.settings, "ROUTE_TIMEOUTS_MS", {"/slow": 0})
+
+        # Act & Assert
+        assert route_timeout_ms("/slow") is None
+
+    @pytest.mark.parametrize(
+        "path",
+        [
+            "/organizations/search/name",
+            "/organizations/building/{building_id}",
+            "/organizations/activity/{activity_id}",
+        ],
+    )
+    def test_streamed_routes_have_no_deadline(self, path, monkeypatch):
+        """Тест отключения дедлайна для списков, отдаваемых потоком"""
+        # Arrange
+        monkeypatch.setattr(deadline.settings, "STREAMING_RESPONSES_ENABLED", True)
+
+        # Act & Assert
+        assert route_timeout_ms(path) is None
+
+
+class TestDeadlineMiddleware:
+    """Тесты для middleware дедлайнов"""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        """Фикстура для приложения с медленным и быстрым маршрутами"""
+        monkeypatch.setattr(
+            deadline.settings, "ROUTE_TIMEOUTS_MS", {"/items/{item_id}": 50}
+        )
+        app = FastAPI()
+        app.add_middleware(DeadlineMiddleware)
+
+        @app.get("/items/{item_id}")
+        async def get_item(item_id: int):
+            await asyncio.sleep(item_id / 1000)
+            return {"remaining": deadline.remaining_ms() is not None}
+
+        @app.get("/items/{item_id}/stream")
+        async def stream_item(item_id: int):
+            async def body():
+                for _ in range(3):
+                    await asyncio.sleep(item_id / 1000)
+                    yield str(deadline.remaining_ms() is not None)
+
+            return StreamingResponse(body(), media_type="text/plain")
+
+        return TestClient(app)
+
+    def test_fast_request(self, client):
+        """Тест ответа в пределах дедлайна"""
+        # Act
+        response = client.get("/items/1")
+
+        # Assert
+        assert response.status_code == 200
+        assert response.json() == {"remaining": True}
+
+    def test_slow_request_is_cancelled(self, client):
+        """Тест ответа 504 по истечении дедлайна"""
+        # Act
+        started = time.monotonic()
+        response = client.get("/items/5000")
+
+        # Assert
+        assert response.status_code == 504
+        assert time.monotonic() - started < 1
+
+    def test_stream_is_not_cut_after_headers(self, client, monkeypatch):
+        """Тест отправки потокового тела целиком дольше дедлайна"""
+        # Arrange
+        monkeypatch.setitem(
+            deadline.settings.ROUTE_TIMEOUTS_MS, "/items/{item_id}/stream", 50
+        )
+
+        # Act
+        response = client.get("/items/40/stream")
+
+        # Assert
+        assert response.status_code == 200
+        assert response.text == "False" * 3
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+class TestStatementTimeout:
+    """Тесты для передачи дедлайна в statement_timeout"""
+
+    @pytest.mark.asyncio
+    async def test_statement_is_cancelled_by_deadline(self):
+        """Тест отмены запроса PostgreSQL по остатку дедлайна"""
+        # Arrange
+        install_statement_timeout()
+        engine = create_async_engine(TEST_DATABASE_URL)
+        token = request_deadline.set(time.monotonic() + 0.2)
+
+        # Act
+        try:
+            async with AsyncSession(engine) as session:
+                timeout = await session.scalar(text("SHOW statement_timeout"))
+                with pytest.raises(DBAPIError) as exc_info:
+                    await session.execute(text("SELECT pg_sleep(5)"))
+        finally:
+            request_deadline.reset(token)
+            await engine.dispose()
+
+        # Assert
+        assert timeout.endswith("ms") and int(timeout[:-2]) <= 200
+        assert is_query_canceled(exc_info.value)
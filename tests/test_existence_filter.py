@@ -0,0 +1,68 @@
+import pytest
+
+from src.config import settings
+from src.existence_filter import BloomFilter, ExistenceFilter
+
+
+class TestExistenceFilter:
+    """Тесты для фильтров существования"""
+
+    @pytest.fixture
+    def names(self, monkeypatch):
+        """Фикстура с включённым фильтром по тысяче названий"""
+        monkeypatch.setattr(settings, "EXISTENCE_FILTERS_ENABLED", True)
+        existence_filter = ExistenceFilter("names")
+        existence_filter.load([f"Организация {i}" for i in range(1000)])
+        return existence_filter
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        """Тест отсутствия ложных промахов и доли ложных срабатываний"""
+        # Arrange
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+
+        # Act
+        for i in range(1000):
+            bloom.add(i)
+        false_positives = sum(i in bloom for i in range(1000, 11000))
+
+        # Assert
+        assert all(i in bloom for i in range(1000))
+        assert false_positives / 10000 < 0.02
+        assert bloom.expected_error_rate == pytest.approx(0.01, rel=0.2)
+
+    @pytest.mark.asyncio
+    async def test_probe_skips_lookup_on_definite_miss(self, names):
+        """Тест запроса в БД только при ответе "возможно" """
+        # Arrange
+        lookups = []
+
+        async def lookup():
+            lookups.append(True)
+            return None
+
+        # Act
+        missing = await names.probe("Новая организация", lookup)
+        existing = await names.probe("Организация 1", lookup)
+
+        # Assert
+        assert missing is None
+        assert existing is None
+        assert len(lookups) == 1
+        assert names.skipped == 1
+        assert names.false_positives == 1
+
+    @pytest.mark.asyncio
+    async def test_disabled_filter_always_looks_up(self, names, monkeypatch):
+        """Тест выключенного фильтра: каждая проверка идёт в БД"""
+        # Arrange
+        monkeypatch.setattr(settings, "EXISTENCE_FILTERS_ENABLED", False)
+
+        async def lookup():
+            return "found"
+
+        # Act
+        result = await names.probe("Новая организация", lookup)
+
+        # Assert
+        assert result == "found"
+        assert names.checks == 0
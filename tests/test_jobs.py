@@ -0,0 +1,183 @@
+import pytest
+import pytest_asyncio
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.dto import JobCreate
+from src.jobs import JobCancelled, JobContext, JobLeaseLost
+from src.model.job import CANCELLED, RUNNING, SUCCEEDED
+from src.repository import JobRepository
+
+
+@pytest_asyncio.fixture
+async def session(engine):
+    """Фикстура с сессией пустой тестовой БД без сброса объектов при фиксации"""
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+
+
+class TestJobCreate:
+    """Тесты для разбора параметров задачи по её виду"""
+
+    def test_bulk_import_requires_organizations(self):
+        """Тест отказа в импорте без организаций"""
+        # Arrange
+        adapter = TypeAdapter(JobCreate)
+
+        # Act / Assert
+        with pytest.raises(ValidationError):
+            adapter.validate_python({"kind": "bulk_import", "organizations": []})
+
+    def test_unknown_kind_rejected(self):
+        """Тест отказа в неизвестном виде задачи"""
+        # Arrange
+        adapter = TypeAdapter(JobCreate)
+
+        # Act / Assert
+        with pytest.raises(ValidationError):
+            adapter.validate_python({"kind": "reindex"})
+
+
+class TestJobQueue:
+    """Тесты для очереди задач в таблице jobs"""
+
+    @pytest.mark.asyncio
+    async def test_claim_takes_each_job_once(self, session):
+        """Тест выдачи задачи из очереди только одному исполнителю"""
+        # Arrange
+        repository = JobRepository(session)
+        job = await repository.create("recompute_counts", {})
+        await session.commit()
+
+        # Act
+        claimed = await repository.claim(lease_s=60)
+        await session.commit()
+        again = await repository.claim(lease_s=60)
+
+        # Assert
+        assert claimed.id == job.id
+        assert claimed.status == RUNNING
+        assert claimed.attempts == 1
+        assert again is None
+
+    @pytest.mark.asyncio
+    async def test_expired_lease_is_claimed_again(self, session):
+        """Тест повторной выдачи задачи, аренда которой истекла"""
+        # Arrange
+        repository = JobRepository(session)
+        job = await repository.create("rebuild_documents", {})
+        await session.commit()
+        await repository.claim(lease_s=60)
+        await session.commit()
+
+        # Act
+        claimed = await repository.claim(lease_s=0)
+
+        # Assert
+        assert claimed.id == job.id
+        assert claimed.attempts == 2
+
+    @pytest.mark.asyncio
+    async def test_requeue_keeps_checkpoint(self, session):
+        """Тест возврата прерванной задачи в очередь с точкой продолжения"""
+        # Arrange
+        repository = JobRepository(session)
+        job = await repository.create("rebuild_documents", {})
+        await session.commit()
+        claimed = await repository.claim(lease_s=60)
+        await repository.save_progress(
+            job.id, claimed.attempts, 5, 10, {"last_id": 5, "done": 5}
+        )
+        await session.commit()
+
+        # Act
+        await repository.requeue({job.id: claimed.attempts})
+        await session.commit()
+        claimed = await repository.claim(lease_s=60)
+
+        # Assert
+        assert claimed.status == RUNNING
+        assert claimed.attempts == 1
+        assert claimed.checkpoint == {"last_id": 5, "done": 5}
+        assert claimed.progress_done == 5
+
+    @pytest.mark.asyncio
+    async def test_reclaimed_job_fences_previous_attempt(self, session):
+        """Тест отказа в записях попытке, у которой задачу забрали"""
+        # Arrange
+        repository = JobRepository(session)
+        await repository.create("rebuild_documents", {})
+        await session.commit()
+        stale = JobContext(await repository.claim(lease_s=60))
+        await session.commit()
+        current = await repository.claim(lease_s=0)
+        await session.commit()
+        current_id, current_attempt = current.id, current.attempts
+
+        # Act
+        heartbeat = await repository.heartbeat(stale.id, stale.attempt)
+        finished = await repository.finish(stale.id, stale.attempt, SUCCEEDED)
+        with pytest.raises(JobLeaseLost):
+            await stale.save(1, 10, {"last_id": 1, "done": 1}, session)
+        await session.rollback()
+        progress = await repository.save_progress(current_id, current_attempt, 2)
+
+        # Assert
+        assert heartbeat is None
+        assert finished is False
+        assert stale.lease_lost
+        assert progress is False
+
+    @pytest.mark.asyncio
+    async def test_cancel_queued_job(self, session):
+        """Тест немедленной отмены задачи, ещё стоящей в очереди"""
+        # Arrange
+        repository = JobRepository(session)
+        job = await repository.create("recompute_counts", {})
+        await session.commit()
+
+        # Act
+        cancelled = await repository.cancel(job.id)
+        await session.commit()
+        claimed = await repository.claim(lease_s=60)
+
+        # Assert
+        assert cancelled.status == CANCELLED
+        assert cancelled.finished_at is not None
+        assert claimed is None
+
+    @pytest.mark.asyncio
+    async def test_cancel_running_job_stops_at_next_step(self, session):
+        """Тест прерывания выполняемой задачи на записи следующего шага"""
+        # Arrange
+        repository = JobRepository(session)
+        await repository.create("rebuild_documents", {})
+        await session.commit()
+        job = await repository.claim(lease_s=60)
+        await session.commit()
+        context = JobContext(job)
+
+        # Act
+        requested = await repository.cancel(job.id)
+        await session.commit()
+
+        # Assert
+        assert requested.status == RUNNING
+        with pytest.raises(JobCancelled):
+            await context.save(1, 10, {"last_id": 1, "done": 1}, session)
+        assert context.cancel_requested
+
+    @pytest.mark.asyncio
+    async def test_cancel_finished_job_returns_none(self, session):
+        """Тест отказа в отмене уже завершённой задачи"""
+        # Arrange
+        repository = JobRepository(session)
+        job = await repository.create("recompute_counts", {})
+        await repository.cancel(job.id)
+        await session.commit()
+
+        # Act
+        result = await repository.cancel(job.id)
+
+        # Assert
+        assert result is None
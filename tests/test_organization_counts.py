@@ -0,0 +1,88 @@
+import pytest
+from sqlalchemy import insert, update
+
+from src.model import Activity, Building, BuildingOrganizationCount, Organization
+from src.model.organization import organization_activity
+from src.repository import OrganizationCountRepository, OrganizationDocumentRepository
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def seed_rows():
+    """Фикстура со строками тестовой БД: два здания и дерево 1 -> 2 -> 3, 1 -> 4"""
+    return [
+        (
+            Building,
+            [
+                {
+                    "id": i,
+                    "address": f"Address {i}",
+                    "latitude": 55.0,
+                    "longitude": 37.0,
+                }
+                for i in (1, 2)
+            ],
+        ),
+        (
+            Activity,
+            [
+                {"id": 1, "name": "Еда", "parent_id": None},
+                {"id": 2, "name": "Мясная продукция", "parent_id": 1},
+                {"id": 3, "name": "Колбасы", "parent_id": 2},
+                {"id": 4, "name": "Молочная продукция", "parent_id": 1},
+            ],
+        ),
+    ]
+
+
+async def _create(session, organization_id, building_id, activity_ids):
+    await session.execute(
+        insert(Organization).values(
+            id=organization_id, name=f"Org {organization_id}", building_id=building_id
+        )
+    )
+    await session.execute(
+        insert(organization_activity),
+        [
+            {"organization_id": organization_id, "activity_id": activity_id}
+            for activity_id in activity_ids
+        ],
+    )
+    await OrganizationDocumentRepository(session).refresh([organization_id])
+
+
+class TestOrganizationCounts:
+    """Тесты для счётчиков организаций"""
+
+    async def test_counts_follow_writes(self, session):
+        """Тест инкрементального обновления счётчиков"""
+        # Arrange
+        counts = OrganizationCountRepository(session)
+
+        # Act
+        await _create(session, 1, 1, [3, 4])
+        await _create(session, 2, 1, [2])
+        await _create(session, 3, 2, [4])
+        await OrganizationDocumentRepository(session).delete(3)
+
+        # Assert
+        assert await counts.get_activity_counts() == [(1, 2), (2, 2), (3, 1), (4, 1)]
+        assert await counts.get_building_counts() == [(1, 2), (2, 0)]
+
+    async def test_recompute_repairs_drift(self, session):
+        """Тест исправления расхождений полным пересчётом"""
+        # Arrange
+        counts = OrganizationCountRepository(session)
+        await _create(session, 1, 1, [3])
+        await session.execute(
+            update(BuildingOrganizationCount).values(organization_count=42)
+        )
+
+        # Act
+        drift = await counts.recompute()
+
+        # Assert
+        assert drift == (1, 0)
+        assert await counts.get_building_counts() == [(1, 1), (2, 0)]
+        assert await counts.recompute() == (0, 0)
@@ -0,0 +1,77 @@
+import pytest
+from sqlalchemy import func, select
+
+from src.dto import OrganizationCreate, PhoneCreate
+from src.model import Activity, Building, OrganizationPhone
+from src.model.organization import organization_activity
+from src.repository import OrganizationCountRepository, OrganizationRepository
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def seed_rows():
+    """Фикстура со строками тестовой БД: два здания и три деятельности"""
+    return [
+        (
+            Building,
+            [
+                {
+                    "id": i,
+                    "address": f"Address {i}",
+                    "latitude": 55.0,
+                    "longitude": 37.0,
+                }
+                for i in (1, 2)
+            ],
+        ),
+        (
+            Activity,
+            [
+                {"id": 1, "name": "Еда", "parent_id": None},
+                {"id": 2, "name": "Мясная продукция", "parent_id": 1},
+                {"id": 3, "name": "Молочная продукция", "parent_id": 1},
+            ],
+        ),
+    ]
+
+
+async def _create(repository, name, building_id, activity_ids):
+    organization = await repository.create(
+        OrganizationCreate(
+            name=name,
+            building_id=building_id,
+            phone_numbers=[PhoneCreate(phone_number="111")],
+            activity_ids=activity_ids,
+        ),
+        ["111"],
+    )
+    return organization.id
+
+
+async def _count(session, table):
+    return await session.scalar(select(func.count()).select_from(table))
+
+
+class TestOrganizationDelete:
+    """Тесты для удаления организаций без загрузки в сессию"""
+
+    async def test_bulk_delete_by_filters(self, session):
+        """Тест удаления по зданию и поддереву деятельности с каскадом"""
+        # Arrange
+        repository = OrganizationRepository(session)
+        first = await _create(repository, "Первая", 1, [2])
+        await _create(repository, "Вторая", 1, [3])
+        await _create(repository, "Третья", 2, [2])
+        ids = await repository.get_ids(building_id=1, activity_id=1)
+
+        # Act
+        deleted = await repository.delete_many(ids)
+
+        # Assert
+        assert deleted == [first, first + 1]
+        assert await _count(session, OrganizationPhone.__table__) == 1
+        assert await _count(session, organization_activity) == 1
+        counts = OrganizationCountRepository(session)
+        assert await counts.get_building_counts() == [(1, 0), (2, 1)]
+        assert await repository.delete(first) is False
@@ -0,0 +1,140 @@
+import pytest
+import pytest_asyncio
+from pydantic import ValidationError
+
+from src.dto import OrganizationSearch
+from src.model import Activity, Building, Organization, OrganizationPhone
+from src.model.organization import organization_activity
+from src.repository import OrganizationDocumentRepository, OrganizationSearchRepository
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def seed_rows():
+    """Фикстура со строками тестовой БД: здания в Москве и Новосибирске"""
+    return [
+        (
+            Building,
+            [
+                {"id": 1, "address": "Москва", "latitude": 55.75, "longitude": 37.61},
+                {
+                    "id": 2,
+                    "address": "Новосибирск",
+                    "latitude": 55.03,
+                    "longitude": 82.92,
+                },
+            ],
+        ),
+        (
+            Activity,
+            [
+                {"id": 1, "name": "Еда", "parent_id": None},
+                {"id": 2, "name": "Мясная продукция", "parent_id": 1},
+                {"id": 3, "name": "Автомобили", "parent_id": None},
+            ],
+        ),
+        (
+            Organization,
+            [
+                {"id": 1, "name": "Рога и Копыта", "building_id": 1},
+                {"id": 2, "name": "Мясокомбинат", "building_id": 2},
+                {"id": 3, "name": "Автосервис", "building_id": 1},
+            ],
+        ),
+        (
+            organization_activity,
+            [
+                {"organization_id": 1, "activity_id": 2},
+                {"organization_id": 2, "activity_id": 2},
+                {"organization_id": 3, "activity_id": 3},
+            ],
+        ),
+        (
+            OrganizationPhone,
+            [
+                {
+                    "organization_id": 1,
+                    "phone_number": "8-923-666-13-13",
+                    "phone_digits": "89236661313",
+                },
+                {
+                    "organization_id": 3,
+                    "phone_number": "3-333-333",
+                    "phone_digits": "3333333",
+                },
+            ],
+        ),
+    ]
+
+
+@pytest_asyncio.fixture
+async def session(session):
+    """Фикстура с сессией тестовой БД и документами организаций"""
+    await OrganizationDocumentRepository(session).refresh([1, 2, 3])
+    return session
+
+
+class TestOrganizationSearch:
+    """Тесты для комбинированного поиска организаций"""
+
+    async def test_combined_filters_with_facets(self, session):
+        """Тест пересечения поддерева деятельности и радиуса с фасетами"""
+        # Arrange
+        criteria = OrganizationSearch(
+            activity_ids=[1],
+            latitude=55.0,
+            longitude=82.9,
+            radius_km=10,
+            facets=True,
+        )
+
+        # Act
+        page, plan = await OrganizationSearchRepository(session).search(criteria)
+
+        # Assert
+        assert page.total == 1
+        assert [item["id"] for item in page.items] == [2]
+        assert page.buildings == {"2": 1}
+        assert page.activities == {"2": 1}
+        assert plan.driver == "geo"
+        assert plan.filters == ["activity"]
+        assert plan.estimates == {"total": 3, "geo": 1, "activity": 2}
+
+    async def test_pagination_and_phone_prefix(self, session):
+        """Тест пагинации и поиска по началу телефона"""
+        # Arrange
+        repository = OrganizationSearchRepository(session)
+
+        # Act
+        page, plan = await repository.search(OrganizationSearch(skip=1, limit=1))
+        by_phone, _ = await repository.search(OrganizationSearch(phone="3-33"))
+
+        # Assert
+        assert page.total == 3
+        assert [item["id"] for item in page.items] == [2]
+        assert plan.driver is None
+        assert [item["id"] for item in by_phone.items] == [3]
+
+    async def test_empty_result(self, session):
+        """Тест пустого результата"""
+        # Act
+        page, _ = await OrganizationSearchRepository(session).search(
+            OrganizationSearch(name="Нет такой", building_id=2, facets=True)
+        )
+
+        # Assert
+        assert page.total == 0
+        assert page.items == []
+        assert page.buildings == {}
+
+
+class TestOrganizationSearchCriteria:
+    """Тесты для проверки критериев комбинированного поиска"""
+
+    @pytest.mark.parametrize("phone", ["--", "(+)", "8"])
+    async def test_phone_without_digits_rejected(self, phone):
+        """Тест отказа в поиске по телефону меньше чем из двух цифр"""
+        # Act / Assert
+        with pytest.raises(ValidationError):
+            OrganizationSearch(phone=phone)
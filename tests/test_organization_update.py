@@ -0,0 +1,89 @@
+import pytest
+
+from src.dto import OrganizationCreate, OrganizationUpdate, PhoneCreate
+from src.model import Activity, Building
+from src.repository import OrganizationRepository
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def seed_rows():
+    """Фикстура со строками тестовой БД: два здания и три деятельности"""
+    return [
+        (
+            Building,
+            [
+                {
+                    "id": i,
+                    "address": f"Address {i}",
+                    "latitude": 55.0,
+                    "longitude": 37.0,
+                }
+                for i in (1, 2)
+            ],
+        ),
+        (
+            Activity,
+            [
+                {"id": 1, "name": "Еда", "parent_id": None},
+                {"id": 2, "name": "Мясная продукция", "parent_id": 1},
+                {"id": 3, "name": "Молочная продукция", "parent_id": 1},
+            ],
+        ),
+    ]
+
+
+def _phones(*numbers):
+    return [PhoneCreate(phone_number=number) for number in numbers]
+
+
+class TestOrganizationUpdate:
+    """Тесты для частичного обновления организации"""
+
+    async def test_update_changes_only_differences(self, session):
+        """Тест сохранения совпадающих телефонов и связей"""
+        # Arrange
+        repository = OrganizationRepository(session)
+        organization = await repository.create(
+            OrganizationCreate(
+                name="Рога и Копыта",
+                building_id=1,
+                phone_numbers=_phones("111", "222", "333"),
+                activity_ids=[1, 2],
+            ),
+            ["111", "222", "333"],
+        )
+        kept = {phone.phone_number: phone.id for phone in organization.phone_numbers}
+
+        # Act
+        document = await repository.update(
+            organization.id,
+            OrganizationUpdate(
+                building_id=2,
+                phone_numbers=_phones("222", "333", "444"),
+                activity_ids=[2, 3],
+            ),
+            ["222", "333", "444"],
+        )
+
+        # Assert
+        phones = {
+            phone["phone_number"]: phone["id"] for phone in document["phone_numbers"]
+        }
+        assert document["name"] == "Рога и Копыта"
+        assert document["building"]["id"] == 2
+        assert list(phones) == ["222", "333", "444"]
+        assert phones["222"] == kept["222"]
+        assert phones["333"] == kept["333"]
+        assert [activity["id"] for activity in document["activities"]] == [2, 3]
+
+    async def test_update_missing_organization(self, session):
+        """Тест обновления несуществующей организации"""
+        # Act
+        document = await OrganizationRepository(session).update(
+            42, OrganizationUpdate(name="Новое название")
+        )
+
+        # Assert
+        assert document is None
@@ -0,0 +1,64 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from fastapi import Response
+
+from src.dto import Activity
+from src.serialization import from_orm, json_response, json_stream
+
+
+class TestSerialization:
+    """Тесты для быстрого пути сериализации"""
+
+    def test_from_orm_validates_list_in_one_pass(self):
+        """Тест преобразования ORM-объектов в список DTO"""
+        # Arrange
+        rows = [SimpleNamespace(id=1, name="Еда", parent_id=None)]
+
+        # Act
+        result = from_orm(list[Activity], rows)
+
+        # Assert
+        assert result == [Activity(id=1, name="Еда", parent_id=None)]
+
+    def test_json_response_dumps_bytes(self):
+        """Тест сериализации DTO сразу в JSON-ответ"""
+        # Act
+        response = json_response(list[Activity], [Activity(id=1, name="Еда")])
+
+        # Assert
+        assert isinstance(response, Response)
+        assert response.media_type == "application/json"
+        assert response.body == '[{"name":"Еда","parent_id":null,"id":1}]'.encode()
+
+    def test_json_response_disabled_returns_content(self):
+        """Тест отключения быстрого пути через настройки"""
+        # Arrange
+        activities = [Activity(id=1, name="Еда")]
+
+        # Act
+        with patch("src.serialization.settings.FAST_SERIALIZATION", False):
+            result = json_response(list[Activity], activities)
+
+        # Assert
+        assert result is activities
+
+    @pytest.mark.asyncio
+    async def test_json_stream_joins_chunks_into_array(self):
+        """Тест склейки частей потока в один JSON-массив"""
+
+        # Arrange
+        async def chunks():
+            yield [Activity(id=1, name="Еда")]
+            yield []
+            yield [Activity(id=2, name="Мясо", parent_id=1), Activity(id=3, name="Сыр")]
+
+        # Act
+        response = json_stream(Activity, chunks())
+        body = b"".join([part async for part in response.body_iterator])
+
+        # Assert
+        assert response.media_type == "application/json"
+        assert [activity["id"] for activity in json.loads(body)] == [1, 2, 3]
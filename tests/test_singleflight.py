@@ -0,0 +1,142 @@
+import asyncio
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.api.v1.activities import get_activity_tree
+from src.dto import ActivityTree
+from src.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    """Тесты для объединения одинаковых одновременных вычислений"""
+
+    @pytest.fixture
+    def flight(self):
+        """Фикстура для группы объединяемых вычислений"""
+        return SingleFlight("test")
+
+    @pytest.fixture
+    def compute(self):
+        """Фикстура для медленного вычисления со счётчиком запусков"""
+        runs = []
+
+        def factory(value):
+            async def fn():
+                runs.append(value)
+                await asyncio.sleep(0.01)
+                return value
+
+            return fn
+
+        factory.runs = runs
+        return factory
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_computation(self, flight, compute):
+        """Тест объединения одновременных вызовов с одним ключом"""
+        # Act
+        result = await asyncio.gather(
+            *(flight.do("tree", compute("value")) for _ in range(5))
+        )
+
+        # Assert
+        assert result == ["value"] * 5
+        assert compute.runs == ["value"]
+        assert flight.calls == 5
+        assert flight.executions == 1
+        assert flight.coalesced == 4
+        assert flight.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_different_keys_are_not_coalesced(self, flight, compute):
+        """Тест раздельного выполнения вызовов с разными ключами"""
+        # Act
+        result = await asyncio.gather(
+            flight.do(1, compute("first")), flight.do(2, compute("second"))
+        )
+
+        # Assert
+        assert result == ["first", "second"]
+        assert flight.coalesced == 0
+
+    @pytest.mark.asyncio
+    async def test_sequential_calls_are_not_cached(self, flight, compute):
+        """Тест повторного выполнения после завершения вычисления"""
+        # Act
+        await flight.do("tree", compute("first"))
+        result = await flight.do("tree", compute("second"))
+
+        # Assert
+        assert result == "second"
+        assert compute.runs == ["first", "second"]
+
+    @pytest.mark.asyncio
+    async def test_error_is_shared_and_not_cached(self, flight, compute):
+        """Тест передачи ошибки всем ожидающим без её кэширования"""
+
+        # Arrange
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        # Act
+        result = await asyncio.gather(
+            flight.do("tree", fail), flight.do("tree", fail), return_exceptions=True
+        )
+
+        # Assert
+        assert [type(error) for error in result] == [ValueError, ValueError]
+        assert await flight.do("tree", compute("ok")) == "ok"
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_others(self, flight, compute):
+        """Тест отмены одного из ожидающих без влияния на остальных"""
+        # Arrange
+        leader = asyncio.create_task(flight.do("tree", compute("value")))
+        follower = asyncio.create_task(flight.do("tree", compute("value")))
+        await asyncio.sleep(0)
+
+        # Act
+        leader.cancel()
+
+        # Assert
+        assert await follower == "value"
+        assert leader.cancelled()
+
+
+class TestSingleFlightHandlers:
+    """Тесты для обработчиков, объединяющих одинаковые запросы"""
+
+    @pytest.mark.asyncio
+    async def test_each_caller_gets_own_response(self):
+        """Тест выдачи каждому ожидающему собственного объекта ответа"""
+
+        # Arrange
+        @asynccontextmanager
+        async def transaction():
+            yield None
+
+        async def load_tree(_max_level):
+            await asyncio.sleep(0.01)
+            return [ActivityTree(id=1, name="Root", level=1)]
+
+        service = AsyncMock()
+        service.get_activity_tree = AsyncMock(side_effect=load_tree)
+
+        # Act
+        with (
+            patch("src.api.v1.activities.transaction", transaction),
+            patch("src.api.v1.activities.ActivityService", return_value=service),
+        ):
+            first, second = await asyncio.gather(
+                get_activity_tree(3), get_activity_tree(3)
+            )
+        first.headers["content-encoding"] = "br"
+
+        # Assert
+        assert service.get_activity_tree.await_count == 1
+        assert first is not second
+        assert "content-encoding" not in second.headers
+        assert first.body == second.body
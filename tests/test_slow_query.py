@@ -0,0 +1,103 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.slow_query import SlowQueryRegistry, _explain, normalize_statement
+
+
+class TestSlowQueryRegistry:
+    """Тесты для статистики медленных запросов"""
+
+    @pytest.fixture
+    def registry(self):
+        """Фикстура для реестра с небольшим лимитом"""
+        return SlowQueryRegistry(max_size=2)
+
+    def test_normalize_statement_collapses_in_lists(self):
+        """Тест агрегации IN-списков разной длины в один запрос"""
+        # Act
+        short = normalize_statement("SELECT * FROM a\n WHERE id IN ($1, $2)")
+        long = normalize_statement("SELECT * FROM a WHERE id IN ($1, $2, $3, $4)")
+
+        # Assert
+        assert short == long == "SELECT * FROM a WHERE id IN (...)"
+
+    def test_record_aggregates_same_statement(self, registry):
+        """Тест накопления статистики одного и того же запроса"""
+        # Act
+        registry.record("SELECT 1", 300.0, origin="Repo.get")
+        registry.record("SELECT  1", 100.0, route="GET /x")
+
+        # Assert
+        [stats] = registry.top()
+        assert stats.count == 2
+        assert stats.total_ms == 400.0
+        assert stats.max_ms == 300.0
+        assert stats.mean_ms == 200.0
+        assert stats.origin == "Repo.get"
+        assert stats.route == "GET /x"
+
+    def test_top_ranks_by_total_time(self, registry):
+        """Тест сортировки запросов по суммарному времени"""
+        # Arrange
+        registry.record("SELECT 1", 500.0)
+        registry.record("SELECT 2", 300.0)
+        registry.record("SELECT 2", 300.0)
+
+        # Act
+        result = registry.top()
+
+        # Assert
+        assert [s.statement for s in result] == ["SELECT 2", "SELECT 1"]
+
+    def test_record_evicts_cheapest_when_full(self, registry):
+        """Тест вытеснения самого дешёвого запроса при переполнении"""
+        # Arrange
+        registry.record("SELECT 1", 500.0)
+        registry.record("SELECT 2", 200.0)
+
+        # Act
+        registry.record("SELECT 3", 300.0)
+
+        # Assert
+        assert {s.statement for s in registry.top()} == {"SELECT 1", "SELECT 3"}
+
+
+class _RecordingCursor:
+    """Курсор DBAPI, запоминающий выполненные команды"""
+
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, statement, _parameters=None):
+        self.statements.append(statement)
+
+    def fetchall(self):
+        return [("Insert on t",)]
+
+    def close(self):
+        pass
+
+
+class TestExplain:
+    """Тесты для получения плана медленного запроса"""
+
+    def test_explain_rolls_back_analyzed_writes(self):
+        """Тест отката изменений, выполненных EXPLAIN ANALYZE"""
+        # Arrange
+        cursor = _RecordingCursor()
+        conn = SimpleNamespace(
+            connection=SimpleNamespace(
+                dbapi_connection=SimpleNamespace(cursor=lambda: cursor)
+            )
+        )
+
+        # Act
+        plan = _explain(conn, "WITH x AS (INSERT INTO t VALUES (1)) SELECT 1", ())
+
+        # Assert
+        assert plan == "Insert on t"
+        assert cursor.statements[-2:] == [
+            "ROLLBACK TO SAVEPOINT slow_query_explain",
+            "RELEASE SAVEPOINT slow_query_explain",
+        ]
@@ -0,0 +1,138 @@
+import pytest
+
+from src.config import settings
+from src.dto.organization import OrganizationPartial, OrganizationSearch
+from src.service import OrganizationService
+from src.snapshot import DirectorySnapshot, MappedSnapshot, snapshot_store
+from src.snapshot_file import SnapshotFile, write_snapshot_file
+
+
+@pytest.fixture
+def snapshot():
+    """Снимок: два здания, дерево 1 -> 2 -> 3, 1 -> 4 и три организации"""
+    return DirectorySnapshot(
+        buildings=[(1, "Москва", 55.75, 37.61), (2, "Новосибирск", 55.03, 82.92)],
+        activities=[
+            (1, "Еда", None),
+            (2, "Мясная продукция", 1),
+            (3, "Колбасы", 2),
+            (4, "Молочная продукция", 1),
+        ],
+        organizations=[(1, "Рога и Копыта", 1), (2, "Молоко", 2), (3, "Колбасный", 1)],
+        phones=[
+            (1, 1, "8-923-666", "8923666"),
+            (2, 2, "2-222-222", "2222222"),
+            (3, 3, "8-923-111", "8923111"),
+        ],
+        organization_activities=[(1, 2), (2, 4), (3, 3)],
+    )
+
+
+class TestDirectorySnapshot:
+    """Тесты для снимка справочника в памяти"""
+
+    def test_indexes(self, snapshot):
+        """Тест индексов по зданию, поддереву деятельности и имени"""
+        # Act
+        in_building = snapshot.organizations_in_building(1)
+        in_food = snapshot.organizations_in_activity(1)
+        in_meat = snapshot.organizations_in_activity(2)
+        by_name = snapshot.organizations_by_name("КОЛБ")
+
+        # Assert
+        assert [o.id for o in in_building] == [1, 3]
+        assert [o.id for o in in_food] == [1, 2, 3]
+        assert [o.id for o in in_meat] == [1, 3]
+        assert [o.id for o in by_name] == [3]
+        assert snapshot.activity_counts() == [(1, 3), (2, 2), (3, 1), (4, 1)]
+        assert snapshot.organization(42) is None
+
+    def test_phone_lookup(self, snapshot):
+        """Тест точного поиска и поиска по префиксу телефона"""
+        # Act
+        exact = snapshot.organization_ids_by_phone("8923666")
+        by_prefix = snapshot.organization_ids_by_phone("8923", prefix=True)
+        missing = snapshot.organization_ids_by_phone("8923")
+
+        # Assert
+        assert exact == [1]
+        assert by_prefix == [1, 3]
+        assert missing == []
+
+    def test_search(self, snapshot):
+        """Тест комбинированного поиска с фасетами"""
+        # Arrange
+        criteria = OrganizationSearch(activity_ids=[1], phone="8-923", facets=True)
+
+        # Act
+        total, items, buildings, activities, plan = snapshot.search(criteria)
+
+        # Assert
+        assert total == 2
+        assert [item["id"] for item in items] == [1, 3]
+        assert items[0]["building"].address == "Москва"
+        assert buildings == {1: 2}
+        assert activities == {2: 1, 3: 1}
+        assert plan.driver == "activity"
+        assert plan.filters == ["phone"]
+
+
+class TestMappedSnapshot:
+    """Тесты для снимка из файла, отображённого в память"""
+
+    def test_file_round_trip(self, snapshot, tmp_path):
+        """Тест совпадения ответов снимка из файла и снимка в памяти"""
+        # Arrange
+        path = str(tmp_path / "directory.snapshot")
+        write_snapshot_file(path, snapshot.sections(), snapshot.built_at)
+
+        # Act
+        mapped = MappedSnapshot(SnapshotFile(path))
+
+        # Assert
+        assert [o.name for o in mapped.organizations] == [
+            o.name for o in snapshot.organizations
+        ]
+        assert [a.name for a in mapped.children(None)] == ["Еда"]
+        assert [o.id for o in mapped.organizations_in_activity(2)] == [1, 3]
+        assert mapped.organization_ids_by_phone("8923", prefix=True) == [1, 3]
+        assert mapped.activity_counts() == snapshot.activity_counts()
+        assert mapped.building(2).address == "Новосибирск"
+        assert mapped.organization(3).phones[0].phone_number == "8-923-111"
+        assert mapped.search(OrganizationSearch(building_id=1, name="кол"))[0] == 1
+
+    def test_rejects_foreign_file(self, tmp_path):
+        """Тест отказа открывать файл другого формата"""
+        # Arrange
+        path = tmp_path / "directory.snapshot"
+        path.write_bytes(b"not a snapshot" * 10)
+
+        # Act / Assert
+        with pytest.raises(ValueError):
+            SnapshotFile(str(path))
+
+
+class TestSnapshotReads:
+    """Тесты для чтения организаций через снимок"""
+
+    @pytest.mark.asyncio
+    async def test_ids_missing_from_snapshot_read_from_db(self, snapshot, monkeypatch):
+        """Тест чтения из БД организаций, которых нет в снимке"""
+        # Arrange
+        monkeypatch.setattr(settings, "SNAPSHOT_ENABLED", True)
+        monkeypatch.setattr(snapshot_store, "current", snapshot)
+        service = OrganizationService.__new__(OrganizationService)
+        requested = []
+
+        async def from_db(organization_ids, _include):
+            requested.extend(organization_ids)
+            return [OrganizationPartial(id=5, name="Без здания", building_id=0)]
+
+        monkeypatch.setattr(service, "_get_organizations_from_db", from_db)
+
+        # Act
+        result = await service.get_organizations_by_ids([3, 5, 1], include=())
+
+        # Assert
+        assert [organization.id for organization in result] == [3, 5, 1]
+        assert requested == [5]
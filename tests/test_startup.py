@@ -0,0 +1,39 @@
+from fastapi.testclient import TestClient
+
+from src.main import app
+from src.startup import Startup, startup
+
+
+class TestStartup:
+    """Тесты для готовности приложения после прогрева"""
+
+    def test_phases_are_timed(self):
+        """Тест замера этапов и общего времени запуска"""
+        # Arrange
+        state = Startup()
+
+        # Act
+        with state.phase("warm_pool"):
+            pass
+        state.mark_ready()
+
+        # Assert
+        assert state.ready
+        assert list(state.report()["phases"]) == ["warm_pool"]
+        assert state.report()["total_ms"] >= state.phases["warm_pool"]
+
+    def test_ready_only_after_warm_up(self, monkeypatch):
+        """Тест ответа /ready до и после прогрева"""
+        # Arrange
+        client = TestClient(app)
+        monkeypatch.setattr(startup, "ready", False)
+
+        # Act
+        warming = client.get("/ready")
+        startup.mark_ready()
+        ready = client.get("/ready")
+
+        # Assert
+        assert warming.status_code == 503
+        assert ready.status_code == 200
+        assert client.get("/health").status_code == 200
@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from src.config import settings
+from src.dto import OrganizationCreate
+from src.model import Activity, Building
+from src.service import OrganizationService
+from src.snapshot import DirectorySnapshot, snapshot_store
+from src.write_batcher import WriteBatcher
+
+
+class TestWriteBatcher:
+    """Тесты для групповой фиксации записей"""
+
+    @pytest.fixture(autouse=True)
+    def window(self, monkeypatch):
+        """Фикстура с коротким окном и пакетом не больше трёх записей"""
+        monkeypatch.setattr(settings, "WRITE_BATCH_WINDOW_MS", 10.0)
+        monkeypatch.setattr(settings, "WRITE_BATCH_MAX_SIZE", 3)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_writes_share_batch(self):
+        """Тест объединения одновременных записей и ошибки отдельной записи"""
+        # Arrange
+        batches = []
+
+        async def run_batch(items):
+            batches.append(items)
+            return [ValueError(item) if item < 0 else item * 10 for item in items]
+
+        async def run_one(_item):
+            raise AssertionError("пакет не должен выполняться по одной")
+
+        batcher = WriteBatcher("test", run_batch, run_one)
+
+        # Act
+        results = await asyncio.gather(
+            *(batcher.submit(item) for item in (1, -2, 3, 4)), return_exceptions=True
+        )
+
+        # Assert
+        assert batches == [[1, -2, 3], [4]]
+        assert results[0] == 10
+        assert isinstance(results[1], ValueError)
+        assert results[2:] == [30, 40]
+        assert batcher.largest_batch == 3
+        assert batcher.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_falls_back_to_single_writes(self):
+        """Тест повтора по одной записи после ошибки всего пакета"""
+
+        # Arrange
+        async def run_batch(_items):
+            raise RuntimeError("нарушено ограничение")
+
+        async def run_one(item):
+            if item == 2:
+                raise ValueError("дубликат")
+            return item
+
+        batcher = WriteBatcher("test", run_batch, run_one)
+
+        # Act
+        results = await asyncio.gather(
+            *(batcher.submit(item) for item in (1, 2)), return_exceptions=True
+        )
+
+        # Assert
+        assert results[0] == 1
+        assert isinstance(results[1], ValueError)
+        assert batcher.batches == 1
+        assert batcher.fallbacks == 1
+
+
+@pytest.fixture
+def seed_rows():
+    """Фикстура со строками тестовой БД: одно здание и одна деятельность"""
+    return [
+        (
+            Building,
+            [{"id": 1, "address": "Address 1", "latitude": 55.0, "longitude": 37.0}],
+        ),
+        (Activity, [{"id": 1, "name": "Food"}]),
+    ]
+
+
+class TestCreateOrganizations:
+    """Тесты для создания пакета организаций"""
+
+    @pytest.mark.asyncio
+    async def test_batch_with_snapshot_enabled(self, session, monkeypatch):
+        """Тест ответа пакета при включённом снимке, где новых организаций нет"""
+        # Arrange
+        monkeypatch.setattr(settings, "SNAPSHOT_ENABLED", True)
+        monkeypatch.setattr(
+            snapshot_store, "current", DirectorySnapshot([], [], [], [], [])
+        )
+        organizations = [
+            OrganizationCreate(name="First", building_id=1, activity_ids=[1]),
+            OrganizationCreate(name="Missing", building_id=2),
+            OrganizationCreate(name="Second", building_id=1),
+        ]
+
+        # Act
+        results = await OrganizationService(session).create_organizations(organizations)
+
+        # Assert
+        assert [result.name for result in results[::2]] == ["First", "Second"]
+        assert results[0].building.address == "Address 1"
+        assert [activity.id for activity in results[0].activities] == [1]
+        assert isinstance(results[1], ValueError)